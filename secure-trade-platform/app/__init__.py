@@ -1,16 +1,16 @@
 from dotenv import load_dotenv
 load_dotenv()
 from flask import Flask
-from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 from flask_login import LoginManager
 from flask_socketio import SocketIO
 from .config import Config
+from .database import RoutingSQLAlchemy
 from flask_migrate import Migrate
 import os
 
 # 확장 객체 초기화
-db = SQLAlchemy()
+db = RoutingSQLAlchemy()  # 읽기 복제본 라우팅 세션 (복제본 설정이 없으면 모두 primary)
 bcrypt = Bcrypt()
 migrate = Migrate()
 login_manager = LoginManager()
@@ -22,18 +22,47 @@ login_manager.login_message_category = 'info'
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
+    # Jinja 바이트코드 캐시 - 템플릿 환경이 만들어지기 전에 설정
+    from app import template_cache
+    template_cache.init_app(app)
 
+    # DB 엔진 프로필 (풀 / SQLite PRAGMA) - db.init_app 보다 먼저
+    from app import database
+    database.init_app(app)
     db.init_app(app)
     bcrypt.init_app(app)
     login_manager.init_app(app)
     migrate.init_app(app, db)
-    socketio.init_app(app)  # SocketIO 초기화
+    # SocketIO 초기화 (메시지 큐가 설정되면 여러 워커가 방/브로드캐스트 공유)
+    from app.message_queue import create_client_manager
+    socketio_options = {'async_mode': app.config['SOCKETIO_ASYNC_MODE']}
+    client_manager = create_client_manager(app.config)
+    if client_manager is not None:
+        socketio_options['client_manager'] = client_manager
+    socketio.init_app(app, **socketio_options)
+
+    from app.passwords import password_hasher
+    password_hasher.init_app(app)
+    from app.chat_buffer import chat_buffer
+    chat_buffer.init_app(app)
+    from app.chat_batch import public_batcher
+    public_batcher.init_app(app)
     
-    from app.models import User  # user_loader 아래로 이동 방지
+    from app.identity import identity_cache, load_identity  # user_loader 아래로 이동 방지
+    identity_cache.configure(app.config['IDENTITY_CACHE_SIZE'], app.config['IDENTITY_CACHE_TTL'])
+    from app.search_cache import search_cache
+    search_cache.configure(app.config['SEARCH_CACHE_SIZE'], app.config['SEARCH_CACHE_TTL'])
+    # 다른 프로세스의 사용자/상품 변경을 캐시에 반영하는 백그라운드 폴러 (자동완성 색인보다 먼저 - 구성 중의 변경도 받도록)
+    from app.cache_sync import cache_sync
+    cache_sync.init_app(app)
+    # 검색어 자동완성 접두어 색인 (시작 시 구성, 이후 커밋마다 갱신)
+    from app import suggest
+    suggest.init_app(app)
 
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        user = load_identity(int(user_id))
+        return user if user and user.is_active else None
 
     # 블루프린트 등록
     from .routes import user_bp, product_bp, admin_bp
@@ -43,5 +72,17 @@ def create_app():
     app.register_blueprint(product_bp)
     app.register_blueprint(chat_bp)  # 👈 chat 등록
     app.register_blueprint(admin_bp)
+
+    # 요청/SQL/Socket.IO 지표 (/admin/metrics)
+    from app import metrics
+    metrics.init_app(app)
+    # 개발 모드 N+1 감지 / 라우트별 쿼리 예산 (QUERY_AUDIT=1)
+    from app import query_audit
+    query_audit.init_app(app)
+
+    from .commands import register_commands
+    register_commands(app)
+    # 첫 요청에서 템플릿을 컴파일하지 않도록 미리 로드 (serve.py 는 fork 전에 한 번)
+    template_cache.warm(app)
     return app
 
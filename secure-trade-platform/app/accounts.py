@@ -0,0 +1,44 @@
+from app import db, jobs, wallet
+from app.models import User, Post, UserReport, PostReport, ChatMessage
+from app.purchases import refund_pending
+
+DELETE_ACCOUNT_JOB = 'accounts.delete_account'
+
+
+# 탈퇴 요청 - 계정은 바로 비활성화(로그인 불가)하고 정리와 삭제는 작업 워커가 처리
+def request_deletion(user):
+    user.is_active = False
+    jobs.enqueue(DELETE_ACCOUNT_JOB, key=f'delete-account:{user.id}', user_id=user.id)
+    db.session.commit()
+
+
+# 확정 전인 구매는 취소하고, 올린 상품(구매 대기 중이면 환불)과 보낸/받은 신고를 지우고 사용자 삭제
+# 보낸 신고는 대상의 report_count 에서도 빼고, 채팅 기록은 이름만 남김
+@jobs.handler(DELETE_ACCOUNT_JOB)
+def delete_account(user_id):
+    user = db.session.get(User, user_id)
+    if user is None:
+        return
+    # 판매/구매 중인 상품 행을 먼저 잠가 아래에서 읽는 구매 상태가 환불/삭제 시점까지 바뀌지 않도록 (delete_listing 과 같은 방식)
+    (Post.query.filter(db.or_(Post.user_id == user_id, Post.buyer_id == user_id))
+     .update({Post.buyer_id: Post.buyer_id}, synchronize_session=False))
+
+    # 에스크로 금액은 원장에 환불로 기록하고 예약을 풀어 상품을 다시 판매 중으로
+    pending = Post.query.filter(Post.buyer_id == user_id, Post.is_sold.isnot(True))
+    for post_id, price in pending.with_entities(Post.id, Post.price):
+        wallet.credit(user_id, price, wallet.REFUND, post_id)
+    pending.update({Post.buyer_id: None}, synchronize_session=False)
+
+    for post in Post.query.options(db.selectinload(Post.reports)).filter_by(user_id=user_id):
+        refund_pending(post)
+        db.session.delete(post)
+
+    for model, report_model, target_column in ((Post, PostReport, PostReport.post_id),
+                                               (User, UserReport, UserReport.reported_user_id)):
+        targets = db.session.query(target_column).filter(report_model.reporter_id == user_id)
+        (model.query.filter(model.id.in_(targets))
+         .update({model.report_count: model.report_count - 1}, synchronize_session=False))
+        report_model.query.filter(report_model.reporter_id == user_id).delete(synchronize_session=False)
+    UserReport.query.filter_by(reported_user_id=user_id).delete(synchronize_session=False)
+    ChatMessage.query.filter_by(user_id=user_id).update({ChatMessage.user_id: None}, synchronize_session=False)
+    db.session.delete(user)
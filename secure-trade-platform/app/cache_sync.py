@@ -0,0 +1,145 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app import db, socketio
+from app.models import CacheInvalidation, User, Post
+
+logger = logging.getLogger(__name__)
+
+# 무효화 대상 종류
+USER = 'user'
+POST = 'post'
+
+# created_at 은 커밋보다 앞서므로 늦게 커밋된 트랜잭션도 놓치지 않도록 이만큼 겹쳐 읽음 (이미 반영한 id 는 건너뜀)
+LOOKBACK_SECONDS = 30.0
+
+_subscribers = []
+
+
+# 변경을 받을 함수 등록 - func(user_ids, post_ids) 는 폴링마다 (변경이 없으면 빈 집합으로) 백그라운드에서 호출
+def subscribe(func):
+    _subscribers.append(func)
+    return func
+
+
+# 프로세스 간 캐시 동기화 - 사용자 정지/삭제/이름 변경, 상품 삭제/제목 변경이 커밋되면 cache_invalidation 행이
+# 같은 트랜잭션으로 남고, 웹 워커마다 백그라운드에서 interval 초마다 새 행을 읽어 구독한 캐시에 반영
+# 요청 경로는 DB 를 거치지 않으므로 다른 프로세스(작업 워커, 다른 웹 워커)의 변경은 최대 interval 초 (+ 폴링 쿼리 시간) 늦게 반영
+class CacheSync:
+    def __init__(self):
+        self.app = None
+        self.interval = 1.0
+        self.applied = 0
+        self._since = datetime.utcnow()
+        self._seen = {}  # 겹쳐 읽는 구간에서 이미 반영한 id -> created_at
+        self._lock = threading.Lock()
+        self._running = False
+
+    # 시작 시점 이후의 변경만 반영 (캐시와 색인은 지금부터 채워짐) - 폴러는 fork 된 워커의 첫 요청에서 시작
+    def init_app(self, app):
+        self.app = app
+        self.interval = app.config['CACHE_SYNC_INTERVAL']
+        self._since = datetime.utcnow()
+        if self.interval > 0:
+            app.before_request(self._ensure_poller)
+
+    def _ensure_poller(self):
+        if self._running:
+            return
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+        socketio.start_background_task(self._poll_loop)
+
+    # threading 모드의 백그라운드 작업은 daemon 이 아니므로 주 스레드가 끝나면(인터프리터 종료) 같이 멈춤
+    def _poll_loop(self):
+        while self._running and threading.main_thread().is_alive():
+            socketio.sleep(self.interval)
+            with self.app.app_context():
+                try:
+                    self.poll()
+                except SQLAlchemyError as e:
+                    db.session.rollback()
+                    logger.warning('Cache sync poll failed: %s', e)
+                except Exception:
+                    logger.exception('Cache sync poll failed')
+                finally:
+                    db.session.remove()
+
+    # 새 무효화 기록을 읽어 구독자에게 전달 - 반영한 행 수
+    def poll(self):
+        now = datetime.utcnow()
+        since = self._since - timedelta(seconds=LOOKBACK_SECONDS)
+        rows = (db.session.query(CacheInvalidation.id, CacheInvalidation.kind,
+                                 CacheInvalidation.target_id, CacheInvalidation.created_at)
+                .filter(CacheInvalidation.created_at > since)
+                .all())
+        db.session.rollback()
+        fresh = [row for row in rows if row.id not in self._seen]
+        self._seen = {row.id: row.created_at for row in rows}
+        self._since = now
+
+        user_ids = {row.target_id for row in fresh if row.kind == USER}
+        post_ids = {row.target_id for row in fresh if row.kind == POST}
+        for func in _subscribers:
+            func(user_ids, post_ids)
+        self.applied += len(fresh)
+        return len(fresh)
+
+
+cache_sync = CacheSync()
+
+
+# 보관 기간이 지난 기록 삭제 (작업 워커의 주기 정리에서 호출) - 보관 기간은 LOOKBACK_SECONDS 보다 길어야 함
+def purge(retention_seconds):
+    cutoff = datetime.utcnow() - timedelta(seconds=max(retention_seconds, LOOKBACK_SECONDS * 2))
+    deleted = CacheInvalidation.query.filter(CacheInvalidation.created_at < cutoff).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
+
+
+# 변경 감지 - flush 중에 모아 두었다가 flush 가 끝나면 같은 트랜잭션으로 한 번에 INSERT (롤백되면 함께 사라짐)
+def _pending(session):
+    return session.info.setdefault('cache_sync_pending', set())
+
+
+@event.listens_for(User, 'after_update')
+def _user_updated(mapper, connection, target):
+    state = db.inspect(target)
+    if state.attrs.is_active.history.has_changes() or state.attrs.username.history.has_changes():
+        _pending(state.session).add((USER, target.id))
+
+
+@event.listens_for(Post, 'after_update')
+def _post_updated(mapper, connection, target):
+    state = db.inspect(target)
+    if state.attrs.title.history.has_changes():
+        _pending(state.session).add((POST, target.id))
+
+
+@event.listens_for(User, 'after_delete')
+def _user_deleted(mapper, connection, target):
+    _pending(db.inspect(target).session).add((USER, target.id))
+
+
+@event.listens_for(Post, 'after_delete')
+def _post_deleted(mapper, connection, target):
+    _pending(db.inspect(target).session).add((POST, target.id))
+
+
+@event.listens_for(Session, 'after_flush')
+def _record_after_flush(session, flush_context):
+    pending = session.info.pop('cache_sync_pending', None)
+    if pending:
+        now = datetime.utcnow()
+        session.execute(CacheInvalidation.__table__.insert(),
+                        [{'kind': kind, 'target_id': target_id, 'created_at': now} for kind, target_id in sorted(pending)])
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop('cache_sync_pending', None)
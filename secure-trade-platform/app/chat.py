@@ -1,11 +1,24 @@
-from flask import Blueprint, render_template, request
+import re
+from flask import Blueprint, render_template, request, jsonify, abort
 from flask_login import login_required, current_user
-from app.models import User
+from app.models import User, ChatMessage
 from flask_socketio import emit, join_room
 from app import socketio
+from app.chat_buffer import chat_buffer
+from app.chat_batch import public_batcher
+from app.pagination import keyset_paginate, get_page_size
 
 chat_bp = Blueprint('chat_bp', __name__)
 
+PUBLIC_ROOM = 'public'
+_PRIVATE_ROOM = re.compile(r'^room_(\d+)_(\d+)$')
+
+
+# 1:1 채팅방(room_{a}_{b})에 현재 사용자가 참여자인지
+def _is_participant(room):
+    match = _PRIVATE_ROOM.match(room or '')
+    return bool(match) and current_user.id in (int(match.group(1)), int(match.group(2)))
+
 # 채팅방 접속 라우트
 @chat_bp.route("/chat/<int:receiver_id>")
 @login_required
@@ -17,21 +30,30 @@ def chat(receiver_id):
     room = f"room_{sorted_ids[0]}_{sorted_ids[1]}"
     return render_template("chat.html", receiver=receiver, room=room)
 
-# 클라이언트가 방에 접속할 때
+# 클라이언트가 방에 접속할 때 (대화 참여자만)
 @socketio.on('join')
+@login_required
 def handle_join(data):
-    room = data['room']
+    room = data.get('room')
+    if not _is_participant(room):
+        return
     join_room(room)
-    emit('status', {'msg': f"{data['username']} joined the chat."}, room=room)
+    emit('status', {'msg': f"{current_user.username} joined the chat."}, room=room)
 
-# 메시지를 보냈을 때
+# 메시지를 보냈을 때 - 보낸 사람은 클라이언트가 보낸 값이 아닌 로그인 사용자
 @socketio.on('send_message')
+@login_required
 def handle_message(data):
-    room = data['room']
+    room = data.get('room')
+    message = str(data.get('message', '')).strip()
+    if not message or not _is_participant(room):
+        return
+    username = current_user.username
     emit('receive_message', {
-        'username': data['username'],
-        'message': data['message']
+        'username': username,
+        'message': message
     }, room=room)
+    chat_buffer.append(room, username, message, user_id=current_user.id)
 
 # 공용 채팅방 라우트
 @chat_bp.route('/chat/public', methods=['GET'])
@@ -46,8 +68,32 @@ def handle_public_message(data):
     username = current_user.username
     message = data.get('message', '').strip()
     if message:
-        emit('public_message', {
+        public_batcher.publish({
             'username': username,
             'message': message
-        }, broadcast=True)
+        })
+        chat_buffer.append(PUBLIC_ROOM, username, message, user_id=current_user.id)
+
+
+# 방별 채팅 기록 (최신순, 커서 페이지네이션)
+@chat_bp.route('/chat/history/<room>', methods=['GET'])
+@login_required
+def chat_history(room):
+    if room != PUBLIC_ROOM:
+        if not _PRIVATE_ROOM.match(room):
+            abort(404)
+        if not _is_participant(room):
+            abort(403)  # 대화 참여자만 조회 가능
+
+    page = keyset_paginate(ChatMessage.query.filter_by(room=room),
+                           ChatMessage.timestamp, ChatMessage.id,
+                           cursor=request.args.get('cursor'), per_page=get_page_size())
+    return jsonify({
+        'messages': [{
+            'username': msg.username,
+            'message': msg.message,
+            'timestamp': msg.timestamp.isoformat(),
+        } for msg in page],
+        'next_cursor': page.next_cursor,
+    })
 
@@ -0,0 +1,48 @@
+import threading
+from app import socketio
+
+
+# 공용 채팅방 브로드캐스트 묶음 전송
+# 배치 창(ms) 동안 들어온 메시지를 모아 'public_messages' 한 프레임(배열)으로 전송
+# 창이 0 이면 메시지마다 'public_message' 로 바로 전송
+class PublicMessageBatcher:
+    def __init__(self):
+        self.window = 0
+        self._pending = []
+        self._lock = threading.Lock()
+        self._scheduled = False
+        self.frames = 0
+        self.messages = 0
+
+    def init_app(self, app):
+        self.window = app.config['PUBLIC_CHAT_BATCH_MS'] / 1000
+
+    def publish(self, payload):
+        self.messages += 1
+        if self.window <= 0:
+            self.frames += 1
+            socketio.emit('public_message', payload)
+            return
+
+        with self._lock:
+            self._pending.append(payload)
+            schedule = not self._scheduled
+            self._scheduled = True
+        # 첫 메시지 기준으로 타이머 시작 - 추가 지연은 최대 배치 창 만큼
+        if schedule:
+            socketio.start_background_task(self._flush_later)
+
+    def _flush_later(self):
+        socketio.sleep(self.window)
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+            self._scheduled = False
+        if batch:
+            self.frames += 1
+            socketio.emit('public_messages', batch)
+
+
+public_batcher = PublicMessageBatcher()
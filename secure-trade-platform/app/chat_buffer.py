@@ -0,0 +1,99 @@
+import atexit
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from app import db, socketio
+from app.models import ChatMessage
+
+logger = logging.getLogger(__name__)
+
+
+# 채팅 메시지 write-behind 버퍼
+# emit 경로에서는 메모리 큐에 넣기만 하고, N 개가 쌓이거나 T ms 가 지나면 백그라운드에서 bulk insert
+class ChatWriteBuffer:
+    def __init__(self):
+        self.app = None
+        self.flush_size = 100
+        self.flush_interval = 0.2
+        self.max_pending = 10000
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flusher = None
+        self._flush_scheduled = False
+        self._running = False
+        self.flushed = 0
+        self.dropped = 0
+
+    def init_app(self, app):
+        self.app = app
+        self.flush_size = app.config['CHAT_FLUSH_SIZE']
+        self.flush_interval = app.config['CHAT_FLUSH_INTERVAL_MS'] / 1000
+        self.max_pending = app.config['CHAT_BUFFER_MAX']
+        atexit.register(self.stop)
+
+    def append(self, room, username, message, user_id=None, timestamp=None):
+        row = {
+            'room': room,
+            'user_id': user_id,
+            'username': username,
+            'message': message,
+            'timestamp': timestamp or datetime.utcnow(),
+        }
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                self._pending.popleft()
+                self.dropped += 1
+            self._pending.append(row)
+            size_reached = len(self._pending) >= self.flush_size and not self._flush_scheduled
+            if size_reached:
+                self._flush_scheduled = True
+
+        self._ensure_flusher()
+        if size_reached:
+            socketio.start_background_task(self.flush)
+
+    def _ensure_flusher(self):
+        if self._running:
+            return
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+        self._flusher = socketio.start_background_task(self._flush_loop)
+
+    def _flush_loop(self):
+        while self._running:
+            socketio.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                rows = list(self._pending)
+                self._pending.clear()
+                self._flush_scheduled = False
+            if not rows:
+                return 0
+            try:
+                with self.app.app_context():
+                    db.session.execute(ChatMessage.__table__.insert(), rows)
+                    db.session.commit()
+                    db.session.remove()
+            except Exception:
+                logger.exception('Failed to persist %d chat messages; requeueing', len(rows))
+                with self._lock:
+                    self._pending.extendleft(reversed(rows))
+                return 0
+            self.flushed += len(rows)
+            return len(rows)
+
+    # 종료 시 남은 메시지를 모두 기록
+    def stop(self):
+        self._running = False
+        if self.app is not None:
+            self.flush()
+
+
+chat_buffer = ChatWriteBuffer()
@@ -0,0 +1,1241 @@
+import io
+import multiprocessing
+import os
+import random
+import re
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from app import db, database, purchases, wallet, product_io, template_cache, jobs
+from app.models import User, Post, UserReport, PostReport, Job, CacheInvalidation
+from app.pagination import keyset_query, encode_cursor
+from app.reports import report_timestamps_query, reporter_sample_query
+from app.search import search_posts, filter_posts, facet_query, SearchFilters
+from app.passwords import PasswordHasher, password_hasher
+
+# 실행 계획에서 잡는 문제 종류 - 라우트 쿼리마다 예상된 종류만 허용 목록으로 지정
+FULL_SCAN = 'full scan'    # 인덱스 없이 테이블 전체
+INDEX_SCAN = 'index scan'  # 조건 없이 인덱스 전체 (SEARCH 가 아닌 SCAN ... USING INDEX)
+TEMP_SORT = 'temp sort'    # 인덱스 순서를 못 써서 임시 B-tree 로 정렬/그룹
+
+# SQLite: "SCAN post" (3.36 이전은 "SCAN TABLE post") / PostgreSQL: "Seq Scan on post", "Sort"
+_SQLITE_FULL_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)$')
+_SQLITE_INDEX_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+) USING (?:COVERING )?INDEX (\w+)$')
+_SQLITE_TEMP_SORT = re.compile(r'^USE TEMP B-TREE FOR (.+)$')
+_SQLITE_MATERIALIZE = re.compile(r'^MATERIALIZE (\w+)$')
+_PG_FULL_SCAN = re.compile(r'Seq Scan on (\w+)')
+_PG_SORT = re.compile(r'^\s*(?:->\s+)?(Sort)\s+\(')
+
+
+# 라우트에서 실행하는 쿼리 목록 (이름, 쿼리[, 허용하는 문제 종류])
+def _route_queries():
+    now = datetime.utcnow()
+    per_page = 20
+    date_cursor = encode_cursor(now, 1)
+    price_cursor = encode_cursor(1000, 1)
+
+    queries = [
+        ('login / register: user by username', User.query.filter_by(username='admin')),
+        ('register / settings: user by email', User.query.filter_by(email='admin@example.com')),
+        ('user_loader / view_profile: user by id', User.query.filter_by(id=1)),
+        ('product_detail: post by id', Post.query.filter_by(id=1)),
+        ('profile: first page', keyset_query(Post.query.filter_by(user_id=1), Post.date_posted, Post.id, None, per_page)),
+        ('profile: next page', keyset_query(Post.query.filter_by(user_id=1), Post.date_posted, Post.id, date_cursor, per_page)),
+        ('purchases: posts by buyer', Post.query.filter_by(buyer_id=1)),
+        ('report_user: report counter', db.session.query(User.report_count).filter_by(id=2)),
+        ('report_post: report counter', db.session.query(Post.report_count).filter_by(id=2)),
+        ('run-jobs: next queued job', Job.query.filter(Job.status == jobs.QUEUED, Job.run_at <= now)
+         .order_by(Job.run_at, Job.id).limit(1)),
+        ('cache sync: recent invalidations', db.session.query(CacheInvalidation.id, CacheInvalidation.kind,
+                                                               CacheInvalidation.target_id, CacheInvalidation.created_at)
+         .filter(CacheInvalidation.created_at > now)),
+        ('metrics: job queue stats', db.session.query(Job.status, db.func.count(Job.id), db.func.min(Job.run_at))
+         .filter(Job.status.in_((jobs.QUEUED, jobs.RUNNING, jobs.FAILED))).group_by(Job.status)),
+    ]
+
+    # 관리자 신고 목록 - report_count keyset 페이지 + 대상별 신고 시각 집계 + 최근 신고자 샘플
+    count_cursor = encode_cursor(5, 1)
+    target_ids = list(range(1, per_page + 1))
+    for name, model, query, report_model, target_column in (
+            ('users', User, User.query, UserReport, UserReport.reported_user_id),
+            ('posts', Post, Post.query.options(db.joinedload(Post.user)), PostReport, PostReport.post_id)):
+        query = query.filter(model.report_count > 0)
+        queries += [
+            (f'admin_reports: reported {name} first page',
+             keyset_query(query, model.report_count, model.id, None, per_page)),
+            (f'admin_reports: reported {name} next page',
+             keyset_query(query, model.report_count, model.id, count_cursor, per_page)),
+            (f'admin_reports: reported {name} report timestamps',
+             report_timestamps_query(report_model, target_column, target_ids)),
+            # 대상 페이지(per_page 개)의 신고만 모아 정렬하므로 임시 정렬 크기가 페이지로 제한됨
+            (f'admin_reports: reported {name} reporter sample',
+             reporter_sample_query(report_model, target_column, target_ids), (TEMP_SORT,)),
+        ]
+
+    for keyword in ('', 'bike'):
+        query, rank = search_posts(keyword)
+        label = f'search "{keyword}"'
+        # 검색어가 있으면 FTS MATCH 결과(일치한 글만)를 정렬하므로 임시 정렬 허용
+        sort_allowed = (TEMP_SORT,) if keyword else ()
+        queries += [
+            (f'{label} latest', keyset_query(query, Post.date_posted, Post.id, date_cursor, per_page), sort_allowed),
+            (f'{label} price_asc', keyset_query(query, Post.price, Post.id, price_cursor, per_page, descending=False),
+             sort_allowed),
+            (f'{label} price_desc', keyset_query(query, Post.price, Post.id, price_cursor, per_page), sort_allowed),
+        ]
+        if rank is not None:
+            queries.append((f'{label} relevance', keyset_query(query, rank, Post.id, None, per_page, descending=False),
+                            sort_allowed))
+        # 가격 범위 / 판매 상태 필터와 facet 집계 (가격, 상태 컬럼을 커버링 인덱스에서 읽음)
+        # facet 은 결과 전체를 구간별로 세는 집계라 인덱스 전체 읽기와 GROUP BY 정렬이 예상된 계획
+        price_filter = SearchFilters(min_price=10000, max_price=50000, availability='available')
+        queries += [
+            (f'{label} price range available', keyset_query(filter_posts(query, price_filter), Post.date_posted,
+                                                            Post.id, date_cursor, per_page), sort_allowed),
+            (f'{label} facets', facet_query(query, price_filter, current_app.config['SEARCH_PRICE_BUCKETS']),
+             (INDEX_SCAN, TEMP_SORT)),
+        ]
+    return queries
+
+
+# 실행 계획과 찾은 문제 목록 [(종류, 대상)] 반환
+def _explain(connection, statement):
+    # IN (...) 목록도 바인드 변수로 펼쳐서 컴파일
+    compiled = statement.compile(dialect=connection.dialect, compile_kwargs={'render_postcompile': True})
+    sql = str(compiled)
+    problems = []
+    if connection.dialect.name == 'sqlite':
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+        rows = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + sql, params).fetchall()
+        plan = [row[-1] for row in rows]
+        # 서브쿼리 결과(MATERIALIZE)를 읽는 SCAN 은 그 서브쿼리의 계획에서 이미 확인했으므로 제외
+        derived = {m.group(1) for m in map(_SQLITE_MATERIALIZE.match, plan) if m}
+        for line in plan:
+            full_scan = _SQLITE_FULL_SCAN.match(line)
+            index_scan = _SQLITE_INDEX_SCAN.match(line)
+            temp_sort = _SQLITE_TEMP_SORT.match(line)
+            if full_scan and full_scan.group(1) not in derived:
+                problems.append((FULL_SCAN, full_scan.group(1)))
+            elif index_scan:
+                problems.append((INDEX_SCAN, f'{index_scan.group(1)} ({index_scan.group(2)})'))
+            elif temp_sort:
+                problems.append((TEMP_SORT, temp_sort.group(1)))
+    else:
+        # 테이블이 작을 때 순차 스캔을 고르지 않도록 끄고, 그래도 남는 Seq Scan 과 Sort 노드를 잡음
+        connection.exec_driver_sql('SET LOCAL enable_seqscan = off')
+        rows = connection.execute(db.text('EXPLAIN ' + sql), compiled.params).fetchall()
+        plan = [row[0] for row in rows]
+        for line in plan:
+            full_scan = _PG_FULL_SCAN.search(line)
+            sort = _PG_SORT.match(line)
+            if full_scan:
+                problems.append((FULL_SCAN, full_scan.group(1)))
+            elif sort:
+                problems.append((TEMP_SORT, sort.group(1)))
+    return plan, problems
+
+
+@click.command('check-query-plans')
+@click.option('--verbose', '-v', is_flag=True, help='Print every query plan.')
+@with_appcontext
+def check_query_plans(verbose):
+    """Fail if a route query scans a whole table or index, or sorts in a temp B-tree, unless allowed."""
+    failures = 0
+    with db.engine.connect() as connection:
+        with connection.begin():
+            for name, query, *allowed in _route_queries():
+                allowed = set(allowed[0]) if allowed else set()
+                statement = getattr(query, 'statement', query)
+                plan, problems = _explain(connection, statement)
+                unexpected = [(kind, target) for kind, target in problems if kind not in allowed]
+                if unexpected:
+                    status = '; '.join(f'{kind.upper()}: {target}' for kind, target in unexpected)
+                elif problems:
+                    status = 'ok (allowed: ' + ', '.join(sorted({kind for kind, _ in problems})) + ')'
+                else:
+                    status = 'ok'
+                click.echo(f'{name}: {status}')
+                if verbose or unexpected:
+                    for line in plan:
+                        click.echo(f'    {line}')
+                failures += bool(unexpected)
+
+    if failures:
+        click.echo(f'{failures} queries use a full scan or temp sort that is not allowed.', err=True)
+        sys.exit(1)
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+@click.command('bench-password-hash')
+@click.option('--hashes', default=16, show_default=True, help='Concurrent login hashes per run.')
+@click.option('--tick-ms', default=5.0, show_default=True, help='Event-loop probe interval.')
+@with_appcontext
+def bench_password_hash(hashes, tick_ms):
+    """Compare event-loop latency with inline bcrypt vs. the hashing pool (eventlet)."""
+    import eventlet
+
+    interval = tick_ms / 1000
+    password_hash = password_hasher.hash('benchmark-password')
+
+    for label, mode in (('inline', None), ('pool', 'eventlet')):
+        hasher = PasswordHasher()
+        hasher.rounds = password_hasher.rounds
+        hasher.async_mode = mode
+        lags = []
+        running = [True]
+
+        # 채팅 연결 대신 일정 간격으로 깨어나는 그린스레드로 이벤트 루프 지연 측정
+        def probe():
+            while running[0]:
+                start = time.perf_counter()
+                eventlet.sleep(interval)
+                lags.append((time.perf_counter() - start - interval) * 1000)
+
+        probe_thread = eventlet.spawn(probe)
+        eventlet.sleep(interval)
+        pool = eventlet.GreenPool(hashes)
+        start = time.perf_counter()
+        for _ in range(hashes):
+            pool.spawn(hasher.verify, password_hash, 'benchmark-password')
+        pool.waitall()
+        elapsed = time.perf_counter() - start
+        running[0] = False
+        probe_thread.wait()
+
+        click.echo(f'{label:>6}: {hashes} verifies in {elapsed:.2f}s, '
+                   f'loop lag p50={_percentile(lags, 50):.1f}ms '
+                   f'p99={_percentile(lags, 99):.1f}ms max={max(lags or [0]):.1f}ms')
+
+
+# 실제 서버에 붙는 Socket.IO 클라이언트용 로그인 세션 쿠키 (1:1 채팅 이벤트는 로그인한 참여자만 처리)
+def _login_cookie(app):
+    user_id = (db.session.query(User.id).filter(User.is_active.isnot(False))
+               .order_by(User.id).limit(1).scalar())
+    if user_id is None:
+        raise click.ClickException('An active user is required (run `flask seed-data`).')
+    serializer = app.session_interface.get_signing_serializer(app)
+    session = serializer.dumps({'_user_id': str(user_id), '_fresh': True})
+    return user_id, f"{app.config['SESSION_COOKIE_NAME']}={session}"
+
+
+def _fanout_server(port):
+    from app import create_app, socketio
+
+    import logging
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    os.environ.pop('FLASK_RUN_FROM_CLI', None)  # flask CLI 아래에서도 서버가 실제로 뜨도록
+    app = create_app()
+    socketio.run(app, host='127.0.0.1', port=port, debug=False, use_reloader=False, log_output=False)
+
+
+def _wait_for_port(port, timeout=20):
+    import socket
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+
+@click.command('check-socketio-fanout')
+@click.option('--workers', default=3, show_default=True, help='Worker processes to start.')
+@click.option('--base-port', default=5100, show_default=True, help='Port of the first worker.')
+@click.option('--queue-url', default='filesystem://', show_default=True, help='Message queue URL shared by the workers.')
+@with_appcontext
+def check_socketio_fanout(workers, base_port, queue_url):
+    """Check that room messages and broadcasts reach clients on every worker."""
+    import socketio as python_socketio
+
+    user_id, cookie = _login_cookie(current_app)
+    room = f'room_{user_id}_{user_id}'
+
+    os.environ['SOCKETIO_MESSAGE_QUEUE'] = queue_url
+    os.environ['SOCKETIO_ASYNC_MODE'] = 'threading'
+    os.environ.setdefault('SOCKETIO_QUEUE_FOLDER', tempfile.mkdtemp(prefix='socketio-queue-'))
+
+    context = multiprocessing.get_context('spawn')
+    ports = [base_port + i for i in range(workers)]
+    servers = [context.Process(target=_fanout_server, args=(port,), daemon=True) for port in ports]
+    for server in servers:
+        server.start()
+
+    clients, received = [], {}
+    try:
+        if not all(_wait_for_port(port) for port in ports):
+            raise click.ClickException('Workers did not start.')
+
+        # 워커마다 클라이언트 하나씩 같은 방에 접속
+        for index, port in enumerate(ports):
+            client = python_socketio.Client()
+            received[index] = []
+            client.on('receive_message', lambda data, index=index: received[index].append(data))
+            client.connect(f'http://127.0.0.1:{port}', headers={'Cookie': cookie}, transports=['polling'])
+            client.emit('join', {'room': room})
+            clients.append(client)
+        time.sleep(1)  # 큐 리스너 구독 대기
+
+        clients[0].emit('send_message', {'room': room, 'message': 'fan-out'})
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline and not all(received.values()):
+            time.sleep(0.1)
+    finally:
+        for client in clients:
+            client.disconnect()
+        for server in servers:
+            server.terminate()
+
+    for index in range(workers):
+        click.echo(f'worker-{index} (port {ports[index]}): {"received" if received.get(index) else "MISSING"}')
+    if not all(received.get(index) for index in range(workers)):
+        sys.exit(1)
+
+
+@click.command('bench-public-chat')
+@click.option('--clients', default=500, show_default=True, help='Connected public chat clients.')
+@click.option('--messages', default=500, show_default=True, help='Messages published per run.')
+@click.option('--rate', default=1000, show_default=True, help='Published messages per second.')
+@click.option('--batch-ms', default=30, show_default=True, help='Batch window for the batched run.')
+@with_appcontext
+def bench_public_chat(clients, messages, rate, batch_ms):
+    """Compare public chat fan-out with and without broadcast batching."""
+    from flask import current_app
+    from app import socketio
+    from app.chat_batch import public_batcher
+
+    test_clients = [socketio.test_client(current_app) for _ in range(clients)]
+    server = socketio.server
+    original_send = server._send_packet
+    stats = {'packets': 0, 'latencies': []}
+
+    # 실제 소켓 대신 패킷 인코딩까지만 수행하며 전송 수와 지연 기록
+    def measure_send(eio_sid, pkt):
+        pkt.encode()
+        stats['packets'] += 1
+        if pkt.data and pkt.data[0] in ('public_message', 'public_messages'):
+            now = time.perf_counter()
+            payload = pkt.data[1]
+            for message in payload if isinstance(payload, list) else [payload]:
+                stats['latencies'].append((now - message['sent_at']) * 1000)
+
+    server._send_packet = measure_send
+    original_window = public_batcher.window
+    try:
+        for label, window in (('unbatched', 0), (f'batched {batch_ms}ms', batch_ms / 1000)):
+            public_batcher.window = window
+            stats['packets'], stats['latencies'] = 0, []
+            start = time.perf_counter()
+            for i in range(messages):
+                public_batcher.publish({'username': 'bench', 'message': f'message {i}',
+                                        'sent_at': time.perf_counter()})
+                socketio.sleep(1 / rate)
+            socketio.sleep(window * 2)
+            public_batcher.flush()
+            elapsed = time.perf_counter() - start
+
+            latencies = stats['latencies']
+            click.echo(f'{label:>14}: {stats["packets"]} packets in {elapsed:.2f}s '
+                       f'({stats["packets"] / elapsed:,.0f} packets/s), '
+                       f'fan-out latency p50={_percentile(latencies, 50):.1f}ms '
+                       f'p99={_percentile(latencies, 99):.1f}ms')
+    finally:
+        public_batcher.window = original_window
+        server._send_packet = original_send
+        for client in test_clients:
+            client.disconnect()
+
+
+# 동시 구매 벤치마크용 작업 DB 로 엔진을 잠시 교체 (Flask-SQLAlchemy 는 URI 가 바뀌면 엔진을 새로 만듦)
+# 작업 DB 에는 복제본이 없으므로 읽기도 모두 작업 DB 로 (replica 를 주면 복제본 bind 로 사용)
+def _use_database(app, url, replica=None):
+    app.config['SQLALCHEMY_DATABASE_URI'] = url
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = database.engine_options(app.config)
+    app.config['SQLALCHEMY_BINDS'] = {database.REPLICA_BIND: replica} if replica else None
+    db.session.remove()
+
+
+@click.command('bench-purchases')
+@click.option('--buyers', default=16, show_default=True, help='Concurrent buyer threads.')
+@click.option('--posts', default=200, show_default=True, help='Products on sale.')
+@click.option('--attempts', default=50, show_default=True, help='Buy attempts per buyer.')
+@click.option('--database-url', default=None,
+              help='Empty scratch database (tables are created and dropped). Defaults to a temporary SQLite file.')
+@with_appcontext
+def bench_purchases(buyers, posts, attempts, database_url):
+    """Race concurrent buyers over the same products and check for double sells."""
+    app = current_app._get_current_object()
+    original = (app.config['SQLALCHEMY_DATABASE_URI'], app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}),
+                app.config.get('SQLALCHEMY_BINDS'))
+    scratch = None
+    if database_url is None:
+        fd, scratch = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        database_url = f'sqlite:///{scratch}'
+
+    price, starting_balance = 1000, 1000 * attempts
+    _use_database(app, database_url)
+    try:
+        db.create_all()
+        seller = User(username='bench-seller', email='seller@bench.local', password='-')
+        db.session.add(seller)
+        db.session.flush()
+        seller_id = seller.id
+        buyer_ids = []
+        for i in range(buyers):
+            buyer = User(username=f'bench-buyer-{i}', email=f'buyer{i}@bench.local', password='-', balance=0)
+            db.session.add(buyer)
+            db.session.flush()
+            buyer_ids.append(buyer.id)
+            wallet.credit(buyer.id, starting_balance, wallet.CHARGE)
+        db.session.execute(Post.__table__.insert(), [
+            {'title': f'bench product {i}', 'content': '-', 'price': price, 'user_id': seller_id,
+             'date_posted': datetime.utcnow(), 'is_sold': False, 'report_count': 0}
+            for i in range(posts)
+        ])
+        db.session.commit()
+        post_ids = [post_id for post_id, in db.session.query(Post.id)]
+        db.session.remove()
+
+        results = {}
+        results_lock = threading.Lock()
+        barrier = threading.Barrier(buyers)
+
+        def run_buyer(buyer_id):
+            counts = {}
+            rng = random.Random(buyer_id)
+            with app.app_context():
+                barrier.wait()
+                for _ in range(attempts):
+                    try:
+                        result = purchases.buy(rng.choice(post_ids), buyer_id)
+                    except Exception:
+                        db.session.rollback()
+                        result = 'error'
+                    counts[result] = counts.get(result, 0) + 1
+                db.session.remove()
+            with results_lock:
+                for result, count in counts.items():
+                    results[result] = results.get(result, 0) + count
+
+        threads = [threading.Thread(target=run_buyer, args=(buyer_id,)) for buyer_id in buyer_ids]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        total = buyers * attempts
+        reserved = results.get(purchases.RESERVED, 0)
+        conflicts = results.get(purchases.CONFLICT, 0)
+        click.echo(f'{buyers} buyers x {attempts} attempts over {posts} products on {db.engine.dialect.name}')
+        click.echo(f'  {reserved} purchases in {elapsed:.2f}s ({reserved / elapsed:,.0f} purchases/s, '
+                   f'{total / elapsed:,.0f} attempts/s)')
+        click.echo(f'  conflict rate {conflicts / total:.1%}, other results: '
+                   f'{ {k: v for k, v in results.items() if k not in (purchases.RESERVED, purchases.CONFLICT)} }')
+
+        # 불변식: 예약 성공 수 == 구매자가 정해진 상품 수, 구매자별 차감액 == 예약한 상품 가격 합
+        failures = []
+        sold = Post.query.filter(Post.buyer_id.isnot(None)).count()
+        if sold != reserved:
+            failures.append(f'{reserved} successful purchases but {sold} products have a buyer')
+        owned = dict(db.session.query(Post.buyer_id, db.func.count(Post.id))
+                     .filter(Post.buyer_id.isnot(None)).group_by(Post.buyer_id))
+        for buyer_id, balance in db.session.query(User.id, User.balance).filter(User.id.in_(buyer_ids)):
+            if balance != starting_balance - price * owned.get(buyer_id, 0):
+                failures.append(f'buyer {buyer_id} balance {balance} does not match {owned.get(buyer_id, 0)} purchases')
+
+        for post_id, buyer_id in db.session.query(Post.id, Post.buyer_id).filter(Post.buyer_id.isnot(None)).all():
+            purchases.confirm(post_id, buyer_id)
+        seller_balance = db.session.query(User.balance).filter_by(id=seller_id).scalar()
+        if seller_balance != price * sold:
+            failures.append(f'seller balance {seller_balance} != {price * sold} after confirming {sold} purchases')
+        failures.extend(wallet.reconcile())
+
+        if failures:
+            for failure in failures:
+                click.echo(f'  FAIL {failure}', err=True)
+            sys.exit(1)
+        click.echo(f'  OK no double sells; {sold} products sold, balances match the wallet ledger')
+    finally:
+        db.session.remove()
+        if scratch is None:
+            db.drop_all()
+        _use_database(app, original[0])
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = original[1]
+        app.config['SQLALCHEMY_BINDS'] = original[2]
+        if scratch is not None:
+            os.unlink(scratch)
+
+
+@click.command('wallet-checkpoint')
+@with_appcontext
+def wallet_checkpoint():
+    """Snapshot the balance of every wallet whose ledger moved since the last checkpoint."""
+    click.echo(f'{wallet.checkpoint()} wallet snapshots created')
+
+
+@click.command('reconcile-wallets')
+@click.option('--chunk-size', default=wallet.RECONCILE_CHUNK_SIZE, show_default=True, help='Rows fetched per query.')
+@click.option('--limit', default=20, show_default=True, help='Mismatches to print.')
+@with_appcontext
+def reconcile_wallets(chunk_size, limit):
+    """Check the wallet ledger against snapshots and materialized balances."""
+    mismatches = 0
+    for mismatch in wallet.reconcile(chunk_size):
+        mismatches += 1
+        if mismatches <= limit:
+            click.echo(f'MISMATCH {mismatch}', err=True)
+    if mismatches:
+        click.echo(f'{mismatches} mismatches found', err=True)
+        sys.exit(1)
+    click.echo('OK ledger, snapshots and balances agree')
+
+
+@click.command('run-jobs')
+@click.option('--workers', type=int, default=None, help='Worker processes (default: JOB_WORKERS).')
+@click.option('--poll-interval', type=float, default=None, help='Seconds between polls of an empty queue.')
+@click.option('--burst', is_flag=True, help='Exit once the queue is empty.')
+@with_appcontext
+def run_jobs(workers, poll_interval, burst):
+    """Run background job workers (auto-moderation, account deletion)."""
+    import logging
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(process)d %(levelname)s %(name)s: %(message)s')
+    app = current_app._get_current_object()
+    jobs.run_workers(app, workers or app.config['JOB_WORKERS'], poll_interval, burst)
+
+
+@click.command('job-stats')
+@click.option('--failed', 'failed_limit', default=10, show_default=True, help='Recent failed jobs to print.')
+@with_appcontext
+def job_stats(failed_limit):
+    """Show background job queue depth, lag and recent failures."""
+    stats = jobs.queue_stats()
+    click.echo(f"queued {stats['queued']}, running {stats['running']}, failed {stats['failed']}, "
+               f"lag {stats['lag_seconds']:.1f}s")
+    failed = (Job.query.filter(Job.status == jobs.FAILED)
+              .order_by(Job.finished_at.desc()).limit(failed_limit).all())
+    for job in failed:
+        click.echo(f'  #{job.id} {job.kind} {job.payload} after {job.attempts} attempts: {job.last_error}')
+
+
+@click.command('retry-failed-jobs')
+@click.option('--kind', default=None, help='Only jobs of this kind.')
+@with_appcontext
+def retry_failed_jobs(kind):
+    """Put failed background jobs back on the queue with a fresh retry budget."""
+    click.echo(f'{jobs.retry_failed(kind)} failed jobs requeued')
+
+
+BENCH_JOB = 'bench.job'
+
+
+# bench-job-queue 용 작업 - work_ms 만큼 걸리는 부수 효과 흉내
+@jobs.handler(BENCH_JOB)
+def _bench_job(work_ms):
+    time.sleep(work_ms / 1000)
+
+
+@click.command('bench-job-queue')
+@click.option('--jobs', 'job_count', default=500, show_default=True, help='Jobs enqueued.')
+@click.option('--rate', default=200, show_default=True, help='Jobs enqueued per second.')
+@click.option('--workers', default=2, show_default=True, help='Worker processes.')
+@click.option('--work-ms', default=5.0, show_default=True, help='Time each job takes.')
+@click.option('--database-url', default=None,
+              help='Empty scratch database (tables are created and dropped). Defaults to a temporary SQLite file.')
+@with_appcontext
+def bench_job_queue(job_count, rate, workers, work_ms, database_url):
+    """Measure enqueue cost, throughput and queue lag of the background job workers."""
+    app = current_app._get_current_object()
+    original = (app.config['SQLALCHEMY_DATABASE_URI'], app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}),
+                app.config.get('SQLALCHEMY_BINDS'))
+    scratch = None
+    if database_url is None:
+        fd, scratch = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        database_url = f'sqlite:///{scratch}'
+
+    _use_database(app, database_url)
+    processes = []
+    try:
+        db.create_all()
+        db.session.remove()
+        db.engine.dispose()
+        context = multiprocessing.get_context('fork')
+        processes = [context.Process(target=jobs.run_workers, args=(app, 1, 0.05)) for _ in range(workers)]
+        for process in processes:
+            process.start()
+
+        # 요청처럼 작업마다 등록 + 커밋 - 10 개마다 같은 키로 한 번 더 등록 (무시되어야 함)
+        enqueue_latencies, duplicates = [], 0
+        start = time.perf_counter()
+        for i in range(job_count):
+            time.sleep(max(0.0, start + i / rate - time.perf_counter()))
+            started = time.perf_counter()
+            jobs.enqueue(BENCH_JOB, key=f'bench-{i}', work_ms=work_ms)
+            db.session.commit()
+            enqueue_latencies.append((time.perf_counter() - started) * 1000)
+            if i % 10 == 0:
+                duplicates += jobs.enqueue(BENCH_JOB, key=f'bench-{i}', work_ms=work_ms)
+                db.session.commit()
+        while Job.query.filter(Job.status != jobs.DONE).count() and time.perf_counter() - start < job_count / rate + 60:
+            db.session.rollback()
+            time.sleep(0.05)
+        elapsed = time.perf_counter() - start
+
+        rows = db.session.query(Job.status, Job.created_at, Job.finished_at, Job.attempts).all()
+        lags = [(finished - created).total_seconds() * 1000 for status, created, finished, _ in rows if finished]
+        click.echo(f'{job_count} jobs at {rate}/s, {workers} workers, {work_ms:g}ms each on {db.engine.dialect.name}')
+        click.echo(f'  enqueue + commit: p50={_percentile(enqueue_latencies, 50):.2f}ms '
+                   f'p99={_percentile(enqueue_latencies, 99):.2f}ms')
+        click.echo(f'  {len(lags)} done in {elapsed:.2f}s ({len(lags) / elapsed:,.0f} jobs/s), enqueue to done: '
+                   f'p50={_percentile(lags, 50):.0f}ms p99={_percentile(lags, 99):.0f}ms max={max(lags, default=0):.0f}ms')
+
+        failures = []
+        if duplicates:
+            failures.append(f'{duplicates} jobs enqueued twice with the same idempotency key')
+        if len(rows) != job_count:
+            failures.append(f'{len(rows)} job rows for {job_count} keys')
+        not_done = [status for status, _, _, _ in rows if status != jobs.DONE]
+        if not_done:
+            failures.append(f'{len(not_done)} jobs not done: {sorted(set(not_done))}')
+        retried = sum(1 for _, _, _, attempts in rows if attempts != 1)
+        if retried:
+            failures.append(f'{retried} jobs claimed more than once')
+        if failures:
+            for failure in failures:
+                click.echo(f'  FAIL {failure}', err=True)
+            sys.exit(1)
+        click.echo('  OK every job ran exactly once, duplicate keys ignored')
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+        db.session.remove()
+        if scratch is None:
+            db.drop_all()
+        _use_database(app, original[0])
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = original[1]
+        app.config['SQLALCHEMY_BINDS'] = original[2]
+        if scratch is not None:
+            os.unlink(scratch)
+
+
+@click.command('seed-data')
+@click.option('--users', default=1000, show_default=True)
+@click.option('--posts', default=10000, show_default=True)
+@click.option('--chats', default=20000, show_default=True)
+@click.option('--reports', default=2000, show_default=True)
+@click.option('--password', default='password', show_default=True, help='Password of every seeded user.')
+@click.option('--seed', 'rng_seed', type=int, default=None, help='Random seed for a reproducible dataset.')
+@click.option('--chunk-size', default=1000, show_default=True, help='Rows per bulk INSERT.')
+@with_appcontext
+def seed_data(users, posts, chats, reports, password, rng_seed, chunk_size):
+    """Bulk-insert a synthetic dataset into the configured database."""
+    from app.seed import seed
+    start = time.perf_counter()
+    seed(users, posts, chats, reports, password, rng_seed, chunk_size, log=click.echo)
+    click.echo(f'seeded in {time.perf_counter() - start:.1f}s')
+
+
+@click.command('load-test')
+@click.option('--users', default=8, show_default=True, help='Concurrent virtual users.')
+@click.option('--iterations', default=20, show_default=True, help='Search/buy/chat rounds per user.')
+@click.option('--base-url', default=None, help='Running server to drive (default: in-process test clients).')
+@click.option('--seed', 'rng_seed', type=int, default=None, help='Random seed for the scenarios.')
+@with_appcontext
+def load_test(users, iterations, base_url, rng_seed):
+    """Drive register/login, search, product pages, buy/confirm and chat events concurrently."""
+    from app import loadtest
+    stats, elapsed, failures = loadtest.run(current_app._get_current_object(), base_url, users, iterations, rng_seed)
+
+    click.echo(f'{users} users x {iterations} iterations in {elapsed:.2f}s '
+               f'against {base_url or "in-process test clients"}')
+    click.echo(f'{"endpoint":<28}{"count":>7}{"errors":>8}{"req/s":>9}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}')
+    for name, count, errors, throughput, p50, p95, p99 in sorted(stats.rows(elapsed)):
+        click.echo(f'{name:<28}{count:>7}{errors:>8}{throughput:>9.1f}{p50:>9.1f}{p95:>9.1f}{p99:>9.1f}')
+    for failure in failures:
+        click.echo(f'FAIL {failure}', err=True)
+    if failures:
+        sys.exit(1)
+
+
+def _seller(username):
+    seller = User.query.filter_by(username=username).first()
+    if seller is None:
+        raise click.BadParameter(f'no user named {username!r}', param_hint='--seller')
+    return seller
+
+
+@click.command('import-products')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--seller', required=True, help='Username that will own the products.')
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), default=None,
+              help='Input format (default: from the file extension).')
+@click.option('--chunk-size', default=product_io.IMPORT_CHUNK_SIZE, show_default=True, help='Rows per bulk INSERT.')
+@with_appcontext
+def import_products(path, seller, fmt, chunk_size):
+    """Bulk-create products from a CSV or JSONL file."""
+    seller = _seller(seller)
+    with open(path, 'rb') as stream:
+        result = product_io.import_products(seller.id, stream, fmt or product_io.detect_format(path), chunk_size)
+    for line_number, message in result.errors:
+        click.echo(f'line {line_number}: {message}', err=True)
+    click.echo(f'{result.created} products imported, {result.failed} rows rejected')
+    if result.failed:
+        sys.exit(1)
+
+
+@click.command('export-products')
+@click.option('--seller', required=True, help='Username whose products are exported.')
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), default='jsonl', show_default=True)
+@click.option('--output', '-o', type=click.File('w', encoding='utf-8'), default='-', help='Output file (default: stdout).')
+@with_appcontext
+def export_products(seller, fmt, output):
+    """Stream a seller's products as CSV or JSONL."""
+    for chunk in product_io.export_products(_seller(seller).id, fmt):
+        output.write(chunk)
+
+
+# check-query-budgets 시나리오 - (로그인 사용자, 메서드, 경로, 폼 데이터)
+# 관리자 요청은 정지/삭제를 하므로 마지막에 실행
+def _budget_scenario(seller, buyer, other, other_name, post_id, other_post_id, target_post_id):
+    anonymous = [
+        (None, 'GET', '/', None),
+        (None, 'GET', '/register', None),
+        (None, 'POST', '/register', {'username': 'budget-new', 'email': 'budget-new@example.com',
+                                     'password': 'password', 'confirm_password': 'password'}),
+        (None, 'GET', '/login', None),
+        (None, 'GET', '/search?keyword=bike', None),
+        (None, 'GET', '/search/suggest?q=bi', None),
+        (None, 'GET', f'/search/suggest?q=@{other_name[:2]}', None),
+    ]
+    as_seller = [
+        ('GET', '/profile', None),
+        ('GET', '/profile?per_page=100', None),
+        ('GET', f'/profile/{other}', None),
+        ('GET', '/settings', None),
+        ('POST', '/settings', {'email-email': 'budget-seller@example.com', 'email-submit': 'y'}),
+        ('GET', '/charge_wallet', None),
+        ('POST', '/charge_wallet', {'amount': 1000}),
+        ('GET', '/create', None),
+        ('POST', '/create', {'title': 'budget lamp', 'content': 'query budget check', 'price': 1000}),
+        ('GET', '/products/import', None),
+        ('POST', '/products/import', {'file': (io.BytesIO(b'title,content,price\nbudget desk,oak,2000\n'
+                                                          b'budget chair,pine,1500\n,missing title,10\n'),
+                                               'products.csv')}),
+        ('GET', '/products/export?format=csv', None),
+        ('GET', f'/product/{post_id}', None),
+        ('GET', f'/product/{post_id}/edit', None),
+        ('POST', f'/product/{post_id}/edit', {'title': 'budget lamp v2', 'content': 'edited', 'price': 1200}),
+        ('GET', '/search?keyword=bike&sort_by=relevance', None),
+        ('GET', '/search?keyword=bike&sort_by=latest&per_page=100', None),
+        ('GET', '/search?keyword=lamp&sort_by=price_asc', None),
+        ('POST', '/search', {'keyword': 'car', 'sort_by': 'price_desc'}),
+        ('GET', f'/search?keyword=@{other_name}', None),
+        ('GET', '/change_password', None),
+        ('POST', '/change_password', {'current_password': 'wrong-password', 'new_password': 'password2',
+                                      'confirm_new_password': 'password2'}),
+        ('POST', f'/report/user/{other}', None),
+        ('POST', f'/report/post/{other_post_id}', None),
+        ('POST', f'/product/{post_id}/delete', None),
+    ]
+    as_buyer = [
+        ('POST', '/charge_wallet', {'amount': 10 ** 6}),
+        ('POST', f'/product/{target_post_id}/buy', None),
+        ('POST', f'/product/{target_post_id}/confirm', None),
+        ('POST', f'/product/{target_post_id}/delete', None),
+        ('POST', '/delete_account', None),
+        ('GET', '/logout', None),
+    ]
+    as_admin = [
+        ('GET', '/admin/dashboard', None),
+        ('GET', '/admin/reports', None),
+        ('GET', '/admin/reports?sort=count_asc&per_page=100', None),
+        ('GET', '/admin/metrics', None),
+        ('GET', '/admin/cache_stats', None),
+        ('POST', f'/admin/suspend_user/{other}', None),
+        ('POST', f'/admin/deactivate_user/{other}', None),
+        ('POST', f'/admin/ban_user/{other}', None),
+        ('POST', f'/admin/delete_post/{other_post_id}', None),
+    ]
+    return (anonymous + [(seller, *step) for step in as_seller] + [(buyer, *step) for step in as_buyer]
+            + [('admin', *step) for step in as_admin])
+
+
+@click.command('check-query-budgets')
+@click.option('--database-url', default=None,
+              help='Migrated scratch database to use. Defaults to a temporary copy of the configured SQLite database.')
+@click.option('--verbose', '-v', is_flag=True, help='Print the query count of every request.')
+@with_appcontext
+def check_query_budgets(database_url, verbose):
+    """Exercise every route with the N+1 detector on and check the per-route query budgets."""
+    from app import query_audit
+    from app.seed import seed
+    app = current_app._get_current_object()
+    original = {key: app.config.get(key) for key in
+                ('SQLALCHEMY_DATABASE_URI', 'SQLALCHEMY_ENGINE_OPTIONS', 'SQLALCHEMY_BINDS',
+                 'WTF_CSRF_ENABLED', 'QUERY_BUDGET_STRICT')}
+    scratch = None
+    if database_url is None:
+        if db.engine.dialect.name != 'sqlite':
+            raise click.UsageError('--database-url is required when the configured database is not SQLite')
+        fd, scratch = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        database.sqlite_backup(db.engine.url.database, scratch)
+        database_url = f'sqlite:///{scratch}'
+
+    if 'query_audit' not in app.extensions:
+        app.config['QUERY_AUDIT'] = True
+        query_audit.init_app(app)
+    reports_log = app.extensions['query_audit']
+    app.config.update(WTF_CSRF_ENABLED=False, QUERY_BUDGET_STRICT=False)
+    _use_database(app, database_url)
+    try:
+        password = 'password'
+        seed(users=20, posts=200, chats=50, reports=40, password=password, rng_seed=1, log=lambda message: None)
+        admin = User.query.filter_by(username='admin').first()
+        if admin is None:
+            admin = User(username='admin', email='admin@example.com', password='-')
+            db.session.add(admin)
+        admin.password = password_hasher.hash(password)
+        # 상품이 가장 많은 시드 사용자 (프로필/내보내기 목록이 한 페이지를 넘도록)
+        seller_id, = (db.session.query(Post.user_id).join(User, User.id == Post.user_id)
+                      .filter(User.username.like('user%')).group_by(Post.user_id)
+                      .order_by(db.func.count(Post.id).desc()).first())
+        seller = db.session.get(User, seller_id)
+        others = [user for user in User.query.filter(User.username.like('user%'), User.id != seller_id)
+                  .order_by(User.id.desc()).limit(2)]
+        buyer, other = others
+        post = Post(title='budget lamp', content='query budget check', price=1000, user_id=seller_id)
+        other_post = Post(title='budget reported', content='-', price=1000, user_id=other.id)
+        target_post = Post(title='budget target', content='-', price=1000, user_id=seller_id)
+        db.session.add_all([post, other_post, target_post])
+        db.session.commit()
+        clients = {}
+        for name in ('admin', seller.username, buyer.username):
+            clients[name] = app.test_client()
+            clients[name].post('/login', data={'username': name, 'password': password})
+        clients[None] = app.test_client()
+
+        reports_log.clear()
+        errors = []
+        for username, method, path, data in _budget_scenario(seller.username, buyer.username, other.id, other.username,
+                                                             post.id, other_post.id, target_post.id):
+            # CLI 앱 컨텍스트가 요청 사이에 유지되므로 세션(identity map)을 요청마다 비움
+            db.session.remove()
+            response = clients[username].open(path, method=method, data=data)
+            response.get_data()  # 스트리밍 응답도 끝까지 소비
+            if response.status_code >= 500:
+                errors.append(f'{method} {path} -> {response.status_code}')
+
+        exercised, failures = set(), list(errors)
+        for report in reports_log:
+            exercised.add(report.endpoint)
+            status = 'OVER' if report.over_budget else 'ok'
+            if verbose or report.over_budget or report.repeats:
+                click.echo(f'{status:<5}{report.used if report.used is not None else report.queries:>4} / '
+                           f'{report.budget if report.budget is not None else "-":<4}{report.method:<5}{report.path}')
+            if report.over_budget:
+                failures.append(f'{report.method} {report.path}: {report.used} queries, budget {report.budget}')
+            for count, location, statement in report.repeats:
+                click.echo(f'      N+1? {count}x from {location}: {" ".join(statement.split())[:120]}')
+                failures.append(f'{report.method} {report.path}: {count} identical statements from {location}')
+
+        # 라우트 목록 대조 - 예산이 없는 라우트, 시나리오가 닿지 않는 라우트
+        for endpoint, view in sorted(app.view_functions.items()):
+            if endpoint.split('.')[0] not in ('user_bp', 'product_bp', 'admin_bp'):
+                continue
+            if getattr(view, 'query_budget', None) is None:
+                failures.append(f'{endpoint} has no @query_budget')
+            elif endpoint not in exercised:
+                click.echo(f'skip {endpoint} (not reachable by the scenario)')
+        for failure in failures:
+            click.echo(f'FAIL {failure}', err=True)
+        if failures:
+            sys.exit(1)
+        click.echo(f'OK {len(reports_log)} requests within their query budgets, no repeated statements')
+    finally:
+        db.session.remove()
+        _use_database(app, original['SQLALCHEMY_DATABASE_URI'])
+        app.config.update(original)
+        if scratch is not None:
+            os.unlink(scratch)
+
+
+def _sqlite_path(url, option):
+    url = make_url(url)
+    if url.get_backend_name() != 'sqlite' or not url.database or url.database == ':memory:':
+        raise click.UsageError(f'{option} must be an SQLite file database')
+    return url.database
+
+
+@click.command('sync-replica')
+@with_appcontext
+def sync_replica():
+    """Copy the primary SQLite database into the SQLite stand-in replica."""
+    if not database.replica_enabled(current_app):
+        raise click.UsageError('DATABASE_REPLICA_URL is not set')
+    replica = db.get_engine(current_app, bind=database.REPLICA_BIND)
+    primary_path = _sqlite_path(db.engine.url, 'DATABASE_URL')
+    replica_path = _sqlite_path(replica.url, 'DATABASE_REPLICA_URL')
+    # 복제본 풀에 열린 연결이 있으면 백업 중 잠금에 걸리므로 먼저 닫음
+    replica.dispose()
+    database.sqlite_backup(primary_path, replica_path)
+    click.echo(f'{primary_path} -> {replica_path}')
+
+
+@click.command('check-replica-routing')
+@with_appcontext
+def check_replica_routing():
+    """Check replica routing and read-your-writes stickiness on a scratch primary/replica SQLite pair."""
+    app = current_app._get_current_object()
+    if db.engine.dialect.name != 'sqlite':
+        raise click.UsageError('the check copies the configured SQLite database')
+    original = {key: app.config.get(key) for key in
+                ('SQLALCHEMY_DATABASE_URI', 'SQLALCHEMY_ENGINE_OPTIONS', 'SQLALCHEMY_BINDS', 'WTF_CSRF_ENABLED')}
+    scratch = []
+    for _ in range(2):
+        fd, path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        scratch.append(path)
+    primary_path, replica_path = scratch
+    database.sqlite_backup(db.engine.url.database, primary_path)
+
+    # 문장마다 실행된 DB 파일 기록
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append('replica' if conn.engine.url.database == replica_path else 'primary')
+
+    app.config['WTF_CSRF_ENABLED'] = False
+    _use_database(app, f'sqlite:///{primary_path}', f'sqlite:///{replica_path}')
+    event.listen(Engine, 'before_cursor_execute', record)
+    try:
+        password = 'password'
+        hashed = password_hasher.hash(password)
+        writer = User(username='replica-writer', email='replica-writer@example.com', password=hashed)
+        reader = User(username='replica-reader', email='replica-reader@example.com', password=hashed)
+        db.session.add_all([writer, reader])
+        db.session.commit()
+        db.session.remove()
+        db.get_engine(app, bind=database.REPLICA_BIND).dispose()
+        database.sqlite_backup(primary_path, replica_path)
+
+        clients = {}
+        for name in ('replica-writer', 'replica-reader'):
+            clients[name] = app.test_client()
+            clients[name].post('/login', data={'username': name, 'password': password})
+
+        def get(name, path):
+            db.session.remove()
+            del executed[:]
+            status = clients[name].get(path).status_code
+            return status, set(executed)
+
+        failures = []
+
+        def expect(label, actual, expected):
+            ok = actual == expected
+            click.echo(f'{"ok" if ok else "FAIL":<5}{label}: {actual}')
+            if not ok:
+                failures.append(f'{label}: expected {expected}, got {actual}')
+
+        db.session.remove()
+        clients['replica-writer'].post('/create', data={'title': 'replica check', 'content': '-', 'price': 1000})
+        post_id = db.session.query(db.func.max(Post.id)).scalar()
+        # 작성자는 sticky 기간 동안 primary 에서 읽어 방금 만든 상품을 봄
+        expect('writer reads own write', get('replica-writer', f'/product/{post_id}'), (200, {'primary'}))
+        # 다른 사용자는 복제본에서 읽으므로 복제 전에는 보이지 않음
+        expect('reader before sync', get('replica-reader', f'/product/{post_id}'), (404, {'replica'}))
+        db.get_engine(app, bind=database.REPLICA_BIND).dispose()
+        database.sqlite_backup(primary_path, replica_path)
+        expect('reader after sync', get('replica-reader', f'/product/{post_id}'), (200, {'replica'}))
+        # sticky 기간이 지나면 작성자도 복제본으로
+        with clients['replica-writer'].session_transaction() as session:
+            session[database.STICKY_SESSION_KEY] = 0
+        expect('writer after sticky window', get('replica-writer', f'/product/{post_id}'), (200, {'replica'}))
+
+        if failures:
+            sys.exit(1)
+        click.echo('OK reads go to the replica, writes and read-your-writes to the primary')
+    finally:
+        event.remove(Engine, 'before_cursor_execute', record)
+        db.session.remove()
+        db.get_engine(app, bind=database.REPLICA_BIND).dispose()
+        _use_database(app, original['SQLALCHEMY_DATABASE_URI'])
+        app.config.update(original)
+        for path in scratch:
+            os.unlink(path)
+
+
+# 워커 모델별 서버(serve.py)를 별도 프로세스로 띄워 측정 (eventlet/gevent 는 프로세스 시작 시 monkey patch 필요)
+def _start_server(mode, port, connections):
+    env = dict(os.environ, SOCKETIO_ASYNC_MODE=mode, SERVER_HOST='127.0.0.1', SERVER_PORT=str(port),
+               SERVER_WORKERS='1', SERVER_WORKER_CONNECTIONS=str(connections), SOCKETIO_MESSAGE_QUEUE='',
+               DATABASE_URL=current_app.config['SQLALCHEMY_DATABASE_URI'])
+    script = os.path.join(os.path.dirname(current_app.root_path), 'serve.py')
+    return subprocess.Popen([sys.executable, script], env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def _bench_http(stats, base_url, clients, requests_per_client):
+    import requests
+
+    def run():
+        session = requests.Session()
+        for _ in range(requests_per_client):
+            started = time.perf_counter()
+            try:
+                ok = session.get(base_url + '/', timeout=30).status_code == 200
+            except requests.RequestException:
+                ok = False
+            stats.record('http', started, ok)
+
+    threads = [threading.Thread(target=run) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+BENCH_ROOM_OFFSET = 1000000
+
+
+# 모든 클라이언트가 동시에 연결을 유지한 상태에서 join -> status 왕복까지 확인
+def _bench_sockets(stats, base_url, sockets):
+    import socketio as python_socketio
+
+    # 같은 사용자로 연결하되 방은 소켓마다 따로 (join 상태 메시지가 다른 소켓으로 퍼지지 않도록)
+    user_id, cookie = _login_cookie(current_app)
+
+    connected = []
+    lock = threading.Lock()
+    ready, joined = threading.Barrier(sockets + 1), threading.Barrier(sockets + 1)
+    done = threading.Event()
+
+    def run(index):
+        client = python_socketio.Client(reconnection=False)
+        status = threading.Event()
+        client.on('status', lambda data: status.set())
+        started = time.perf_counter()
+        try:
+            client.connect(base_url, headers={'Cookie': cookie}, wait_timeout=10)
+            stats.record('socket connect', started, True)
+        except Exception:
+            stats.record('socket connect', started, False)
+            ready.wait()
+            joined.wait()
+            return
+        with lock:
+            connected.append(client)
+        ready.wait()
+        started = time.perf_counter()
+        client.emit('join', {'room': f'room_{user_id}_{BENCH_ROOM_OFFSET + index}'})
+        stats.record('socket join', started, status.wait(10))
+        joined.wait()
+        done.wait()
+        client.disconnect()
+
+    threads = [threading.Thread(target=run, args=(index,), daemon=True) for index in range(sockets)]
+    for thread in threads:
+        thread.start()
+    ready.wait()
+    held = sum(client.connected for client in connected)
+    joined.wait()
+    done.set()
+    for thread in threads:
+        thread.join(15)
+    return held
+
+
+@click.command('bench-worker-models')
+@click.option('--modes', default='eventlet,gevent,threading', show_default=True, help='Worker models to compare.')
+@click.option('--port', default=5400, show_default=True, help='Port of the benchmark server.')
+@click.option('--http-clients', default=200, show_default=True, help='Concurrent HTTP clients.')
+@click.option('--requests', 'requests_per_client', default=10, show_default=True, help='GET / requests per HTTP client.')
+@click.option('--sockets', default=300, show_default=True, help='Socket.IO connections held at once.')
+@click.option('--connections', default=0, show_default=True,
+              help='Worker connection limit for every model (0: per-model default).')
+@with_appcontext
+def bench_worker_models(modes, port, http_clients, requests_per_client, sockets, connections):
+    """Compare concurrent HTTP and Socket.IO connection capacity of the eventlet, gevent and threading workers."""
+    from app.loadtest import LoadStats
+    from app.server import DEFAULT_CONNECTIONS
+
+    click.echo(f'{"mode":<10}{"limit":>6}{"http req/s":>12}{"p50 ms":>9}{"p99 ms":>9}{"errors":>8}'
+               f'{"sockets":>12}{"connect p99":>13}{"join p99":>10}{"drain s":>9}')
+    for mode in modes.split(','):
+        mode = mode.strip()
+        if mode not in DEFAULT_CONNECTIONS:
+            raise click.BadParameter(f'unknown worker model {mode!r}', param_hint='--modes')
+        if mode != 'threading':
+            try:
+                __import__(mode)
+            except ImportError:
+                click.echo(f'{mode:<10}skipped ({mode} is not installed)')
+                continue
+
+        # 이전 서버가 아직 drain 중이면 그 서버를 측정하게 되므로 확인
+        if _wait_for_port(port, timeout=1):
+            raise click.ClickException(f'Port {port} is already in use.')
+        server = _start_server(mode, port, connections)
+        base_url = f'http://127.0.0.1:{port}'
+        try:
+            if not _wait_for_port(port):
+                raise click.ClickException(f'{mode} server did not start.')
+            stats = LoadStats()
+            elapsed = _bench_http(stats, base_url, http_clients, requests_per_client)
+            held = _bench_sockets(stats, base_url, sockets)
+            started = time.perf_counter()
+            server.send_signal(signal.SIGTERM)
+            server.wait(60)
+            drain = time.perf_counter() - started
+        finally:
+            if server.poll() is None:
+                server.kill()
+                server.wait()
+
+        http = stats.latencies.get('http', [])
+        click.echo(f'{mode:<10}{connections or DEFAULT_CONNECTIONS[mode]:>6}{len(http) / elapsed:>12,.0f}'
+                   f'{_percentile(http, 50):>9.1f}{_percentile(http, 99):>9.1f}{stats.errors.get("http", 0):>8}'
+                   f'{f"{held}/{sockets}":>12}{_percentile(stats.latencies.get("socket connect", []), 99):>13.1f}'
+                   f'{_percentile(stats.latencies.get("socket join", []), 99):>10.1f}{drain:>9.2f}')
+
+
+@click.command('compile-templates')
+@click.option('--keep', is_flag=True, help='Keep existing bytecode files instead of clearing the cache first.')
+@with_appcontext
+def compile_templates(keep):
+    """Precompile every Jinja template into the bytecode cache (run at build time)."""
+    app = current_app._get_current_object()
+    env = app.jinja_env
+    if env.bytecode_cache is None:
+        raise click.ClickException('JINJA_BYTECODE_CACHE_DIR is not set.')
+    if not keep:
+        env.bytecode_cache.clear()
+
+    # 앱 시작 시 미리 로드한 템플릿을 비워 실제로 컴파일되도록 함
+    env.cache.clear()
+    start = time.perf_counter()
+    count, errors = template_cache.load_templates(app)
+    compiled = (time.perf_counter() - start) * 1000
+    # 새 워커가 시작할 때처럼 바이트코드 캐시에서 다시 로드
+    env.cache.clear()
+    start = time.perf_counter()
+    template_cache.load_templates(app)
+    loaded = (time.perf_counter() - start) * 1000
+
+    for name, error in errors:
+        click.echo(f'FAIL {name}: {error}', err=True)
+    click.echo(f'{count - len(errors)} templates compiled into {env.bytecode_cache.directory} in {compiled:.1f}ms '
+               f'(loading them from the cache takes {loaded:.1f}ms)')
+    if errors:
+        sys.exit(1)
+
+
+@click.command('bench-suggest')
+@click.option('--titles', default=1000000, show_default=True, help='Product titles in the index.')
+@click.option('--queries', default=20000, show_default=True, help='Prefix lookups to time.')
+@click.option('--updates', default=2000, show_default=True, help='Incremental add/remove pairs to time.')
+@click.option('--seed', 'rng_seed', type=int, default=0, show_default=True, help='Random seed for titles and prefixes.')
+@with_appcontext
+def bench_suggest(titles, queries, updates, rng_seed):
+    """Measure memory, build time and lookup latency of the suggestion prefix index."""
+    import string
+    import tracemalloc
+    from app.seed import ADJECTIVES, NOUNS
+    from app.suggest import PrefixIndex
+
+    limit = current_app.config['SUGGEST_LIMIT']
+
+    # 형용사 + 명사 + 모델명(임의 5글자) - seed-data 제목보다 서로 다른 접두어가 많음
+    def rows(rng):
+        for item_id in range(1, titles + 1):
+            model = ''.join(rng.choices(string.ascii_lowercase, k=5))
+            yield item_id, f'{rng.choice(ADJECTIVES).title()} {rng.choice(NOUNS)} {model}'
+
+    for words in sorted({1, current_app.config['SUGGEST_TITLE_WORDS']}):
+        # 메모리는 색인이 보관하는 제목 문자열까지 포함
+        index = PrefixIndex(max_words=words)
+        tracemalloc.start()
+        index.load(rows(random.Random(rng_seed)))
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        index = PrefixIndex(max_words=words)
+        start = time.perf_counter()
+        index.load(rows(random.Random(rng_seed)))
+        build = time.perf_counter() - start
+
+        rng = random.Random(rng_seed + 1)
+        prefixes = []
+        for _ in range(queries):
+            title_words = index._values[rng.randint(1, titles)].split()
+            word = rng.randrange(min(words, len(title_words)))
+            text = ' '.join(title_words[word:])
+            prefixes.append(text[:rng.randint(1, min(len(text), 10))])
+        latencies, matches = [], 0
+        for prefix in prefixes:
+            started = time.perf_counter()
+            matches += len(index.search(prefix, limit))
+            latencies.append((time.perf_counter() - started) * 1e6)
+
+        update_latencies = []
+        for offset in range(updates):
+            item_id = titles + 1 + offset
+            started = time.perf_counter()
+            index.add(item_id, f'Bench update {offset}')
+            index.remove(item_id)
+            update_latencies.append((time.perf_counter() - started) * 1e6)
+
+        click.echo(f'{titles:,} titles, {words} word position(s) per title: {index.key_count:,} keys, '
+                   f'{memory / 2 ** 20:,.0f} MiB, built in {build:.2f}s')
+        click.echo(f'  lookup (limit {limit}): p50={_percentile(latencies, 50):.1f}us '
+                   f'p99={_percentile(latencies, 99):.1f}us max={max(latencies):.1f}us, '
+                   f'{len(prefixes) / (sum(latencies) / 1e6):,.0f} lookups/s, {matches / len(prefixes):.1f} matches avg')
+        click.echo(f'  add + remove: p50={_percentile(update_latencies, 50):.1f}us '
+                   f'p99={_percentile(update_latencies, 99):.1f}us')
+
+
+def register_commands(app):
+    app.cli.add_command(check_query_plans)
+    app.cli.add_command(bench_password_hash)
+    app.cli.add_command(check_socketio_fanout)
+    app.cli.add_command(bench_public_chat)
+    app.cli.add_command(bench_purchases)
+    app.cli.add_command(wallet_checkpoint)
+    app.cli.add_command(reconcile_wallets)
+    app.cli.add_command(run_jobs)
+    app.cli.add_command(job_stats)
+    app.cli.add_command(retry_failed_jobs)
+    app.cli.add_command(bench_job_queue)
+    app.cli.add_command(seed_data)
+    app.cli.add_command(load_test)
+    app.cli.add_command(import_products)
+    app.cli.add_command(export_products)
+    app.cli.add_command(check_query_budgets)
+    app.cli.add_command(sync_replica)
+    app.cli.add_command(check_replica_routing)
+    app.cli.add_command(bench_worker_models)
+    app.cli.add_command(compile_templates)
+    app.cli.add_command(bench_suggest)
@@ -6,3 +6,93 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///site.db')  # DB 연결 문자열
     SQLALCHEMY_TRACK_MODIFICATIONS = False  # 성능 개선을 위한 설정
 
+    # DB 엔진 프로필 (URI 로 선택) - 서버 DB(PostgreSQL 등) 와 SQLite 파일 DB 모두 커넥션 풀 사용
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 20))
+    DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))  # 서버 DB 전용 (초)
+    # 읽기 복제본 (선택) - GET/HEAD 요청의 SELECT 를 보냄
+    # 쓰기 후 REPLICA_STICKY_SECONDS 동안은 그 사용자의 읽기도 primary 에서 (복제 지연보다 길게)
+    SQLALCHEMY_REPLICA_URI = os.getenv('DATABASE_REPLICA_URL') or None
+    REPLICA_STICKY_SECONDS = float(os.getenv('REPLICA_STICKY_SECONDS', 5))
+    # SQLite 연결마다 적용하는 PRAGMA
+    SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+
+    # 목록 페이지네이션 (keyset) 페이지 크기
+    PAGE_SIZE = int(os.getenv('PAGE_SIZE', 20))
+    MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', 100))
+
+    # user_loader 캐시 (최대 사용자 수, 유지 시간(초)) - 다른 프로세스의 정지/삭제는 CACHE_SYNC_INTERVAL 안에 무효화
+    IDENTITY_CACHE_SIZE = int(os.getenv('IDENTITY_CACHE_SIZE', 1024))
+    IDENTITY_CACHE_TTL = float(os.getenv('IDENTITY_CACHE_TTL', 30))
+
+    # 개발용 쿼리 점검 - 한 요청 안에서 같은 SQL 이 N 번 이상 반복되면 경고 (N+1 의심)
+    # 라우트별 쿼리 예산 초과 시 STRICT 면 예외, 아니면 경고 로그
+    QUERY_AUDIT = os.getenv('QUERY_AUDIT', '0') == '1'
+    QUERY_REPEAT_THRESHOLD = int(os.getenv('QUERY_REPEAT_THRESHOLD', 3))
+    QUERY_BUDGET_STRICT = os.getenv('QUERY_BUDGET_STRICT', '1') == '1'
+
+    # 검색 결과 캐시 (최대 항목 수, 유지 시간(초) - 다른 워커의 변경은 이 시간 안에 반영)
+    SEARCH_CACHE_SIZE = int(os.getenv('SEARCH_CACHE_SIZE', 512))
+    SEARCH_CACHE_TTL = float(os.getenv('SEARCH_CACHE_TTL', 60))
+    # 검색 가격 구간 경계 (원) - 0~1만, 1만~3만, ..., 100만 이상
+    SEARCH_PRICE_BUCKETS = [int(bound) for bound in
+                            os.getenv('SEARCH_PRICE_BUCKETS', '10000,30000,50000,100000,300000,1000000').split(',')]
+
+    # 비밀번호 해시 cost (변경 시 다음 로그인 때 자동 재해시) 및 해시 스레드 수
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 4))
+
+    # 채팅 기록 write-behind 버퍼 (N 개 또는 T ms 마다 bulk insert)
+    CHAT_FLUSH_SIZE = int(os.getenv('CHAT_FLUSH_SIZE', 100))
+    CHAT_FLUSH_INTERVAL_MS = int(os.getenv('CHAT_FLUSH_INTERVAL_MS', 200))
+    CHAT_BUFFER_MAX = int(os.getenv('CHAT_BUFFER_MAX', 10000))
+
+    # Socket.IO 비동기 모드 (eventlet / gevent / threading, 없으면 자동 선택)
+    SOCKETIO_ASYNC_MODE = os.getenv('SOCKETIO_ASYNC_MODE') or None
+    # 다중 워커용 메시지 큐 (예: redis://localhost:6379/0, amqp://..., filesystem://)
+    SOCKETIO_MESSAGE_QUEUE = os.getenv('SOCKETIO_MESSAGE_QUEUE') or None
+    SOCKETIO_CHANNEL = os.getenv('SOCKETIO_CHANNEL', 'secure-trade')
+    SOCKETIO_QUEUE_FOLDER = os.getenv('SOCKETIO_QUEUE_FOLDER', os.path.join(os.getcwd(), 'socketio-queue'))
+
+    # 운영 서버 (serve.py) - 워커 모델은 SOCKETIO_ASYNC_MODE, 워커 i 는 SERVER_PORT + i 에서 실행
+    SERVER_HOST = os.getenv('SERVER_HOST', '0.0.0.0')
+    SERVER_PORT = int(os.getenv('SERVER_PORT', 5000))
+    SERVER_WORKERS = int(os.getenv('SERVER_WORKERS', 1))
+    # 워커당 동시 연결 수 (0 이면 모델별 기본값: eventlet/gevent 1000, threading 100)
+    SERVER_WORKER_CONNECTIONS = int(os.getenv('SERVER_WORKER_CONNECTIONS', 0))
+    # SIGTERM 후 진행 중인 요청을 기다리는 최대 시간 (초)
+    SERVER_DRAIN_TIMEOUT = float(os.getenv('SERVER_DRAIN_TIMEOUT', 30))
+
+    # 공용 채팅 브로드캐스트 묶음 전송 창 (ms, 0 이면 메시지마다 바로 전송, 20~50 권장)
+    PUBLIC_CHAT_BATCH_MS = int(os.getenv('PUBLIC_CHAT_BATCH_MS', 0))
+
+    # Jinja 바이트코드 캐시 디렉터리 (워커끼리 공유, 빈 값이면 사용 안 함) / 시작 시 모든 템플릿 미리 로드
+    JINJA_BYTECODE_CACHE_DIR = os.getenv('JINJA_BYTECODE_CACHE_DIR', os.path.join(os.getcwd(), 'jinja-cache'))
+    JINJA_WARM_TEMPLATES = os.getenv('JINJA_WARM_TEMPLATES', '1') == '1'
+
+    # 검색어 자동완성 색인 (/search/suggest) - 결과 수 / 제목에서 시작 위치로 색인할 단어 수
+    # 다른 워커에서 추가된 글은 REFRESH 초마다 반영 (0 이면 같은 프로세스의 변경만, cache sync 폴러가 실행)
+    SUGGEST_LIMIT = int(os.getenv('SUGGEST_LIMIT', 10))
+    SUGGEST_TITLE_WORDS = int(os.getenv('SUGGEST_TITLE_WORDS', 3))
+    SUGGEST_REFRESH_SECONDS = float(os.getenv('SUGGEST_REFRESH_SECONDS', 60))
+    SUGGEST_BUILD_ON_STARTUP = os.getenv('SUGGEST_BUILD_ON_STARTUP', '1') == '1'
+
+    # 프로세스 간 캐시 무효화 (사용자 정지/삭제, 상품 삭제/제목 변경) - 웹 워커가 INTERVAL 초마다 기록을 읽음 (0 이면 끔)
+    # 기록은 작업 워커가 RETENTION 초 뒤에 삭제
+    CACHE_SYNC_INTERVAL = float(os.getenv('CACHE_SYNC_INTERVAL', 1))
+    CACHE_SYNC_RETENTION_SECONDS = float(os.getenv('CACHE_SYNC_RETENTION_SECONDS', 3600))
+
+    # 백그라운드 작업 큐 (flask run-jobs) - 자동 정지/삭제, 탈퇴 처리
+    # 실패하면 BASE 초부터 시도마다 2배씩 (최대 MAX 초) 기다렸다가 재시도, MAX_ATTEMPTS 번 실패하면 failed
+    JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 5))
+    JOB_RETRY_BASE_SECONDS = float(os.getenv('JOB_RETRY_BASE_SECONDS', 10))
+    JOB_RETRY_MAX_SECONDS = float(os.getenv('JOB_RETRY_MAX_SECONDS', 600))
+    JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', 1))
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', 1))
+    # 처리 중 상태로 이 시간(초)이 지나면 워커가 죽은 것으로 보고 다시 실행 / 완료 작업(멱등성 키) 보관 시간
+    JOB_LOCK_TIMEOUT = float(os.getenv('JOB_LOCK_TIMEOUT', 300))
+    JOB_RETENTION_HOURS = float(os.getenv('JOB_RETENTION_HOURS', 168))
@@ -0,0 +1,140 @@
+import sqlite3
+import time
+from flask import current_app, g, request, session, has_request_context
+from flask_sqlalchemy import SQLAlchemy, SignallingSession
+from sqlalchemy import event, orm
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.sql.expression import Select, UpdateBase
+
+REPLICA_BIND = 'replica'
+READ_METHODS = ('GET', 'HEAD')
+# 쓰기 후 이 시각(epoch 초)까지는 같은 브라우저의 읽기도 primary 에서 (read-your-writes)
+STICKY_SESSION_KEY = 'db_primary_until'
+
+# 연결마다 실행할 PRAGMA (init_app 에서 설정값으로 채움)
+_sqlite_pragmas = []
+
+
+# 읽기 전용 요청의 SELECT 는 복제본, 그 외(flush, INSERT/UPDATE/DELETE, FOR UPDATE, 요청 밖 작업)는 primary
+# 요청 중 한 번이라도 쓰면 그 뒤의 읽기도 primary 로 보내고 응답에서 sticky 기간을 기록
+class RoutingSession(SignallingSession):
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if has_request_context() and 'db_read_replica' in g:
+            if self._flushing or isinstance(clause, UpdateBase):
+                g.db_read_replica = False
+                g.db_wrote = True
+            elif g.db_read_replica and isinstance(clause, Select) and clause._for_update_arg is None:
+                return self.app.extensions['sqlalchemy'].db.get_engine(self.app, bind=REPLICA_BIND)
+        return super().get_bind(mapper, clause)
+
+
+class RoutingSQLAlchemy(SQLAlchemy):
+    def create_session(self, options):
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
+
+
+def _is_memory(url):
+    return url.database in (None, '', ':memory:')
+
+
+# DB 엔진 프로필 - URI 의 DB 종류에 따라 SQLALCHEMY_ENGINE_OPTIONS 생성
+def engine_options(config):
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() == 'sqlite':
+        if _is_memory(url):
+            return {}  # Flask-SQLAlchemy 가 StaticPool 로 연결 하나를 공유
+        # Flask-SQLAlchemy 기본값(NullPool)은 요청마다 새로 연결해 PRAGMA 도 매번 실행하므로 풀 사용
+        # 풀의 연결은 여러 스레드가 번갈아 쓰므로 check_same_thread 해제
+        return {
+            'poolclass': QueuePool,
+            'pool_size': config['DB_POOL_SIZE'],
+            'max_overflow': config['DB_MAX_OVERFLOW'],
+            'pool_timeout': config['DB_POOL_TIMEOUT'],
+            'connect_args': {'check_same_thread': False, 'timeout': config['SQLITE_BUSY_TIMEOUT_MS'] / 1000},
+        }
+    # PostgreSQL 등 서버 DB - 끊긴 연결은 pre-ping 으로 걸러내고 오래된 연결은 재생성
+    return {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': True,
+    }
+
+
+# WAL: 읽기가 쓰기를 막지 않고 쓰기끼리만 직렬화 / synchronous=NORMAL: WAL 에서는 안전하면서 커밋마다 fsync 하지 않음
+# busy_timeout: 잠금을 바로 'database is locked' 로 실패시키지 않고 대기 / mmap: 읽기를 메모리 매핑으로
+@event.listens_for(Engine, 'connect')
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    for pragma in _sqlite_pragmas:
+        cursor.execute(pragma)
+    cursor.close()
+
+
+def replica_enabled(app):
+    return REPLICA_BIND in (app.config.get('SQLALCHEMY_BINDS') or {})
+
+
+def _before_request():
+    g.db_wrote = False
+    g.db_read_replica = (replica_enabled(current_app) and request.method in READ_METHODS
+                         and session.get(STICKY_SESSION_KEY, 0) < time.time())
+
+
+def _after_request(response):
+    if g.get('db_wrote'):
+        session[STICKY_SESSION_KEY] = time.time() + current_app.config['REPLICA_STICKY_SECONDS']
+    return response
+
+
+# INSERT ... ON CONFLICT DO NOTHING - 새로 들어갔으면 True, 이미 있으면 False
+def insert_ignore(session, model, index_elements, **values):
+    dialect = session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        try:
+            with session.begin_nested():
+                session.execute(model.__table__.insert().values(**values))
+            return True
+        except IntegrityError:
+            return False
+
+    statement = insert(model.__table__).values(**values).on_conflict_do_nothing(index_elements=index_elements)
+    return session.execute(statement).rowcount == 1
+
+
+# SQLite 파일 복사 (온라인 백업 API - WAL 에 남은 변경까지 포함)
+def sqlite_backup(source_path, target_path):
+    source, target = sqlite3.connect(source_path), sqlite3.connect(target_path)
+    try:
+        source.backup(target)
+    finally:
+        source.close()
+        target.close()
+
+
+def init_app(app):
+    config = app.config
+    _sqlite_pragmas[:] = [
+        f"PRAGMA journal_mode={config['SQLITE_JOURNAL_MODE']}",
+        f"PRAGMA synchronous={config['SQLITE_SYNCHRONOUS']}",
+        f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT_MS'])}",
+        f"PRAGMA mmap_size={int(config['SQLITE_MMAP_SIZE'])}",
+    ]
+    # 직접 지정한 옵션이 있으면 그대로 사용 (복제본 bind 에도 같은 옵션이 적용되므로 같은 종류의 DB 를 사용)
+    config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(config))
+
+    if config['SQLALCHEMY_REPLICA_URI']:
+        binds = dict(config.get('SQLALCHEMY_BINDS') or {})
+        binds[REPLICA_BIND] = config['SQLALCHEMY_REPLICA_URI']
+        config['SQLALCHEMY_BINDS'] = binds
+    app.before_request(_before_request)
+    app.after_request(_after_request)
@@ -1,6 +1,7 @@
 from flask_wtf import FlaskForm
+from flask_wtf.file import FileField, FileRequired, FileAllowed
 from wtforms import StringField, PasswordField, IntegerField, SubmitField, TextAreaField,  SelectField
-from wtforms.validators import DataRequired, Length, Email, EqualTo, ValidationError
+from wtforms.validators import DataRequired, Length, Email, EqualTo, ValidationError, NumberRange, Optional
 from app.models import User
 
 class RegistrationForm(FlaskForm):
@@ -38,6 +39,10 @@ class CreateProductForm(FlaskForm):
         if price.data <= 0:
             raise ValidationError('Price must be greater than zero.')
 
+class ImportProductsForm(FlaskForm):
+    file = FileField('CSV or JSONL file', validators=[FileRequired(), FileAllowed(['csv', 'jsonl', 'json'], 'CSV or JSONL only.')])
+    submit = SubmitField('Import')
+
 class UpdateEmailForm(FlaskForm):
     email = StringField('New Email', validators=[DataRequired(), Email()])
     submit = SubmitField('Update Email')
@@ -49,7 +54,7 @@ class UpdatePasswordForm(FlaskForm):
     submit = SubmitField('Update Password')
 
 class ChargeWalletForm(FlaskForm):
-    amount = IntegerField('Amount to charge', validators=[DataRequired()])
+    amount = IntegerField('Amount to charge', validators=[DataRequired(), NumberRange(min=1)])
     submit = SubmitField('Charge Wallet')
 
 class UpdateProfileForm(FlaskForm):
@@ -62,10 +67,20 @@ class DeleteAccountForm(FlaskForm):
 class SearchForm(FlaskForm):
     keyword = StringField('Keyword', validators=[DataRequired()])
     sort_by = SelectField('Sort by', choices=[
+        ('relevance', 'Relevance'),
         ('latest', 'Latest'),
         ('price_asc', 'Price (Low to High)'),
         ('price_desc', 'Price (High to Low)')
     ])
+    # 필터 (값은 SearchFilters.from_args 에서 다시 검증)
+    min_price = IntegerField('Min price', validators=[Optional(), NumberRange(min=0)])
+    max_price = IntegerField('Max price', validators=[Optional(), NumberRange(min=0)])
+    availability = SelectField('Availability', choices=[
+        ('', 'All'),
+        ('available', 'Available'),
+        ('sold', 'Sold')
+    ])
+    seller = StringField('Seller', validators=[Optional(), Length(max=120)])
     submit = SubmitField('Search')
 
 class ReportForm(FlaskForm):
@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+from app import db, cache_sync
+from app.models import User
+
+# 뷰에서 current_user 로 사용하는 필드
+IDENTITY_FIELDS = ('id', 'username', 'email', 'password', 'bio', 'balance', 'is_active', 'updated_at')
+
+
+# user_loader 용 LRU + TTL 캐시 (프로세스 단위)
+# 다른 프로세스(작업 워커의 자동 정지/탈퇴, 다른 웹 워커의 제재)의 is_active/사용자명 변경과 삭제는 cache_sync 로
+# CACHE_SYNC_INTERVAL 초 안에 무효화, 그 밖의 필드(이메일, 소개 등)는 TTL 이 지나야 반영되므로 TTL 은 짧게 유지
+class IdentityCache:
+    def __init__(self, maxsize=1024, ttl=30.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def configure(self, maxsize, ttl):
+        with self._lock:
+            self.maxsize = maxsize
+            self.ttl = ttl
+            self._entries.clear()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, user_id, fields):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, fields)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id):
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+
+identity_cache = IdentityCache()
+
+
+def load_identity(user_id):
+    fields = identity_cache.get(user_id)
+    if fields is None:
+        user = db.session.get(User, user_id)
+        if user is not None:
+            identity_cache.set(user_id, {name: getattr(user, name) for name in IDENTITY_FIELDS})
+        return user
+
+    # 캐시된 값으로 세션에 붙은 User 를 만듦 (SELECT 없이 수정/삭제/지연 로딩 가능)
+    user = User(**fields)
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+
+# ORM 이벤트를 거치지 않는 일괄 UPDATE (잔액 증감 등) 후 호출
+def expire_identity(user_id):
+    identity_cache.invalidate(user_id)
+    db.session.info.setdefault('identity_invalidate', set()).add(user_id)
+
+
+# 사용자 행이 바뀌거나 삭제되면 flush 시점과 commit 직후에 모두 무효화
+# (commit 전에 다른 요청이 이전 값을 다시 캐시하는 경우 방지)
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate_on_write(mapper, connection, target):
+    identity_cache.invalidate(target.id)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('identity_invalidate', set()).add(target.id)
+
+
+# 다른 프로세스에서 커밋된 변경 (cache_sync 폴러가 백그라운드에서 호출)
+@cache_sync.subscribe
+def _invalidate_synced(user_ids, post_ids):
+    for user_id in user_ids:
+        identity_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    for user_id in session.info.pop('identity_invalidate', ()):
+        identity_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop('identity_invalidate', None)
@@ -0,0 +1,288 @@
+import json
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy.exc import SQLAlchemyError
+from app import db, cache_sync
+from app.database import insert_ignore
+from app.models import Job
+
+logger = logging.getLogger(__name__)
+
+# 작업 상태
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+ERROR_LENGTH = 2000
+MAINTENANCE_INTERVAL = 60.0
+STATS_TTL = 1.0
+
+_handlers = {}
+
+
+# 작업 종류별 처리 함수 등록 - 함수는 payload 를 키워드 인자로 받고 커밋하지 않음 (완료 표시와 같은 트랜잭션)
+def handler(kind):
+    def register(func):
+        _handlers[kind] = func
+        return func
+    return register
+
+
+# 호출한 쪽의 트랜잭션에 INSERT - 요청이 커밋해야 작업이 생기고 롤백되면 함께 사라짐
+# 같은 idempotency key 의 작업이 이미 있으면 등록하지 않고 False (완료된 작업은 JOB_RETENTION_HOURS 동안 남음)
+def enqueue(kind, key=None, delay=0, max_attempts=None, **payload):
+    now = datetime.utcnow()
+    values = {
+        'kind': kind,
+        'payload': json.dumps(payload),
+        'idempotency_key': key,
+        'status': QUEUED,
+        'attempts': 0,
+        'max_attempts': max_attempts or current_app.config['JOB_MAX_ATTEMPTS'],
+        'run_at': now + timedelta(seconds=delay),
+        'created_at': now,
+    }
+    if key is None:
+        db.session.execute(Job.__table__.insert().values(**values))
+        return True
+    return insert_ignore(db.session, Job, ['idempotency_key'], **values)
+
+
+# 실행할 작업 하나를 가져옴 - 가장 오래 기다린 작업을 읽은 뒤 조건부 UPDATE 로 RUNNING 으로 바꾼 워커만 성공
+# (SKIP LOCKED 가 없는 SQLite 에서도 동작, 다른 워커가 먼저 가져가면 0 행이므로 다음 작업을 읽음)
+# 대기열이 비었으면 읽기만 하므로 쉬는 워커가 쓰기 잠금을 잡지 않음
+# 반환하는 행의 attempts 는 이번 시도를 포함하지 않은 값
+def claim(worker_id):
+    while True:
+        now = datetime.utcnow()
+        job = (db.session.query(Job.id, Job.kind, Job.payload, Job.attempts, Job.max_attempts, Job.run_at)
+               .filter(Job.status == QUEUED, Job.run_at <= now)
+               .order_by(Job.run_at, Job.id)
+               .first())
+        if job is None:
+            db.session.rollback()
+            return None
+        claimed = (Job.query.filter(Job.id == job.id, Job.status == QUEUED)
+                   .update({Job.status: RUNNING, Job.locked_by: worker_id, Job.locked_at: now,
+                            Job.attempts: Job.attempts + 1}, synchronize_session=False))
+        if claimed:
+            db.session.commit()
+            return job
+        db.session.rollback()
+
+
+def _retry_delay(attempts):
+    config = current_app.config
+    return min(config['JOB_RETRY_BASE_SECONDS'] * 2 ** (attempts - 1), config['JOB_RETRY_MAX_SECONDS'])
+
+
+# 이 워커가 아직 가지고 있는 작업만 상태를 바꿈 (처리가 lock_timeout 을 넘겨 다시 대기열로 간 작업이면 0 행)
+def _finish(job_id, worker_id, values):
+    values.update({Job.locked_by: None, Job.locked_at: None})
+    return (Job.query.filter_by(id=job_id, status=RUNNING, locked_by=worker_id)
+            .update(values, synchronize_session=False))
+
+
+# 처리 함수의 변경과 완료 표시를 한 번에 커밋 - 실패하면 변경을 버리고 재시도 예약 (최대 시도 횟수를 넘으면 failed)
+def run_job(job, worker_id):
+    attempts = job.attempts + 1
+    waited = (datetime.utcnow() - job.run_at).total_seconds()
+    start = time.perf_counter()
+    try:
+        func = _handlers.get(job.kind)
+        if func is None:
+            raise LookupError(f'No handler registered for job kind {job.kind!r}')
+        func(**json.loads(job.payload))
+        if not _finish(job.id, worker_id, {Job.status: DONE, Job.finished_at: datetime.utcnow(), Job.last_error: None}):
+            db.session.rollback()
+            logger.warning('Job %d (%s) was taken over by another worker; result discarded', job.id, job.kind)
+            return False
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.exception('Job %d (%s) failed on attempt %d/%d', job.id, job.kind, attempts, job.max_attempts)
+        values = {Job.last_error: f'{type(e).__name__}: {e}'[:ERROR_LENGTH]}
+        if attempts >= job.max_attempts:
+            values.update({Job.status: FAILED, Job.finished_at: datetime.utcnow()})
+        else:
+            values.update({Job.status: QUEUED, Job.run_at: datetime.utcnow() + timedelta(seconds=_retry_delay(attempts))})
+        _finish(job.id, worker_id, values)
+        db.session.commit()
+        return False
+    logger.info('Job %d (%s) done in %.1fms after waiting %.1fs', job.id, job.kind,
+                (time.perf_counter() - start) * 1000, waited)
+    return True
+
+
+# 처리 중에 워커가 죽은 작업 - locked_at 이 lock_timeout 보다 오래되면 다시 대기열로 (시도 횟수는 이미 올라가 있음)
+def requeue_stale(lock_timeout):
+    now = datetime.utcnow()
+    stale = (Job.status == RUNNING, Job.locked_at < now - timedelta(seconds=lock_timeout))
+    failed = (Job.query.filter(*stale, Job.attempts >= Job.max_attempts)
+              .update({Job.status: FAILED, Job.finished_at: now, Job.last_error: 'Worker lost while running the job',
+                       Job.locked_by: None, Job.locked_at: None}, synchronize_session=False))
+    requeued = (Job.query.filter(*stale)
+                .update({Job.status: QUEUED, Job.run_at: now, Job.locked_by: None, Job.locked_at: None},
+                        synchronize_session=False))
+    db.session.commit()
+    return requeued, failed
+
+
+# 보관 기간이 지난 완료 작업 삭제 (실패한 작업은 retry-failed-jobs / 확인용으로 남김)
+def purge_done(retention_hours):
+    cutoff = datetime.utcnow() - timedelta(hours=retention_hours)
+    deleted = Job.query.filter(Job.status == DONE, Job.finished_at < cutoff).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
+
+
+def retry_failed(kind=None):
+    query = Job.query.filter(Job.status == FAILED)
+    if kind:
+        query = query.filter(Job.kind == kind)
+    retried = query.update({Job.status: QUEUED, Job.attempts: 0, Job.run_at: datetime.utcnow(), Job.finished_at: None},
+                           synchronize_session=False)
+    db.session.commit()
+    return retried
+
+
+# 상태별 개수와 가장 오래 기다린 작업의 대기 시간 - (status, run_at) 인덱스에서 상태마다 범위 조회
+def _read_stats():
+    now = datetime.utcnow()
+    stats = {'queued': 0, 'running': 0, 'failed': 0, 'lag_seconds': 0.0}
+    rows = (db.session.query(Job.status, db.func.count(Job.id), db.func.min(Job.run_at))
+            .filter(Job.status.in_((QUEUED, RUNNING, FAILED)))
+            .group_by(Job.status))
+    for status, count, oldest in rows:
+        stats[status] = count
+        if status == QUEUED:
+            stats['lag_seconds'] = max(0.0, (now - oldest).total_seconds())
+    return stats
+
+
+_stats = {'read_at': 0.0, 'value': None}
+
+
+# 지표 여러 개가 같은 값을 읽으므로 STATS_TTL 초 동안 재사용 (아직 테이블이 없으면 0)
+def queue_stats():
+    if _stats['value'] is None or time.monotonic() - _stats['read_at'] > STATS_TTL:
+        try:
+            _stats['value'] = _read_stats()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.warning('Job queue stats unavailable: %s', e)
+            _stats['value'] = {'queued': 0, 'running': 0, 'failed': 0, 'lag_seconds': 0.0}
+        _stats['read_at'] = time.monotonic()
+    return _stats['value']
+
+
+# 작업 워커 - 대기열이 비면 poll_interval 마다 확인, burst 면 비는 즉시 종료
+# stop() 은 처리 중인 작업을 마친 뒤 멈춤
+class Worker:
+    def __init__(self, app, poll_interval=None, burst=False):
+        config = app.config
+        self.app = app
+        self.poll_interval = config['JOB_POLL_INTERVAL'] if poll_interval is None else poll_interval
+        self.burst = burst
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}'[:64]
+        self.done = 0
+        self.failed = 0
+        self._stopping = threading.Event()
+        self._maintained_at = 0.0
+
+    def stop(self):
+        self._stopping.set()
+
+    def _maintain(self):
+        if time.monotonic() - self._maintained_at < MAINTENANCE_INTERVAL:
+            return
+        self._maintained_at = time.monotonic()
+        config = self.app.config
+        requeued, failed = requeue_stale(config['JOB_LOCK_TIMEOUT'])
+        if requeued or failed:
+            logger.warning('Recovered stale jobs: %d requeued, %d failed', requeued, failed)
+        purge_done(config['JOB_RETENTION_HOURS'])
+        cache_sync.purge(config['CACHE_SYNC_RETENTION_SECONDS'])
+
+    def run(self):
+        with self.app.app_context():
+            try:
+                while not self._stopping.is_set():
+                    self._maintain()
+                    job = claim(self.worker_id)
+                    if job is None:
+                        if self.burst:
+                            break
+                        self._stopping.wait(self.poll_interval)
+                        continue
+                    if run_job(job, self.worker_id):
+                        self.done += 1
+                    else:
+                        self.failed += 1
+            finally:
+                db.session.remove()
+
+
+def _run_worker(app, poll_interval, burst):
+    worker = Worker(app, poll_interval, burst)
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *args: worker.stop())
+    logger.info('Job worker %s started', worker.worker_id)
+    worker.run()
+    logger.info('Job worker %s stopped: %d done, %d failed', worker.worker_id, worker.done, worker.failed)
+    return worker
+
+
+# 작업 워커 프로세스 실행 (flask run-jobs) - 여러 개면 fork 한 뒤 비정상 종료한 워커를 다시 띄움
+def run_workers(app, processes=1, poll_interval=None, burst=False):
+    if processes == 1:
+        _run_worker(app, poll_interval, burst)
+        return
+
+    # fork 된 워커들이 부모의 DB 연결을 나눠 쓰지 않도록 정리
+    with app.app_context():
+        db.engine.dispose()
+    children = set()
+    stopping = []
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _run_worker(app, poll_interval, burst)
+            except BaseException:
+                logger.exception('Job worker failed')
+                code = 1
+            finally:
+                os._exit(code)
+        children.add(pid)
+
+    def stop(signum, frame):
+        if not stopping:
+            stopping.append(signum)
+            for pid in list(children):
+                os.kill(pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for _ in range(processes):
+        spawn()
+    while children:
+        try:
+            pid, status = os.waitpid(-1, 0)
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        children.discard(pid)
+        if status and not stopping:
+            logger.warning('Job worker %d exited (%d); restarting', pid, status)
+            spawn()
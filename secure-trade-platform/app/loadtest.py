@@ -0,0 +1,211 @@
+import random
+import re
+import threading
+import time
+import uuid
+from app.chat_buffer import chat_buffer
+from app.commands import _percentile
+from app.seed import ADJECTIVES, NOUNS
+
+_CSRF_TOKEN = re.compile(r'name="csrf_token" type="hidden" value="([^"]+)"')
+_PRODUCT_LINK = re.compile(r'/product/(\d+)"')
+_CHAT_LINK = re.compile(r'/chat/(\d+)"')
+_CHAT_ROOM = re.compile(r'const room = "(room_\d+_\d+)"')
+SORTS = ['relevance', 'latest', 'price_asc', 'price_desc']
+
+
+# 엔드포인트별 지연시간(ms) / 오류 수 집계
+class LoadStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+
+    def record(self, name, started, ok):
+        elapsed = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.latencies.setdefault(name, []).append(elapsed)
+            if not ok:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+    def rows(self, elapsed):
+        for name, values in self.latencies.items():
+            yield (name, len(values), self.errors.get(name, 0), len(values) / elapsed,
+                   _percentile(values, 50), _percentile(values, 95), _percentile(values, 99))
+
+
+# 같은 시나리오를 앱 내부 test client 또는 실행 중인 서버(requests) 로 실행
+class _AppClient:
+    def __init__(self, app):
+        from app import socketio
+        self.app = app
+        self.client = app.test_client()
+        self._socketio = socketio
+        self.socket = None
+
+    def get(self, path, params=None):
+        response = self.client.get(path, query_string=params)
+        return response.status_code, response.get_data(as_text=True)
+
+    def post(self, path, data=None):
+        return self.client.post(path, data=data).status_code
+
+    def connect(self):
+        self.socket = self._socketio.test_client(self.app, flask_test_client=self.client)
+        return self.socket.is_connected()
+
+    # test client 의 emit 은 핸들러를 동기로 실행하므로 핸들러 처리 시간이 측정됨
+    def emit(self, event, data, reply_event):
+        self.socket.emit(event, data)
+        self.socket.get_received()
+        return True
+
+    def close(self):
+        if self.socket is not None and self.socket.is_connected():
+            self.socket.disconnect()
+
+
+class _HttpClient:
+    def __init__(self, base_url):
+        import requests
+        self.base_url = base_url.rstrip('/')
+        self.session = requests.Session()
+        self.socket = None
+        self._replies = {}
+
+    def get(self, path, params=None):
+        response = self.session.get(self.base_url + path, params=params, allow_redirects=False, timeout=30)
+        return response.status_code, response.text
+
+    def post(self, path, data=None):
+        return self.session.post(self.base_url + path, data=data, allow_redirects=False, timeout=30).status_code
+
+    def connect(self):
+        import socketio as python_socketio
+        self.socket = python_socketio.Client()
+        for event in ('status', 'receive_message', 'public_message', 'public_messages'):
+            self.socket.on(event, lambda *args, event=event: self._reply(event))
+        cookies = '; '.join(f'{name}={value}' for name, value in self.session.cookies.items())
+        self.socket.connect(self.base_url, headers={'Cookie': cookies})
+        return self.socket.connected
+
+    def _reply(self, event):
+        waiter = self._replies.get(event)
+        if waiter is not None:
+            waiter.set()
+
+    # 서버를 거쳐 자신에게 브로드캐스트가 돌아올 때까지의 왕복 시간
+    def emit(self, event, data, reply_event):
+        waiter = self._replies[reply_event] = threading.Event()
+        if reply_event == 'public_message':
+            self._replies['public_messages'] = waiter  # 배치 전송 모드
+        self.socket.emit(event, data)
+        return waiter.wait(5)
+
+    def close(self):
+        if self.socket is not None and self.socket.connected:
+            self.socket.disconnect()
+
+
+def _form(client, stats, name, path, data):
+    _, html = client.get(path)
+    match = _CSRF_TOKEN.search(html)
+    if match:
+        data = dict(data, csrf_token=match.group(1))
+    started = time.perf_counter()
+    status = client.post(path, data)
+    # 폼 검증에 실패하면 200 으로 다시 렌더링되므로 성공은 redirect 로 판단
+    stats.record(name, started, status == 302)
+    return status
+
+
+def _timed_get(client, stats, name, path, params=None):
+    started = time.perf_counter()
+    status, body = client.get(path, params)
+    stats.record(name, started, status < 400)
+    return body
+
+
+# 첫 검색 결과 판매자와의 1:1 채팅방 이름 (join/send 는 방 참여자만 처리됨, 상품이 없으면 None)
+def _seller_chat_room(client):
+    _, body = client.get('/search', {'keyword': ''})
+    product = _PRODUCT_LINK.search(body)
+    if product is None:
+        return None
+    _, body = client.get(f'/product/{product.group(1)}')
+    seller = _CHAT_LINK.search(body)
+    if seller is None:
+        return None
+    _, body = client.get(f'/chat/{seller.group(1)}')
+    room = _CHAT_ROOM.search(body)
+    return room.group(1) if room else None
+
+
+# 가상 사용자 한 명의 시나리오
+# 가입/로그인/충전 -> 반복 (검색 -> 상세 -> 구매 -> 확정 -> 채팅)
+def _virtual_user(client, stats, username, iterations, rng):
+    password = 'load-test-password'
+    _form(client, stats, 'POST /register', '/register',
+          {'username': username, 'email': f'{username}@example.com', 'password': password, 'confirm_password': password})
+    if _form(client, stats, 'POST /login', '/login', {'username': username, 'password': password}) != 302:
+        raise RuntimeError(f'could not log in as {username}')
+    _form(client, stats, 'POST /charge_wallet', '/charge_wallet', {'amount': 10 ** 7})
+
+    room = _seller_chat_room(client)
+
+    started = time.perf_counter()
+    connected = client.connect()
+    stats.record('socketio connect', started, connected)
+    if connected and room:
+        started = time.perf_counter()
+        stats.record('socketio join', started, client.emit('join', {'room': room}, 'status'))
+
+    for _ in range(iterations):
+        keyword = rng.choice(NOUNS) if rng.random() < 0.7 else f'{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}'
+        body = _timed_get(client, stats, 'GET /search', '/search', {'keyword': keyword, 'sort_by': rng.choice(SORTS)})
+        product_ids = _PRODUCT_LINK.findall(body)
+        if product_ids:
+            post_id = rng.choice(product_ids)
+            _timed_get(client, stats, 'GET /product/<id>', f'/product/{post_id}')
+            started = time.perf_counter()
+            stats.record('POST /product/<id>/buy', started, client.post(f'/product/{post_id}/buy') < 400)
+            started = time.perf_counter()
+            stats.record('POST /product/<id>/confirm', started, client.post(f'/product/{post_id}/confirm') < 400)
+
+        if connected and room:
+            started = time.perf_counter()
+            ok = client.emit('send_message', {'room': room, 'message': 'hello'}, 'receive_message')
+            stats.record('socketio send_message', started, ok)
+        if connected:
+            started = time.perf_counter()
+            ok = client.emit('public_message', {'message': f'{username} says hi'}, 'public_message')
+            stats.record('socketio public_message', started, ok)
+    client.close()
+
+
+# 동시 가상 사용자 실행 - base_url 이 없으면 app 의 test client 로 같은 블루프린트를 호출
+def run(app=None, base_url=None, users=8, iterations=20, rng_seed=None):
+    stats = LoadStats()
+    tag = uuid.uuid4().hex[:6]
+    failures = []
+
+    def worker(index):
+        rng = random.Random(None if rng_seed is None else rng_seed + index)
+        client = _HttpClient(base_url) if base_url else _AppClient(app)
+        try:
+            _virtual_user(client, stats, f'lt{tag}_{index}', iterations, rng)
+        except Exception as exc:
+            failures.append(f'user {index}: {exc!r}')
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(users)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    # 채팅 기록을 DB 에 남기고 백그라운드 flush 루프 종료 (CLI 프로세스가 끝나도록)
+    if not base_url:
+        chat_buffer.stop()
+    return stats, elapsed, failures
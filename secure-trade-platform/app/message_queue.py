@@ -0,0 +1,31 @@
+import os
+import socketio as python_socketio
+
+
+# 여러 워커가 방/브로드캐스트를 공유하도록 Socket.IO 메시지 큐 클라이언트 매니저 생성
+# redis://, kafka://, zmq+tcp:// 외에는 Kombu 로 처리 (amqp://, memory://, filesystem:// 등)
+def create_client_manager(config, write_only=False):
+    url = config.get('SOCKETIO_MESSAGE_QUEUE')
+    if not url:
+        return None
+
+    channel = config['SOCKETIO_CHANNEL']
+    if url.startswith(('redis://', 'rediss://')):
+        return python_socketio.RedisManager(url, channel=channel, write_only=write_only)
+    if url.startswith('kafka://'):
+        return python_socketio.KafkaManager(url, channel=channel, write_only=write_only)
+    if url.startswith('zmq'):
+        return python_socketio.ZmqManager(url, channel=channel, write_only=write_only)
+
+    connection_options = {}
+    if url.startswith('filesystem://'):
+        # 로컬 브로커 대용: 같은 디렉터리를 공유하는 워커끼리 메시지 교환
+        folder = config['SOCKETIO_QUEUE_FOLDER']
+        os.makedirs(folder, exist_ok=True)
+        connection_options['transport_options'] = {
+            'data_folder_in': folder,
+            'data_folder_out': folder,
+            'control_folder': folder,
+        }
+    return python_socketio.KombuManager(url, channel=channel, write_only=write_only,
+                                        connection_options=connection_options)
@@ -0,0 +1,235 @@
+import bisect
+import threading
+import time
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Prometheus 기본 버킷 (초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_values=(), amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} counter'
+        with self._lock:
+            values = list(self._values.items())
+        for label_values, value in sorted(values):
+            yield f'{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}'
+
+
+# 누적 버킷 히스토그램 - observe 는 bisect 한 번과 잠금 한 번
+class Histogram:
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_values, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} histogram'
+        with self._lock:
+            snapshot = [(labels, list(counts), total, count) for labels, (counts, total, count) in self._series.items()]
+        for label_values, counts, total, count in sorted(snapshot):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else _format_value(bound)
+                yield f'{self.name}_bucket{_format_labels(self.labels, label_values, [("le", le)])} {cumulative}'
+            yield f'{self.name}_sum{_format_labels(self.labels, label_values)} {_format_value(total)}'
+            yield f'{self.name}_count{_format_labels(self.labels, label_values)} {count}'
+
+
+# 요청 시점에 다른 객체의 값을 읽는 지표 (캐시/버퍼 통계 등)
+# 계속 증가하는 값이면 kind='counter'
+class Gauge:
+    def __init__(self, name, documentation, read, kind='gauge'):
+        self.name = name
+        self.documentation = documentation
+        self.read = read
+        self.kind = kind
+
+    def render(self):
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} {self.kind}'
+        yield f'{self.name} {_format_value(self.read())}'
+
+
+http_requests = Counter('http_requests_total', 'HTTP requests by route and status.',
+                        ('blueprint', 'endpoint', 'method', 'status'))
+http_latency = Histogram('http_request_duration_seconds', 'HTTP request latency by route '
+                         '(sum by blueprint for per-blueprint latency).', ('blueprint', 'endpoint'))
+request_queries = Histogram('http_request_db_queries', 'SQL statements executed per request.',
+                            ('blueprint', 'endpoint'), QUERY_COUNT_BUCKETS)
+request_query_time = Histogram('http_request_db_seconds', 'Time spent in SQL per request.', ('blueprint', 'endpoint'))
+db_statements = Counter('db_statements_total', 'SQL statements executed (including background work).')
+db_statement_time = Histogram('db_statement_duration_seconds', 'SQL statement latency.')
+socketio_events = Counter('socketio_events_total', 'Socket.IO events received by handler.', ('event',))
+socketio_emits = Counter('socketio_emits_total', 'Socket.IO emits (one per emit call, before fan-out).', ('event',))
+
+REGISTRY = [http_requests, http_latency, request_queries, request_query_time,
+            db_statements, db_statement_time, socketio_events, socketio_emits]
+
+
+def register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+
+def render():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+# SQL 계측 - 모든 엔진 (읽기 복제본 포함)
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['metrics_query_start'].pop()
+    db_statements.inc()
+    db_statement_time.observe((), elapsed)
+    if has_request_context() and 'metrics_start' in g:
+        g.metrics_queries += 1
+        g.metrics_query_time += elapsed
+
+
+# 실패한 문장은 after_cursor_execute 가 호출되지 않으므로 시작 시각만 정리
+@event.listens_for(Engine, 'handle_error')
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get('metrics_query_start'):
+        connection.info['metrics_query_start'].pop()
+
+
+def _before_request():
+    g.metrics_start = time.perf_counter()
+    g.metrics_queries = 0
+    g.metrics_query_time = 0.0
+
+
+def _after_request(response):
+    g.metrics_status = response.status_code
+    return response
+
+
+# teardown 에서 기록해야 예외(500) 요청도 포함됨
+def _teardown_request(exc):
+    start = g.pop('metrics_start', None)
+    if start is None:
+        return
+    labels = (request.blueprint or '', request.endpoint or 'unmatched')
+    http_latency.observe(labels, time.perf_counter() - start)
+    http_requests.inc(labels + (request.method, str(g.get('metrics_status', 500))))
+    request_queries.observe(labels, g.metrics_queries)
+    request_query_time.observe(labels, g.metrics_query_time)
+
+
+# Socket.IO 계측 - 등록된 핸들러가 있는 이벤트만 세어 라벨 수가 클라이언트 입력으로 늘어나지 않게 함
+def _instrument_socketio(socketio):
+    if not getattr(socketio, '_metrics_instrumented', False):
+        socketio._metrics_instrumented = True
+        handle_event = socketio._handle_event
+
+        def counted_handle_event(handler, message, namespace, sid, *args):
+            socketio_events.inc((message,))
+            return handle_event(handler, message, namespace, sid, *args)
+        socketio._handle_event = counted_handle_event
+
+    # create_app 마다 init_app 이 서버를 새로 만들므로 서버 단위로 확인
+    server = socketio.server
+    if not getattr(server, '_metrics_instrumented', False):
+        server._metrics_instrumented = True
+        emit = server.emit
+
+        def counted_emit(event_name, *args, **kwargs):
+            socketio_emits.inc((event_name,))
+            return emit(event_name, *args, **kwargs)
+        server.emit = counted_emit
+
+
+def init_app(app):
+    from app import socketio
+    from app.identity import identity_cache
+    from app.search_cache import search_cache
+    from app.chat_buffer import chat_buffer
+    from app.chat_batch import public_batcher
+    from app.jobs import queue_stats
+
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    _instrument_socketio(socketio)
+
+    if not getattr(init_app, '_gauges_registered', False):
+        init_app._gauges_registered = True
+        for prefix, cache in (('identity_cache', identity_cache), ('search_cache', search_cache)):
+            title = prefix.replace('_', ' ').capitalize()
+            for key in ('size', 'hit_ratio'):
+                register(Gauge(f'{prefix}_{key}', f'{title} {key}.', lambda cache=cache, key=key: cache.stats()[key]))
+            for key in ('hits', 'misses', 'evictions', 'invalidations'):
+                register(Gauge(f'{prefix}_{key}_total', f'{title} {key}.',
+                               lambda cache=cache, key=key: cache.stats()[key], kind='counter'))
+        register(Gauge('chat_buffer_pending', 'Chat messages waiting to be written.', lambda: len(chat_buffer._pending)))
+        register(Gauge('chat_buffer_flushed_total', 'Chat messages written by the write-behind buffer.',
+                       lambda: chat_buffer.flushed, kind='counter'))
+        register(Gauge('chat_buffer_dropped_total', 'Chat messages dropped because the buffer was full.',
+                       lambda: chat_buffer.dropped, kind='counter'))
+        register(Gauge('public_chat_frames_total', 'Public chat broadcast frames sent.',
+                       lambda: public_batcher.frames, kind='counter'))
+        register(Gauge('public_chat_messages_total', 'Public chat messages published.',
+                       lambda: public_batcher.messages, kind='counter'))
+        # 작업 큐 - DB 에서 읽으므로 모든 프로세스가 같은 값
+        register(Gauge('job_queue_depth', 'Background jobs waiting to run (including scheduled retries).',
+                       lambda: queue_stats()['queued']))
+        register(Gauge('job_queue_running', 'Background jobs claimed by a worker.', lambda: queue_stats()['running']))
+        register(Gauge('job_queue_failed', 'Background jobs that exhausted their retries.',
+                       lambda: queue_stats()['failed']))
+        register(Gauge('job_queue_lag_seconds', 'Age of the oldest job waiting to run.',
+                       lambda: queue_stats()['lag_seconds']))
@@ -6,11 +6,19 @@ class Post(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
     content = db.Column(db.Text, nullable=False)
-    price = db.Column(db.Integer, nullable=False)
-    date_posted = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    price = db.Column(db.Integer, nullable=False, index=True)
+    date_posted = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    is_sold = db.Column(db.Boolean, default=False)  # ✅ 판매 여부 추가
+    is_sold = db.Column(db.Boolean, default=False, index=True)  # ✅ 판매 여부 추가
     buyer_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)  # ✅ 구매자 ID
+    report_count = db.Column(db.Integer, nullable=False, default=0, server_default='0', index=True)  # 누적 신고 수
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # ETag 버전
+
+    # 판매자별 상품 목록 (user_id 단일 조회도 이 인덱스로 처리) / 검색 facet 집계용 커버링 인덱스
+    # 구매 목록과 '판매 중' 검색의 최신순 페이지 (buyer_id IS NULL 범위를 date_posted 순서로 읽어 정렬 없이 처리)
+    __table_args__ = (db.Index('ix_post_user_id_date_posted', 'user_id', 'date_posted'),
+                      db.Index('ix_post_buyer_id_date_posted', 'buyer_id', 'date_posted'),
+                      db.Index('ix_post_price_is_sold_buyer_id', 'price', 'is_sold', 'buyer_id'))
 
     user = db.relationship('User', foreign_keys=[user_id], back_populates='posts')
     buyer = db.relationship('User', foreign_keys=[buyer_id], backref='purchases')
@@ -23,9 +31,15 @@ class User(db.Model, UserMixin):
     bio = db.Column(db.Text, default='')
     balance = db.Column(db.Integer, default=0)
     is_active = db.Column(db.Boolean, default=True)
+    report_count = db.Column(db.Integer, nullable=False, default=0, server_default='0', index=True)  # 누적 신고 수
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # ETag 버전 (등록 상품 변경 시에도 갱신)
 
     posts = db.relationship('Post', foreign_keys='Post.user_id', back_populates='user', lazy=True)
 
+    @property
+    def is_admin(self):
+        return self.username == 'admin'
+
 class Report(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     reporter_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -40,17 +54,81 @@ class Report(db.Model):
 
 class UserReport(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    reported_user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    reported_user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     reporter_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    # 중복 신고 방지 (INSERT ... ON CONFLICT DO NOTHING 기준)
+    __table_args__ = (db.Index('ix_user_report_reporter_id_reported_user_id', 'reporter_id', 'reported_user_id', unique=True),)
 
 class PostReport(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    post_id = db.Column(db.Integer, db.ForeignKey('post.id'), nullable=False)
+    post_id = db.Column(db.Integer, db.ForeignKey('post.id'), nullable=False, index=True)
     reporter_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     
     __table_args__ = (db.UniqueConstraint('reporter_id', 'post_id', name='unique_post_report'),)
 
     reporter = db.relationship('User', backref='reported_posts')
-    post = db.relationship('Post', backref='reports')
+    post = db.relationship('Post', backref=db.backref('reports', cascade='all, delete-orphan'))  # 게시글 삭제 시 신고도 삭제
+
+class ChatMessage(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    room = db.Column(db.String(64), nullable=False)  # room_{a}_{b} 또는 public
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    username = db.Column(db.String(120), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    # 방별 기록 페이지네이션 (room, timestamp, id)
+    __table_args__ = (db.Index('ix_chat_message_room_timestamp', 'room', 'timestamp'),)
+
+# 지갑 원장 - INSERT 만 하는 거래 기록 (잔액은 User.balance 에 같은 트랜잭션으로 반영)
+# 탈퇴/삭제된 사용자·상품의 기록도 남기기 위해 FK 없이 id 만 저장
+class WalletTransaction(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    kind = db.Column(db.String(16), nullable=False)  # opening / charge / purchase / sale / refund
+    amount = db.Column(db.Integer, nullable=False)  # 입금 +, 출금 -
+    balance_after = db.Column(db.Integer, nullable=False)
+    post_id = db.Column(db.Integer, nullable=True)
+    timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (db.Index('ix_wallet_transaction_user_id_id', 'user_id', 'id'),)
+
+# 원장 체크포인트 - transaction_id 까지 반영한 잔액 (감사 시 이후 거래만 재생)
+class WalletSnapshot(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    transaction_id = db.Column(db.Integer, nullable=False, index=True)
+    balance = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (db.Index('ix_wallet_snapshot_user_id_transaction_id', 'user_id', 'transaction_id', unique=True),)
+
+# 백그라운드 작업 큐 (app/jobs.py) - 요청 트랜잭션 안에서 INSERT 하고 `flask run-jobs` 워커가 처리
+class Job(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(64), nullable=False)
+    payload = db.Column(db.Text, nullable=False, default='{}')  # JSON 키워드 인자
+    idempotency_key = db.Column(db.String(128), nullable=True, unique=True)  # 같은 키는 한 번만 등록
+    status = db.Column(db.String(16), nullable=False, default='queued')  # queued / running / done / failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # 재시도 시 다음 실행 시각
+    locked_by = db.Column(db.String(64), nullable=True)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    # 실행할 작업 선택 / 상태별 개수와 대기 시간 (status, run_at)
+    __table_args__ = (db.Index('ix_job_status_run_at', 'status', 'run_at'),)
+
+
+# 프로세스 간 캐시 무효화 기록 (app/cache_sync.py) - 커밋된 사용자/상품 변경을 웹 워커들이 읽어 감
+class CacheInvalidation(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(16), nullable=False)  # user / post
+    target_id = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
@@ -0,0 +1,93 @@
+import base64
+import json
+from datetime import datetime
+from flask import abort, current_app, request
+from sqlalchemy import tuple_
+
+
+class KeysetPage:
+    def __init__(self, items, next_cursor, per_page):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.per_page = per_page
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __bool__(self):
+        return bool(self.items)
+
+
+def encode_cursor(sort_value, row_id):
+    if isinstance(sort_value, datetime):
+        sort_value = {'dt': sort_value.isoformat()}
+    raw = json.dumps([sort_value, row_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if isinstance(sort_value, dict):
+            sort_value = datetime.fromisoformat(sort_value['dt'])
+        return sort_value, int(row_id)
+    except (ValueError, TypeError, KeyError):
+        abort(400)  # 조작되었거나 깨진 커서
+
+
+def get_page_size(arg_name='per_page'):
+    default = current_app.config['PAGE_SIZE']
+    maximum = current_app.config['MAX_PAGE_SIZE']
+    per_page = request.args.get(arg_name, default, type=int)
+    return max(1, min(per_page, maximum))
+
+
+# 커서 이후 per_page + 1 개 행을 읽는 쿼리 (다음 페이지 존재 여부 확인용으로 한 행 더 읽음)
+# (정렬 키, id) 행 값 비교라 인덱스 범위 검색으로 처리됨
+def keyset_query(query, sort_column, id_column, cursor=None, per_page=None, descending=True):
+    per_page = per_page or current_app.config['PAGE_SIZE']
+
+    if cursor:
+        last_value, last_id = decode_cursor(cursor)
+        key = tuple_(sort_column, id_column)
+        last_key = tuple_(last_value, last_id)
+        query = query.filter(key < last_key if descending else key > last_key)
+
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+    return query.add_columns(sort_column, id_column).limit(per_page + 1)
+
+
+# (정렬 키, id) 기준 keyset 페이지네이션
+# OFFSET 없이 마지막 행의 키 다음부터 읽기 때문에 몇 번째 페이지든 비용이 같음
+def keyset_paginate(query, sort_column, id_column, cursor=None, per_page=None, descending=True):
+    per_page = per_page or current_app.config['PAGE_SIZE']
+    rows = keyset_query(query, sort_column, id_column, cursor, per_page, descending).all()
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(rows[-1][-2], rows[-1][-1])
+    return KeysetPage([row[0] for row in rows], next_cursor, per_page)
+
+
+# id 순으로 chunk_size 개씩 나눠 읽는 순회 (내보내기/대조처럼 전체를 훑을 때)
+# 결과 전체를 메모리에 올리거나 커서를 오래 열어 두지 않음
+def iter_by_id(query, id_column, chunk_size):
+    last_id = None
+    while True:
+        chunk = query if last_id is None else query.filter(id_column > last_id)
+        rows = chunk.order_by(id_column).limit(chunk_size).all()
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        last_id = getattr(rows[-1], id_column.key)
@@ -0,0 +1,46 @@
+from concurrent.futures import ThreadPoolExecutor
+from app import bcrypt, socketio
+
+
+# bcrypt 해시/검증을 요청 워커 밖(네이티브 스레드)에서 실행
+# eventlet/gevent 에서는 허브의 OS 스레드 풀을 사용해 이벤트 루프(채팅 연결)가 멈추지 않게 함
+# bcrypt 는 해시 중 GIL 을 놓기 때문에 스레드 풀로 충분함
+class PasswordHasher:
+    def __init__(self):
+        self.rounds = 12
+        self.async_mode = None
+        self._executor = None
+
+    def init_app(self, app):
+        self.rounds = app.config['BCRYPT_LOG_ROUNDS']
+        self.async_mode = socketio.async_mode
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=app.config['PASSWORD_HASH_WORKERS'],
+                                                thread_name_prefix='password-hash')
+
+    def _run(self, func, *args):
+        if self.async_mode == 'eventlet':
+            from eventlet import tpool
+            return tpool.execute(func, *args)
+        if self.async_mode == 'gevent':
+            import gevent
+            return gevent.get_hub().threadpool.apply(func, args)
+        if self._executor is None:
+            return func(*args)
+        return self._executor.submit(func, *args).result()
+
+    def hash(self, password):
+        return self._run(bcrypt.generate_password_hash, password, self.rounds).decode('utf-8')
+
+    def verify(self, password_hash, password):
+        return self._run(bcrypt.check_password_hash, password_hash, password)
+
+    # 저장된 해시의 cost 가 현재 설정과 다르면 재해시 필요 ($2b$12$...)
+    def needs_rehash(self, password_hash):
+        try:
+            return int(password_hash.split('$')[2]) != self.rounds
+        except (AttributeError, IndexError, ValueError):
+            return True
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,156 @@
+import codecs
+import csv
+import io
+import json
+from datetime import datetime
+from werkzeug.datastructures import MultiDict
+from app import db
+from app.models import User, Post
+from app.forms import CreateProductForm
+from app.identity import expire_identity
+from app.pagination import iter_by_id
+
+IMPORT_CHUNK_SIZE = 500
+EXPORT_CHUNK_SIZE = 500
+EXPORT_FIELDS = ('id', 'title', 'content', 'price', 'is_sold', 'date_posted')
+MAX_REPORTED_ERRORS = 1000
+# 업로드 파일 인코딩 - UTF-8(BOM 포함) 우선, 아니면 Excel 이 저장한 한글 CSV 의 CP949
+IMPORT_ENCODINGS = ('utf-8-sig', 'cp949')
+ENCODING_CHECK_CHUNK_SIZE = 64 * 1024
+
+
+def detect_format(filename):
+    return 'csv' if (filename or '').lower().endswith('.csv') else 'jsonl'
+
+
+# 등록 전에 파일 전체를 chunk 단위로 디코딩해 보고 되감음 (중간의 깨진 바이트 때문에 앞부분만 커밋되지 않도록)
+# (인코딩, None) 또는 어느 인코딩으로도 읽을 수 없으면 (None, UTF-8 기준 첫 오류 줄 번호)
+def _detect_encoding(stream):
+    start = stream.tell()
+    error_line = None
+    for encoding in IMPORT_ENCODINGS:
+        decoder = codecs.getincrementaldecoder(encoding)()
+        line_number = 1
+        try:
+            for chunk in iter(lambda: stream.read(ENCODING_CHECK_CHUNK_SIZE), b''):
+                try:
+                    decoder.decode(chunk)
+                except UnicodeDecodeError as exc:
+                    # exc.start 는 이전 chunk 에서 넘어와 버퍼에 남은 바이트를 포함한 위치
+                    line_number += chunk[:max(exc.start - len(decoder.getstate()[0]), 0)].count(b'\n')
+                    raise
+                line_number += chunk.count(b'\n')
+            decoder.decode(b'', final=True)
+            return encoding, None
+        except UnicodeDecodeError:
+            error_line = error_line or line_number
+        finally:
+            stream.seek(start)
+    return None, error_line
+
+
+# (줄 번호, 행 dict 또는 None, 파싱 오류) 를 한 줄씩 반환 - 파일 전체를 읽어 두지 않음
+def _read_rows(stream, fmt, encoding):
+    # 업로드 파일(SpooledTemporaryFile)도 줄 단위로 디코딩
+    text = codecs.iterdecode(stream, encoding)
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row, None
+        return
+
+    for line_number, line in enumerate(text, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield line_number, None, f'invalid JSON: {exc}'
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, 'each line must be a JSON object'
+            continue
+        yield line_number, row, None
+
+
+# 상품 등록 폼과 같은 검증 (제목 길이, 내용 필수, validate_price) 을 그대로 사용
+def _validate(row):
+    data = MultiDict({name: '' if row.get(name) is None else str(row.get(name))
+                      for name in ('title', 'content', 'price')})
+    form = CreateProductForm(formdata=data, meta={'csrf': False})
+    if not form.validate():
+        return None, '; '.join(f'{name}: {" ".join(messages)}' for name, messages in form.errors.items())
+    return {'title': form.title.data, 'content': form.content.data, 'price': form.price.data}, None
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.failed = 0
+        self.errors = []  # (줄 번호, 메시지) - 최대 MAX_REPORTED_ERRORS 개
+
+    def add_error(self, line_number, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line_number, message))
+
+
+# 일괄 등록 - 검증을 통과한 행을 chunk 단위 bulk insert + commit
+# 잘못된 행은 건너뛰고 줄 번호별 오류로 보고
+def import_products(seller_id, stream, fmt, chunk_size=IMPORT_CHUNK_SIZE):
+    result = ImportResult()
+    encoding, error_line = _detect_encoding(stream)
+    if encoding is None:
+        result.add_error(error_line, 'file is not UTF-8 or CP949 text; nothing was imported')
+        return result
+    chunk = []
+
+    def flush():
+        now = datetime.utcnow()
+        for values in chunk:
+            values.update(user_id=seller_id, date_posted=now, updated_at=now, is_sold=False, report_count=0)
+        db.session.execute(Post.__table__.insert(), chunk)
+        # 코어 INSERT 는 Post 매퍼 이벤트를 거치지 않으므로 판매자 프로필 버전을 직접 갱신
+        User.query.filter_by(id=seller_id).update({User.updated_at: now}, synchronize_session=False)
+        expire_identity(seller_id)
+        db.session.commit()
+        result.created += len(chunk)
+        chunk.clear()
+
+    for line_number, row, error in _read_rows(stream, fmt, encoding):
+        if error is None:
+            values, error = _validate(row)
+        if error is not None:
+            result.add_error(line_number, error)
+            continue
+        chunk.append(values)
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+    return result
+
+
+def _export_row(post):
+    return {'id': post.id, 'title': post.title, 'content': post.content, 'price': post.price,
+            'is_sold': bool(post.is_sold), 'date_posted': post.date_posted.isoformat()}
+
+
+# 판매자 상품 내보내기 - id 순 chunk 조회로 한 번에 EXPORT_CHUNK_SIZE 개만 메모리에 둠
+def export_products(seller_id, fmt, chunk_size=EXPORT_CHUNK_SIZE):
+    posts = iter_by_id(Post.query.filter_by(user_id=seller_id), Post.id, chunk_size)
+    if fmt == 'csv':
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+        writer.writeheader()
+        for post in posts:
+            writer.writerow(_export_row(post))
+            if buffer.tell() >= 64 * 1024:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+        return
+
+    for post in posts:
+        yield json.dumps(_export_row(post), ensure_ascii=False) + '\n'
@@ -0,0 +1,88 @@
+from app import db
+from app.models import Post
+from app import wallet
+from app.versioning import touch_owner
+
+# 구매 처리 결과
+RESERVED = 'reserved'
+CONFIRMED = 'confirmed'
+UPDATED = 'updated'
+CONFLICT = 'conflict'
+INSUFFICIENT_FUNDS = 'insufficient_funds'
+NOT_FOUND = 'not_found'
+
+
+# 상태 변경은 모두 조건부 UPDATE 한 문장으로 처리
+# (읽고 파이썬에서 확인한 뒤 쓰는 대신 WHERE 조건으로 확인 - 동시에 눌러도 한 명만 성공)
+def _available(post_id, price):
+    return (Post.id == post_id, Post.buyer_id.is_(None), Post.is_sold.isnot(True), Post.price == price)
+
+
+# 구매 요청: 상품 예약 + 구매자 잔액 차감 (에스크로)
+def buy(post_id, buyer_id):
+    row = db.session.query(Post.price, Post.user_id).filter_by(id=post_id).first()
+    if row is None:
+        return NOT_FOUND
+    price, seller_id = row
+    if seller_id == buyer_id:
+        return CONFLICT
+
+    reserved = (Post.query.filter(*_available(post_id, price))
+                .update({Post.buyer_id: buyer_id}, synchronize_session=False))
+    if not reserved:
+        db.session.rollback()
+        return CONFLICT
+
+    if wallet.debit(buyer_id, price, wallet.PURCHASE, post_id) is None:
+        db.session.rollback()
+        return INSUFFICIENT_FUNDS
+
+    touch_owner(seller_id)
+    db.session.commit()
+    return RESERVED
+
+
+# 구매 확정: 판매 완료 처리 + 판매자에게 대금 지급
+def confirm(post_id, buyer_id):
+    row = db.session.query(Post.price, Post.user_id).filter_by(id=post_id).first()
+    if row is None:
+        return NOT_FOUND
+    price, seller_id = row
+
+    confirmed = (Post.query.filter(Post.id == post_id, Post.buyer_id == buyer_id,
+                                   Post.is_sold.isnot(True), Post.price == price)
+                 .update({Post.is_sold: True}, synchronize_session=False))
+    if not confirmed:
+        db.session.rollback()
+        return CONFLICT
+
+    wallet.credit(seller_id, price, wallet.SALE, post_id)
+    touch_owner(seller_id)
+    db.session.commit()
+    return CONFIRMED
+
+
+# 가격 변경: 구매 요청이 없을 때만 (buy 와 같은 조건부 UPDATE - 확인과 변경 사이에 구매가 들어오면 CONFLICT)
+# 성공하면 커밋하지 않음 - 호출한 쪽이 나머지 필드를 바꾸고 같은 트랜잭션으로 커밋
+def update_price(post_id, price):
+    updated = (Post.query.filter(Post.id == post_id, Post.buyer_id.is_(None), Post.is_sold.isnot(True))
+               .update({Post.price: price}, synchronize_session=False))
+    if not updated:
+        db.session.rollback()
+        return CONFLICT
+    return UPDATED
+
+
+# 구매 확정 전 상품이 삭제되면 에스크로 금액을 구매자에게 환불 (삭제와 같은 트랜잭션)
+def refund_pending(post):
+    if post.buyer_id is not None and not post.is_sold:
+        wallet.credit(post.buyer_id, post.price, wallet.REFUND, post.id)
+
+
+# 상품 삭제 (커밋은 호출한 쪽에서) - 먼저 행에 쓰기 잠금을 잡고 구매 상태를 다시 읽은 뒤 그 값으로 환불
+# 미리 읽어 둔 post 로 환불하면 그 사이 커밋된 구매의 에스크로가 빠짐 / 잠근 뒤의 buy 는 삭제된 행이라 CONFLICT
+def delete_listing(post):
+    Post.query.filter_by(id=post.id).update({Post.buyer_id: Post.buyer_id}, synchronize_session=False)
+    db.session.refresh(post, ['buyer_id', 'is_sold', 'price'])
+    refund_pending(post)
+    db.session.delete(post)
@@ -0,0 +1,123 @@
+import logging
+import os
+import sys
+from collections import deque
+from functools import wraps
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+# check-query-budgets 가 읽는 최근 요청 기록
+REPORT_HISTORY = 256
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+# 요청 하나의 점검 결과 (엔드포인트, 전체 쿼리 수, 뷰 안에서 실행한 쿼리 수와 예산, 반복된 문장 목록)
+# 스트리밍 응답은 뷰가 끝난 뒤에도 쿼리를 실행하므로 예산은 뷰 기준
+class RequestReport:
+    def __init__(self, endpoint, method, path, queries, used, budget, repeats):
+        self.endpoint = endpoint
+        self.method = method
+        self.path = path
+        self.queries = queries
+        self.used = used
+        self.budget = budget
+        self.repeats = repeats
+
+    @property
+    def over_budget(self):
+        return self.budget is not None and self.used > self.budget
+
+
+# 라우트별 최대 쿼리 수 - QUERY_AUDIT 가 꺼져 있으면 표시만 하고 그대로 실행
+def query_budget(limit):
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if 'query_audit' not in g:
+                return f(*args, **kwargs)
+            before = g.query_audit_total
+            response = f(*args, **kwargs)
+            used = g.query_budget_used = g.query_audit_total - before
+            g.query_budget = limit
+            if used > limit:
+                message = f'{request.endpoint} ran {used} queries (budget {limit})'
+                if current_app.config['QUERY_BUDGET_STRICT']:
+                    raise QueryBudgetExceeded(message)
+                logger.warning(message)
+            return response
+        decorated_function.query_budget = limit
+        return decorated_function
+    return decorator
+
+
+# 쿼리를 실행시킨 위치 - Jinja 템플릿 프레임이 있으면 템플릿 줄 번호, 없으면 가장 가까운 app/ 코드
+def _location():
+    frame = sys._getframe(2)
+    app_frame = None
+    while frame is not None:
+        template = frame.f_globals.get('__jinja_template__')
+        if template is not None:
+            return f'{template.name or "<string>"}:{template.get_corresponding_lineno(frame.f_lineno)}'
+        filename = frame.f_code.co_filename
+        if app_frame is None and filename.startswith(_APP_DIR) and filename != __file__:
+            app_frame = f'{os.path.relpath(filename, _APP_DIR)}:{frame.f_lineno}'
+        frame = frame.f_back
+    return app_frame or 'unknown'
+
+
+# 파라미터를 뺀 SQL 문자열이 같으면 같은 문장 (lazy load 는 id 만 다르게 반복됨)
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if not has_request_context() or 'query_audit' not in g:
+        return
+    g.query_audit_total += 1
+    seen = g.query_audit
+    entry = seen.get(statement)
+    if entry is None:
+        seen[statement] = [1, None]
+        return
+    entry[0] += 1
+    if entry[0] == current_app.config['QUERY_REPEAT_THRESHOLD']:
+        entry[1] = _location()
+
+
+def _before_request():
+    g.query_audit = {}
+    g.query_audit_total = 0
+
+
+def _teardown_request(exc):
+    seen = g.pop('query_audit', None)
+    if seen is None:
+        return
+    repeats = [(count, location, statement) for statement, (count, location) in seen.items() if location]
+    for count, location, statement in repeats:
+        logger.warning('possible N+1: %d identical statements in %s from %s: %s',
+                       count, request.endpoint, location, ' '.join(statement.split())[:200])
+    current_app.extensions['query_audit'].append(
+        RequestReport(request.endpoint, request.method, request.full_path.rstrip('?'),
+                      g.query_audit_total, g.pop('query_budget_used', None), g.pop('query_budget', None), repeats))
+
+
+def _add_count_header(response):
+    if 'query_audit' in g:
+        response.headers['X-Query-Count'] = str(g.query_audit_total)
+    return response
+
+
+# 개발 모드 전용 - 운영에서는 이벤트 리스너 자체를 등록하지 않음
+def init_app(app):
+    if not app.config['QUERY_AUDIT']:
+        return
+    app.extensions['query_audit'] = deque(maxlen=REPORT_HISTORY)
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    app.before_request(_before_request)
+    app.after_request(_add_count_header)
+    app.teardown_request(_teardown_request)
@@ -0,0 +1,152 @@
+from app import db, jobs
+from app.database import insert_ignore
+from app.models import User, Post, UserReport, PostReport
+from app.pagination import keyset_paginate
+from app.purchases import delete_listing
+
+# 누적 신고 자동 제재 기준
+USER_SUSPEND_THRESHOLD = 5
+POST_DELETE_THRESHOLD = 5
+
+# 신고 처리 결과 (SUSPENDED / DELETED: 자동 제재 작업을 등록함)
+DUPLICATE = 'duplicate'
+NOT_FOUND = 'not_found'
+REPORTED = 'reported'
+SUSPENDED = 'suspended'
+DELETED = 'deleted'
+
+# 자동 제재 작업 (app/jobs.py)
+SUSPEND_USER_JOB = 'reports.suspend_user'
+DELETE_POST_JOB = 'reports.delete_post'
+
+
+# 신고 대상의 report_count 를 1 올리고 새 값을 반환 (대상이 없으면 None)
+def _increment_report_count(model, target_id):
+    updated = (model.query.filter_by(id=target_id)
+               .update({model.report_count: model.report_count + 1}, synchronize_session=False))
+    if not updated:
+        return None
+    return db.session.query(model.report_count).filter_by(id=target_id).scalar()
+
+
+# 사용자 신고 - 중복 확인/기록/카운터/자동 정지 작업 등록을 한 트랜잭션으로 처리 (정지는 작업 워커가)
+def report_user(reporter_id, reported_user_id):
+    if not insert_ignore(db.session, UserReport, ['reporter_id', 'reported_user_id'],
+                         reporter_id=reporter_id, reported_user_id=reported_user_id):
+        db.session.rollback()
+        return DUPLICATE
+
+    total_reports = _increment_report_count(User, reported_user_id)
+    if total_reports is None:
+        db.session.rollback()
+        return NOT_FOUND
+
+    result = REPORTED
+    if total_reports >= USER_SUSPEND_THRESHOLD and jobs.enqueue(
+            SUSPEND_USER_JOB, key=f'suspend-user:{reported_user_id}', user_id=reported_user_id):
+        result = SUSPENDED
+    db.session.commit()
+    return result
+
+
+# 게시글 신고 - 중복 확인/기록/카운터/자동 삭제 작업 등록을 한 트랜잭션으로 처리 (삭제와 환불은 작업 워커가)
+def report_post(reporter_id, post_id):
+    if not insert_ignore(db.session, PostReport, ['reporter_id', 'post_id'],
+                         reporter_id=reporter_id, post_id=post_id):
+        db.session.rollback()
+        return DUPLICATE
+
+    total_reports = _increment_report_count(Post, post_id)
+    if total_reports is None:
+        db.session.rollback()
+        return NOT_FOUND
+
+    result = REPORTED
+    if total_reports >= POST_DELETE_THRESHOLD and jobs.enqueue(
+            DELETE_POST_JOB, key=f'delete-post:{post_id}', post_id=post_id):
+        result = DELETED
+    db.session.commit()
+    return result
+
+
+# 이미 정지되었거나 탈퇴한 사용자면 아무것도 하지 않음 (재시도해도 결과가 같음)
+@jobs.handler(SUSPEND_USER_JOB)
+def suspend_user(user_id):
+    user = db.session.get(User, user_id)
+    if user is not None and user.is_active:
+        user.is_active = False
+
+
+@jobs.handler(DELETE_POST_JOB)
+def delete_post(post_id):
+    post = db.session.get(Post, post_id)
+    if post is not None:
+        delete_listing(post)
+
+
+# 관리자 신고 목록에 표시할 신고 대상별 요약
+class ReportSummary:
+    def __init__(self, target, report_count):
+        self.target = target
+        self.report_count = report_count
+        self.first_reported = None
+        self.last_reported = None
+        self.reporters = []
+
+
+REPORTER_SAMPLE_SIZE = 3
+
+
+# 대상별 첫/마지막 신고 시각 (check-query-plans 에서도 사용)
+def report_timestamps_query(report_model, target_column, target_ids):
+    return (db.session.query(target_column,
+                             db.func.min(report_model.timestamp),
+                             db.func.max(report_model.timestamp))
+            .filter(target_column.in_(target_ids))
+            .group_by(target_column))
+
+
+# 대상별 최근 신고자 REPORTER_SAMPLE_SIZE 명 (check-query-plans 에서도 사용)
+def reporter_sample_query(report_model, target_column, target_ids):
+    recent = (db.session.query(target_column.label('target_id'),
+                               report_model.reporter_id.label('reporter_id'),
+                               db.func.row_number().over(partition_by=target_column,
+                                                         order_by=report_model.timestamp.desc()).label('rn'))
+              .filter(target_column.in_(target_ids))
+              .subquery())
+    return (db.session.query(recent.c.target_id, User.username)
+            .join(User, User.id == recent.c.reporter_id)
+            .filter(recent.c.rn <= REPORTER_SAMPLE_SIZE)
+            .order_by(recent.c.target_id, recent.c.rn))
+
+
+# 신고 대상별로 묶은 관리자 목록 - 행 수와 관계없이 쿼리 3개
+# 1) report_count 기준 keyset 페이지 2) 첫/마지막 신고 시각 집계 3) 대상별 최근 신고자 샘플
+def _summarize(page, report_model, target_column):
+    summaries = [ReportSummary(target, target.report_count) for target in page.items]
+    if not summaries:
+        page.items = summaries
+        return page
+    by_id = {summary.target.id: summary for summary in summaries}
+
+    for target_id, first_reported, last_reported in report_timestamps_query(report_model, target_column, by_id):
+        by_id[target_id].first_reported = first_reported
+        by_id[target_id].last_reported = last_reported
+
+    for target_id, username in reporter_sample_query(report_model, target_column, by_id):
+        by_id[target_id].reporters.append(username)
+
+    page.items = summaries
+    return page
+
+
+def reported_users_page(cursor=None, per_page=None, descending=True):
+    page = keyset_paginate(User.query.filter(User.report_count > 0),
+                           User.report_count, User.id, cursor, per_page, descending)
+    return _summarize(page, UserReport, UserReport.reported_user_id)
+
+
+def reported_posts_page(cursor=None, per_page=None, descending=True):
+    page = keyset_paginate(Post.query.options(db.joinedload(Post.user)).filter(Post.report_count > 0),
+                           Post.report_count, Post.id, cursor, per_page, descending)
+    return _summarize(page, PostReport, PostReport.post_id)
@@ -1,23 +1,34 @@
-from flask import Blueprint, render_template, url_for, redirect, flash, request
+from flask import Blueprint, current_app, render_template, url_for, redirect, flash, request, abort, jsonify, Response, stream_with_context
 from flask_login import login_user, logout_user, login_required, current_user, LoginManager
-from app import db, bcrypt, login_manager
-from app.models import User, Post, PostReport, UserReport
-from app.forms import RegistrationForm, LoginForm, UpdateProfileForm, DeleteAccountForm, ChargeWalletForm, CreateProductForm, UpdateEmailForm, UpdatePasswordForm, SearchForm
+from app import db
+from app.models import User, Post
+from app.forms import RegistrationForm, LoginForm, UpdateProfileForm, DeleteAccountForm, ChargeWalletForm, CreateProductForm, UpdateEmailForm, UpdatePasswordForm, SearchForm, ImportProductsForm
 from app.decorators import admin_required
+from app.search import search_posts, filter_posts, search_facets, SearchFilters
+from app.pagination import keyset_paginate, get_page_size
+from app.passwords import password_hasher
+from app import reports, purchases, wallet, product_io, metrics, accounts
+from app.versioning import conditional_response
+from app.search_cache import search_cache, cached_page, cached_facets, normalize_keyword
+from app.identity import identity_cache
+from app.query_audit import query_budget
+from app.suggest import suggest_index
 
 user_bp = Blueprint('user_bp', __name__)
 product_bp = Blueprint('product_bp', __name__)
 admin_bp = Blueprint('admin_bp', __name__)
 
 @user_bp.route('/')
+@query_budget(2)
 def home():
     return render_template('home.html')
 
 @user_bp.route('/register', methods=['GET', 'POST'])
+@query_budget(4)
 def register():
     form = RegistrationForm()
     if form.validate_on_submit():
-        hashed_password = bcrypt.generate_password_hash(form.password.data).decode('utf-8')
+        hashed_password = password_hasher.hash(form.password.data)
         user = User(username=form.username.data, email=form.email.data, password=hashed_password)
         db.session.add(user)
         db.session.commit()
@@ -26,11 +37,16 @@ def register():
     return render_template('register.html', form=form)
 
 @user_bp.route('/login', methods=['GET', 'POST'])
+@query_budget(4)
 def login():
     form = LoginForm()
     if form.validate_on_submit():
         user = User.query.filter_by(username=form.username.data).first()
-        if user and bcrypt.check_password_hash(user.password, form.password.data):
+        if user and password_hasher.verify(user.password, form.password.data):
+            # cost 설정이 바뀌었으면 로그인 성공 시 새 cost 로 재해시
+            if password_hasher.needs_rehash(user.password):
+                user.password = password_hasher.hash(form.password.data)
+                db.session.commit()
             login_user(user)
             flash('Login successful!', 'success')
             if user.username == 'admin':
@@ -40,18 +56,29 @@ def login():
     return render_template('login.html', form=form)
 
 @user_bp.route('/logout')
+@query_budget(2)
 def logout():
     logout_user()
     flash('You have been logged out.', 'info')
     return redirect(url_for('user_bp.home'))
 
 @user_bp.route('/profile')
+@query_budget(4)
 @login_required
 def profile():
-    posts = Post.query.filter_by(user_id=current_user.id).all()
-    return render_template('profile.html', user=current_user, posts=posts)
+    # current_user 는 identity 캐시 값일 수 있음 - 다른 워커/작업 워커의 변경(잔액, 등록 상품)이 ETag 에 바로 반영되도록 DB 에서 다시 읽음
+    user = current_user._get_current_object()
+    db.session.refresh(user)
+
+    def render():
+        posts = keyset_paginate(Post.query.filter_by(user_id=user.id),
+                                Post.date_posted, Post.id,
+                                cursor=request.args.get('cursor'), per_page=get_page_size())
+        return render_template('profile.html', user=user, posts=posts)
+    return conditional_response((user.updated_at,), render)
 
 @user_bp.route('/settings', methods=['GET', 'POST'])
+@query_budget(4)
 @login_required
 def settings():
     email_form = UpdateEmailForm(prefix='email')
@@ -65,8 +92,8 @@ def settings():
         return redirect(url_for('user_bp.settings'))
 
     if password_form.submit.data and password_form.validate_on_submit():
-        if bcrypt.check_password_hash(current_user.password, password_form.current_password.data):
-            hashed = bcrypt.generate_password_hash(password_form.new_password.data).decode('utf-8')
+        if password_hasher.verify(current_user.password, password_form.current_password.data):
+            hashed = password_hasher.hash(password_form.new_password.data)
             current_user.password = hashed
             db.session.commit()
             flash("Password updated.", 'success')
@@ -75,8 +102,8 @@ def settings():
         return redirect(url_for('user_bp.settings'))
 
     if delete_form.submit.data and delete_form.validate_on_submit():
-        db.session.delete(current_user)
-        db.session.commit()
+        accounts.request_deletion(current_user)
+        logout_user()
         flash("Account deleted.", 'success')
         return redirect(url_for('user_bp.home'))
 
@@ -86,17 +113,18 @@ def settings():
                            delete_form=delete_form)
 
 @user_bp.route('/charge_wallet', methods=['GET', 'POST'])
+@query_budget(6)
 @login_required
 def charge_wallet():
     form = ChargeWalletForm()
     if form.validate_on_submit():
-        current_user.balance += form.amount.data
-        db.session.commit()
+        wallet.charge(current_user.id, form.amount.data)
         flash("Wallet charged successfully.", 'success')
         return redirect(url_for('user_bp.profile'))
     return render_template('charge_wallet.html', form=form)
 
 @product_bp.route('/create', methods=['GET', 'POST'])
+@query_budget(4)
 @login_required
 def create_product():
     form = CreateProductForm()
@@ -108,21 +136,55 @@ def create_product():
         return redirect(url_for('user_bp.profile'))
     return render_template('create_product.html', form=form)
 
+# 대량 등록 (CSV / JSONL) - 쿼리 수가 chunk 수에 비례하므로 예산은 약 5천 행 기준
+@product_bp.route('/products/import', methods=['GET', 'POST'])
+@query_budget(20)
+@login_required
+def import_products():
+    form = ImportProductsForm()
+    result = None
+    if form.validate_on_submit():
+        upload = form.file.data
+        result = product_io.import_products(current_user.id, upload.stream, product_io.detect_format(upload.filename))
+        flash(f'{result.created} products imported, {result.failed} rows rejected.',
+              'success' if not result.failed else 'warning')
+    return render_template('import_products.html', form=form, result=result)
+
+# 내 상품 내보내기 (스트리밍)
+@product_bp.route('/products/export', methods=['GET'])
+@query_budget(3)
+@login_required
+def export_products():
+    fmt = 'csv' if request.args.get('format') == 'csv' else 'jsonl'
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    body = stream_with_context(product_io.export_products(current_user.id, fmt))
+    return Response(body, mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename=products.{fmt}'})
+
 @product_bp.route('/product/<int:post_id>', methods=['GET'])
+@query_budget(3)
 @login_required
 def product_detail(post_id):
     post = Post.query.get_or_404(post_id)
-    return render_template('product_detail.html', post=post)
+    return conditional_response((post.updated_at,), lambda: render_template('product_detail.html', post=post))
 
 @product_bp.route('/product/<int:post_id>/edit', methods=['GET', 'POST'])
+@query_budget(5)
 @login_required
 def edit_product(post_id):
     post = Post.query.get_or_404(post_id)
     if post.user_id != current_user.id:
         flash('You do not have permission to edit this product.', 'danger')
         return redirect(url_for('user_bp.profile'))
+    # 구매 요청된 상품은 에스크로 금액이 정해졌으므로 수정 불가
+    if post.buyer_id is not None:
+        flash('This product has a pending or completed purchase and cannot be edited.', 'danger')
+        return redirect(url_for('product_bp.product_detail', post_id=post.id))
     form = CreateProductForm(obj=post)
     if form.validate_on_submit():
+        if purchases.update_price(post.id, form.price.data) == purchases.CONFLICT:
+            flash('This product has a pending or completed purchase and cannot be edited.', 'danger')
+            return redirect(url_for('product_bp.product_detail', post_id=post_id))
         post.title = form.title.data
         post.content = form.content.data
         post.price = form.price.data
@@ -132,26 +194,31 @@ def edit_product(post_id):
     return render_template('edit_product.html', form=form, post=post)
 
 @product_bp.route('/product/<int:post_id>/delete', methods=['POST'])
+@query_budget(8)
 @login_required
 def delete_product(post_id):
     post = Post.query.get_or_404(post_id)
     if post.user_id != current_user.id:
         flash('You do not have permission to delete this product.', 'danger')
         return redirect(url_for('user_bp.profile'))
-    db.session.delete(post)
+    purchases.delete_listing(post)
     db.session.commit()
     flash('Product deleted.', 'success')
     return redirect(url_for('user_bp.profile'))
 
 @product_bp.route('/search', methods=['GET', 'POST'])
+@query_budget(5)
 def search():
-    form = SearchForm()
     if request.method == 'POST':
+        form = SearchForm()
         keyword = form.keyword.data
         sort_by = form.sort_by.data
+        filters = SearchFilters.from_args(request.form)
     else:
+        form = SearchForm(formdata=request.args)  # 필터 입력값 유지
         keyword = request.args.get('keyword', '')
-        sort_by = request.args.get('sort_by', 'latest')
+        sort_by = request.args.get('sort_by', 'relevance')
+        filters = SearchFilters.from_args(request.args)
 
     # @username 처리
     if keyword.startswith('@'):
@@ -162,46 +229,78 @@ def search():
         else:
             flash('User not found.', 'warning')
             return redirect(url_for('user_bp.home'))
-    query = Post.query.filter(Post.title.contains(keyword))
-    if sort_by == 'price_asc':
-        query = query.order_by(Post.price.asc())
-    elif sort_by == 'price_desc':
-        query = query.order_by(Post.price.desc())
+    cursor = request.args.get('cursor')
+    per_page = get_page_size()
+    normalized = normalize_keyword(keyword)
+
+    def paginate():
+        query, rank = search_posts(normalized)
+        query = filter_posts(query, filters)
+        if sort_by == 'price_asc':
+            return keyset_paginate(query, Post.price, Post.id, cursor, per_page, descending=False)
+        if sort_by == 'price_desc':
+            return keyset_paginate(query, Post.price, Post.id, cursor, per_page)
+        if sort_by == 'latest' or rank is None:
+            return keyset_paginate(query, Post.date_posted, Post.id, cursor, per_page)
+        return keyset_paginate(query, rank, Post.id, cursor, per_page, descending=False)
+
+    def facets():
+        query, _ = search_posts(normalized)
+        return search_facets(query, filters, current_app.config['SEARCH_PRICE_BUCKETS'])
+
+    results = cached_page(keyword, sort_by, cursor, per_page, paginate, filters.key())
+    return render_template('search_results.html', form=form, results=results, keyword=keyword, sort_by=sort_by,
+                           filters=filters, facets=cached_facets(keyword, filters.key(), facets))
+
+# 검색어 자동완성 - 상품 제목 또는 @사용자명 접두어 (메모리 색인만 조회)
+@product_bp.route('/search/suggest', methods=['GET'])
+@query_budget(2)
+def suggest():
+    prefix = request.args.get('q', '')[:100]
+    kind, matches = suggest_index.suggest(prefix)
+    if kind == 'user':
+        suggestions = [{'id': user_id, 'username': username, 'url': url_for('user_bp.view_profile', user_id=user_id)}
+                       for user_id, username in matches]
     else:
-        query = query.order_by(Post.date_posted.desc())
-    results = query.all()
-    return render_template('search_results.html', form=form, results=results, keyword=keyword, sort_by=sort_by)
+        suggestions = [{'id': post_id, 'title': title, 'url': url_for('product_bp.product_detail', post_id=post_id)}
+                       for post_id, title in matches]
+    return jsonify(query=prefix, type=kind, suggestions=suggestions)
 
 @product_bp.route('/product/<int:post_id>/buy', methods=['POST'])
+@query_budget(8)
 @login_required
 def buy_product(post_id):
-    post = Post.query.get_or_404(post_id)
-    if post.user_id == current_user.id or post.is_sold:
+    result = purchases.buy(post_id, current_user.id)
+    if result == purchases.NOT_FOUND:
+        abort(404)
+    if result == purchases.CONFLICT:
         flash("You cannot buy this product.", 'danger')
-        return redirect(url_for('product_bp.product_detail', post_id=post.id))
-    post.buyer_id = current_user.id
-    db.session.commit()
-    flash("Purchase initiated. Please confirm when you receive the item.", 'info')
-    return redirect(url_for('product_bp.product_detail', post_id=post.id))
+    elif result == purchases.INSUFFICIENT_FUNDS:
+        flash("Insufficient balance. Please charge your wallet.", 'danger')
+    else:
+        flash("Purchase initiated. Please confirm when you receive the item.", 'info')
+    return redirect(url_for('product_bp.product_detail', post_id=post_id))
 
 @product_bp.route('/product/<int:post_id>/confirm', methods=['POST'])
+@query_budget(8)
 @login_required
 def confirm_purchase(post_id):
-    post = Post.query.get_or_404(post_id)
-    if post.buyer_id != current_user.id:
+    result = purchases.confirm(post_id, current_user.id)
+    if result == purchases.NOT_FOUND:
+        abort(404)
+    if result == purchases.CONFLICT:
         flash("Only the buyer can confirm the purchase.", 'danger')
-        return redirect(url_for('product_bp.product_detail', post_id=post.id))
-    post.is_sold = True
-    db.session.commit()
-    flash("Purchase confirmed. The seller has received the payment.", 'success')
-    return redirect(url_for('product_bp.product_detail', post_id=post.id))
+    else:
+        flash("Purchase confirmed. The seller has received the payment.", 'success')
+    return redirect(url_for('product_bp.product_detail', post_id=post_id))
 
 @user_bp.route('/delete_account', methods=['POST'], endpoint='delete_account')
+@query_budget(8)
 @login_required
 def delete_account():
     try:
-        db.session.delete(current_user)
-        db.session.commit()
+        # 계정은 바로 비활성화하고 상품/신고 정리와 삭제는 백그라운드 작업으로
+        accounts.request_deletion(current_user)
         logout_user()  # 로그아웃 처리도 추가
         flash("Your account has been deleted successfully.", 'success')
         return redirect(url_for('user_bp.home'))  # 홈으로 리디렉션
@@ -211,12 +310,13 @@ def delete_account():
         return redirect(url_for('user_bp.profile'))
 
 @user_bp.route('/change_password', methods=['GET', 'POST'], endpoint='change_password')
+@query_budget(4)
 @login_required
 def change_password():
     form = UpdatePasswordForm()
     if form.validate_on_submit():
-        if bcrypt.check_password_hash(current_user.password, form.current_password.data):
-            hashed_pw = bcrypt.generate_password_hash(form.new_password.data).decode('utf-8')
+        if password_hasher.verify(current_user.password, form.current_password.data):
+            hashed_pw = password_hasher.hash(form.new_password.data)
             current_user.password = hashed_pw
             db.session.commit()
             flash('Password changed successfully.', 'success')
@@ -227,72 +327,54 @@ def change_password():
 
 
 @user_bp.route('/report/user/<int:user_id>', methods=['POST'])
+@query_budget(6)
 @login_required
 def report_user(user_id):
     if user_id == current_user.id:
         flash("자기 자신을 신고할 수 없습니다.", 'warning')
         return redirect(url_for('user_bp.profile'))
 
-    # 중복 신고 방지
-    existing = UserReport.query.filter_by(reporter_id=current_user.id, reported_user_id=user_id).first()
-    if existing:
+    # 중복 신고 방지 + 누적 신고 자동 제재 작업 등록 (한 트랜잭션)
+    result = reports.report_user(current_user.id, user_id)
+    if result == reports.DUPLICATE:
         flash("이미 신고한 사용자입니다.", 'info')
-    else:
-        report = UserReport(reporter_id=current_user.id, reported_user_id=user_id)
-        db.session.add(report)
-        db.session.commit()
-
-        # 자동 제재
-        total_reports = UserReport.query.filter_by(reported_user_id=user_id).count()
-        if total_reports >= 5:
-            user = User.query.get(user_id)
-            if user:
-                user.is_active = False
-                db.session.commit()
-                flash("해당 사용자는 누적 신고로 자동 정지되었습니다.", 'danger')
-            else:
-                flash("해당 사용자를 찾을 수 없습니다.", 'danger')
+    elif result == reports.NOT_FOUND:
+        flash("해당 사용자를 찾을 수 없습니다.", 'danger')
+    elif result == reports.SUSPENDED:
+        flash("해당 사용자는 누적 신고로 자동 정지됩니다.", 'danger')
     return redirect(url_for('user_bp.profile'))
 
 
 @product_bp.route('/report/post/<int:post_id>', methods=['POST'])
+@query_budget(10)
 @login_required
 def report_post(post_id):
-    # 중복 신고 방지
-    existing = PostReport.query.filter_by(reporter_id=current_user.id, post_id=post_id).first()
-    if existing:
+    # 중복 신고 방지 + 누적 신고 자동 삭제 작업 등록 (한 트랜잭션)
+    result = reports.report_post(current_user.id, post_id)
+    if result == reports.DUPLICATE:
         flash("이미 신고한 게시글입니다.", 'info')
-    else:
-        report = PostReport(reporter_id=current_user.id, post_id=post_id)
-        db.session.add(report)
-        db.session.commit()
-
-        # 자동 삭제
-        total_reports = PostReport.query.filter_by(post_id=post_id).count()
-        if total_reports >= 5:
-            post = Post.query.get(post_id)
-            if post:
-                db.session.delete(post)
-                db.session.commit()
-                flash("신고 누적으로 게시글이 삭제되었습니다.", 'danger')
-            else:
-                flash("게시글을 찾을 수 없습니다.", 'danger')
+    elif result == reports.NOT_FOUND:
+        flash("게시글을 찾을 수 없습니다.", 'danger')
+    elif result == reports.DELETED:
+        flash("신고 누적으로 게시글이 삭제됩니다.", 'danger')
     return redirect(url_for('product_bp.search'))
 
 
-@login_manager.user_loader
-def load_user(user_id):
-    user = User.query.get(int(user_id))
-    return user if user and user.is_active else None
-
-
 @user_bp.route('/profile/<int:user_id>', methods=['GET'], endpoint='view_profile')
+@query_budget(4)
 @login_required
 def view_profile(user_id):
     user = User.query.get_or_404(user_id)
-    return render_template('profile.html', user=user)
+
+    def render():
+        posts = keyset_paginate(Post.query.filter_by(user_id=user.id),
+                                Post.date_posted, Post.id,
+                                cursor=request.args.get('cursor'), per_page=get_page_size())
+        return render_template('profile.html', user=user, posts=posts)
+    return conditional_response((user.updated_at,), render)
 
 @user_bp.route('/admin/dashboard')
+@query_budget(2)
 @admin_required
 def admin_dashboard():
     return render_template('admin_dashboard.html')
@@ -300,15 +382,19 @@ def admin_dashboard():
 
 # 관리자 신고 내역 보기
 @user_bp.route('/admin/reports')
+@query_budget(8)
 @login_required
 @admin_required
 def admin_reports():
-    user_reports = UserReport.query.all()
-    post_reports = PostReport.query.all()
-    return render_template('admin_reports.html', user_reports=user_reports, post_reports=post_reports)
+    per_page = get_page_size()
+    sort = request.args.get('sort', 'count_desc')
+    user_reports = reports.reported_users_page(request.args.get('user_cursor'), per_page, sort != 'count_asc')
+    post_reports = reports.reported_posts_page(request.args.get('post_cursor'), per_page, sort != 'count_asc')
+    return render_template('admin_reports.html', user_reports=user_reports, post_reports=post_reports, sort=sort)
 
 # 사용자 계정 정지
 @user_bp.route('/admin/suspend_user/<int:user_id>', methods=['POST'])
+@query_budget(3)
 @login_required
 @admin_required
 def suspend_user(user_id):
@@ -320,25 +406,48 @@ def suspend_user(user_id):
 
 # 게시글 삭제
 @user_bp.route('/admin/delete_post/<int:post_id>', methods=['POST'])
+@query_budget(8)
 @login_required
 @admin_required
 def delete_post(post_id):
     post = Post.query.get_or_404(post_id)
-    db.session.delete(post)
+    purchases.delete_listing(post)
     db.session.commit()
     flash("해당 게시글이 삭제되었습니다.", "info")
     return redirect(url_for('user_bp.admin_reports'))
 
 @admin_bp.route('/admin/reports')
+@query_budget(8)
 @login_required
 @admin_required
 def admin_reports():
-    reported_users = UserReport.query.all()
-    reported_posts = PostReport.query.all()
-    return render_template('admin/reports.html', reported_users=reported_users, reported_posts=reported_posts)
+    per_page = get_page_size()
+    sort = request.args.get('sort', 'count_desc')
+    reported_users = reports.reported_users_page(request.args.get('user_cursor'), per_page, sort != 'count_asc')
+    reported_posts = reports.reported_posts_page(request.args.get('post_cursor'), per_page, sort != 'count_asc')
+    return render_template('admin/reports.html', reported_users=reported_users, reported_posts=reported_posts, sort=sort)
+
+
+# Prometheus 텍스트 형식 지표 (프로세스 단위)
+@admin_bp.route('/admin/metrics')
+@query_budget(2)
+@login_required
+@admin_required
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+# 프로세스별 캐시 적중률/제거 통계
+@admin_bp.route('/admin/cache_stats')
+@query_budget(2)
+@login_required
+@admin_required
+def cache_stats():
+    return jsonify(identity=identity_cache.stats(), search=search_cache.stats())
 
 
 @admin_bp.route('/admin/deactivate_user/<int:user_id>', methods=['POST'])
+@query_budget(3)
 @login_required
 @admin_required
 def deactivate_user(user_id):
@@ -353,24 +462,26 @@ def deactivate_user(user_id):
 
 
 @admin_bp.route('/admin/delete_post/<int:post_id>', methods=['POST'])
+@query_budget(8)
 @login_required
 @admin_required
 def delete_post(post_id):
     post = Post.query.get_or_404(post_id)
-    db.session.delete(post)
+    purchases.delete_listing(post)
     db.session.commit()
     flash("게시글이 삭제되었습니다.", 'info')
     return redirect(url_for('admin_bp.admin_reports'))
 
 @admin_bp.route('/admin/ban_user/<int:user_id>', methods=['POST'])
+@query_budget(3)
 @admin_required
 def ban_user(user_id):
     user = User.query.get_or_404(user_id)
     if user.is_admin:
         flash("관리자는 제재할 수 없습니다.", "danger")
-        return redirect(url_for('admin_bp.view_reports'))
+        return redirect(url_for('admin_bp.admin_reports'))
     user.is_active = False
     db.session.commit()
     flash(f"사용자 {user.username}가 제재되었습니다.", "warning")
-    return redirect(url_for('admin_bp.view_reports'))
+    return redirect(url_for('admin_bp.admin_reports'))
 
@@ -0,0 +1,154 @@
+import re
+from sqlalchemy import and_, case, func, or_, text, literal_column
+from sqlalchemy.sql import table, column
+from app import db
+from app.models import Post, User
+
+# 전문 검색 인덱스 (마이그레이션에서 생성, 트리거로 post 테이블과 동기화)
+# SQLite: FTS5 external content 테이블 / PostgreSQL: tsvector GIN 표현식 인덱스
+post_fts = table('post_fts', column('rowid'), column('title'), column('content'))
+
+PG_TS_CONFIG = 'simple'
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _tokens(keyword):
+    return _TOKEN_RE.findall(keyword or '')
+
+
+def _fts5_query(tokens):
+    # 각 토큰을 따옴표로 감싸 FTS5 문법 문자(-, :, * 등)를 무력화하고 접두어 검색 허용
+    return ' '.join(f'"{tok}"*' for tok in tokens)
+
+
+def _pg_document():
+    return func.to_tsvector(PG_TS_CONFIG, func.coalesce(Post.title, '') + ' ' + func.coalesce(Post.content, ''))
+
+
+# 키워드로 게시글을 검색해 (query, rank) 반환 - rank 는 값이 작을수록 관련도가 높음 (순위가 없으면 None)
+def search_posts(keyword):
+    tokens = _tokens(keyword)
+    if not tokens:
+        return Post.query, None
+
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        rank = literal_column('bm25(post_fts)')
+        query = (Post.query
+                 .join(post_fts, post_fts.c.rowid == Post.id)
+                 .filter(text('post_fts MATCH :fts_query').bindparams(fts_query=_fts5_query(tokens))))
+        return query, rank
+
+    if dialect == 'postgresql':
+        ts_query = func.to_tsquery(PG_TS_CONFIG, ' & '.join(f'{tok}:*' for tok in tokens))
+        document = _pg_document()
+        rank = -func.ts_rank(document, ts_query)
+        return Post.query.filter(document.op('@@')(ts_query)), rank
+
+    # 전문 검색을 지원하지 않는 DB 는 기존 LIKE 검색으로 대체
+    conditions = [or_(Post.title.contains(tok), Post.content.contains(tok)) for tok in tokens]
+    return Post.query.filter(*conditions), None
+
+
+# 판매 상태 - 예약(buyer_id 만 설정된 구매 확정 대기)은 구매할 수 없으므로 available 이 아님
+AVAILABLE, RESERVED, SOLD = 'available', 'reserved', 'sold'
+STATUSES = (AVAILABLE, RESERVED, SOLD)
+
+
+# 검색 필터 (가격 범위, 판매 상태, 판매자 username) - 잘못된 값은 필터 없음으로 처리
+class SearchFilters:
+    def __init__(self, min_price=None, max_price=None, availability=None, seller=None):
+        self.min_price = min_price
+        self.max_price = max_price
+        self.availability = availability
+        self.seller = seller
+
+    @classmethod
+    def from_args(cls, args):
+        def price(name):
+            value = args.get(name, type=int)
+            return value if value is not None and value >= 0 else None
+
+        availability = args.get('availability')
+        seller = (args.get('seller') or '').strip().lstrip('@')
+        return cls(price('min_price'), price('max_price'),
+                   availability if availability in (AVAILABLE, SOLD) else None, seller or None)
+
+    # 검색 결과 캐시 키 / 페이지 링크용
+    def key(self):
+        return (self.min_price, self.max_price, self.availability, self.seller)
+
+    def to_args(self):
+        names = ('min_price', 'max_price', 'availability', 'seller')
+        return {name: value for name, value in zip(names, self.key()) if value is not None}
+
+
+def _price_conditions(filters):
+    conditions = []
+    if filters.min_price is not None:
+        conditions.append(Post.price >= filters.min_price)
+    if filters.max_price is not None:
+        conditions.append(Post.price <= filters.max_price)
+    return conditions
+
+
+def _availability_conditions(availability):
+    if availability == AVAILABLE:
+        return [Post.buyer_id.is_(None), Post.is_sold.isnot(True)]
+    if availability == SOLD:
+        return [Post.is_sold.is_(True)]
+    return []
+
+
+# 판매자는 username 으로 받아 서브쿼리로 비교 (별도 조회 없이 ix_post_user_id_date_posted 사용)
+def _seller_conditions(filters):
+    if not filters.seller:
+        return []
+    return [Post.user_id == db.session.query(User.id).filter(User.username == filters.seller).scalar_subquery()]
+
+
+def filter_posts(query, filters):
+    return query.filter(*_seller_conditions(filters), *_price_conditions(filters),
+                        *_availability_conditions(filters.availability))
+
+
+def _status_column():
+    return case((Post.is_sold.is_(True), SOLD), (Post.buyer_id.isnot(None), RESERVED), else_=AVAILABLE)
+
+
+# facet 개수 - 가격 구간 히스토그램 / 판매 상태별 개수 / 필터를 모두 적용한 전체 개수
+class SearchFacets:
+    def __init__(self, buckets, statuses, total):
+        self.buckets = buckets  # [(하한, 상한 또는 None, 개수)]
+        self.statuses = statuses  # {상태: 개수}
+        self.total = total
+
+
+# 키워드/판매자 조건만 건 검색 결과를 (가격 구간, 판매 상태, 가격 범위 안인지) 로 GROUP BY 한 번 집계
+def facet_query(query, filters, bounds):
+    bucket = case(*[(Post.price < bound, index) for index, bound in enumerate(bounds)], else_=len(bounds))
+    price_conditions = _price_conditions(filters)
+    in_range = case((and_(*price_conditions), 1), else_=0) if price_conditions else literal_column('1')
+    return (query.filter(*_seller_conditions(filters))
+            .with_entities(bucket.label('bucket'), _status_column().label('status'),
+                           in_range.label('in_range'), func.count())
+            .group_by(literal_column('bucket'), literal_column('status'), literal_column('in_range')))
+
+
+# 각 facet 은 자기 필터만 뺀 개수 (가격 구간 개수는 상태 필터만, 상태별 개수는 가격 범위만 적용)
+def search_facets(query, filters, bounds):
+    rows = facet_query(query, filters, bounds).all()
+
+    histogram = [0] * (len(bounds) + 1)
+    statuses = dict.fromkeys(STATUSES, 0)
+    total = 0
+    for bucket_index, status, row_in_range, count in rows:
+        if row_in_range:
+            statuses[status] += count
+        if filters.availability in (None, status):
+            histogram[bucket_index] += count
+            if row_in_range:
+                total += count
+    lows = [0] + list(bounds)
+    highs = list(bounds) + [None]
+    return SearchFacets(list(zip(lows, highs, histogram)), statuses, total)
@@ -0,0 +1,149 @@
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from app.models import Post
+from app.pagination import KeysetPage
+
+
+# 검색 결과 캐시 - (세대, 정규화 키워드, sort_by, cursor, per_page) -> (id 목록, next_cursor)
+# Post 가 추가/수정/판매/삭제되면 세대가 올라가 이전 결과는 모두 무효
+# 세대는 프로세스 단위라 다른 워커의 변경은 TTL 이 지나야 반영됨
+class SearchResultCache:
+    def __init__(self, maxsize=512, ttl=60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.generation = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def configure(self, maxsize, ttl):
+        with self._lock:
+            self.maxsize = maxsize
+            self.ttl = ttl
+            self._entries.clear()
+
+    def bump(self):
+        with self._lock:
+            self.generation += 1
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[0] != self.generation or entry[1] < time.monotonic()):
+                del self._entries[key]
+                self.invalidations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def set(self, key, generation, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            # 조회하는 사이 세대가 바뀌었으면 이미 낡은 결과이므로 저장하지 않음
+            if generation != self.generation:
+                return
+            self._entries[key] = (generation, time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'generation': self.generation,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+
+search_cache = SearchResultCache()
+
+
+def normalize_keyword(keyword):
+    return ' '.join((keyword or '').lower().split())
+
+
+# 캐시된 id 목록이 있으면 PK 조회 한 번으로 페이지 구성, 없으면 paginate() 결과를 저장
+def cached_page(keyword, sort_by, cursor, per_page, paginate, filter_key=()):
+    key = (normalize_keyword(keyword), filter_key, sort_by, cursor, per_page)
+    cached = search_cache.get(key)
+    if cached is not None:
+        ids, next_cursor = cached
+        posts = {post.id: post for post in Post.query.filter(Post.id.in_(ids))} if ids else {}
+        # 다른 워커에서 삭제된 글은 빠짐
+        return KeysetPage([posts[post_id] for post_id in ids if post_id in posts], next_cursor, per_page)
+
+    generation = search_cache.generation
+    page = paginate()
+    search_cache.set(key, generation, ([post.id for post in page.items], page.next_cursor))
+    return page
+
+
+# facet 개수는 페이지와 무관하므로 (키워드, 필터) 단위로 저장
+def cached_facets(keyword, filter_key, compute):
+    key = ('facets', normalize_keyword(keyword), filter_key)
+    facets = search_cache.get(key)
+    if facets is None:
+        generation = search_cache.generation
+        facets = compute()
+        search_cache.set(key, generation, facets)
+    return facets
+
+
+# Post 쓰기 감지 - flush 시점에 바로 올리고 commit 직후 한 번 더
+# (commit 전에 다른 요청이 이전 결과를 새 세대로 캐시하는 경우 방지)
+def _mark(session):
+    search_cache.bump()
+    if session is not None:
+        session.info['search_cache_dirty'] = True
+
+
+@event.listens_for(Post, 'after_insert')
+@event.listens_for(Post, 'after_update')
+@event.listens_for(Post, 'after_delete')
+def _post_flushed(mapper, connection, target):
+    _mark(object_session(target))
+
+
+# Query.update / 코어 INSERT·UPDATE·DELETE (구매, 일괄 등록 등)
+@event.listens_for(Session, 'do_orm_execute')
+def _post_bulk_written(orm_execute_state):
+    statement = orm_execute_state.statement
+    if not getattr(statement, 'is_dml', False):
+        return
+    # ORM 일괄 UPDATE 는 bind_mapper 로, 코어 문장은 테이블로 판별
+    if orm_execute_state.bind_mapper is Post.__mapper__ or getattr(statement, 'table', None) is Post.__table__:
+        _mark(orm_execute_state.session)
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump_after_commit(session):
+    if session.info.pop('search_cache_dirty', False):
+        search_cache.bump()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop('search_cache_dirty', None)
@@ -0,0 +1,141 @@
+import math
+import random
+from datetime import datetime, timedelta
+from app import db
+from app.models import User, Post, ChatMessage, UserReport, PostReport, WalletTransaction
+from app.passwords import password_hasher
+from app.reports import USER_SUSPEND_THRESHOLD, POST_DELETE_THRESHOLD
+from app.wallet import OPENING
+
+ADJECTIVES = ['red', 'blue', 'vintage', 'used', 'new', 'mini', 'large', 'wireless', 'leather', 'wooden',
+              'electric', 'portable', 'classic', 'gaming', 'folding', 'steel', 'kids', 'smart', 'retro', 'compact']
+NOUNS = ['bike', 'car', 'laptop', 'phone', 'camera', 'desk', 'chair', 'lamp', 'guitar', 'watch',
+         'jacket', 'sofa', 'monitor', 'keyboard', 'speaker', 'stroller', 'tent', 'tablet', 'drone', 'backpack']
+CONDITIONS = ['barely used', 'like new', 'some scratches', 'works perfectly', 'needs repair',
+              'original box included', 'pickup only', 'can ship nationwide']
+CHAT_LINES = ['hi', 'is this still available?', 'can you lower the price?', 'where can we meet?',
+              'sold, sorry', 'thanks!', 'anyone selling a bike?', 'how old is it?', 'ok deal', 'see you tomorrow']
+
+CHUNK_SIZE = 1000
+HISTORY_DAYS = 180
+
+
+# 소수의 판매자/신고 대상에 몰리는 분포 (Zipf) - random.choices 용 누적 가중치
+def _zipf_weights(n, s=0.9):
+    total, cumulative = 0.0, []
+    for rank in range(1, n + 1):
+        total += 1 / rank ** s
+        cumulative.append(total)
+    return cumulative
+
+
+# 최근일수록 많이 올라오는 게시/채팅 시각
+def _recent_timestamp(rng, now):
+    age = min(rng.expovariate(1 / 30), HISTORY_DAYS)
+    return now - timedelta(days=age, seconds=rng.randrange(86400))
+
+
+# 가격은 로그정규 분포 (중앙값 약 3만원, 100원 단위)
+def _price(rng):
+    return max(100, int(round(rng.lognormvariate(math.log(30000), 1.0), -2)))
+
+
+def _insert(table, rows, chunk_size):
+    for start in range(0, len(rows), chunk_size):
+        db.session.execute(table.insert(), rows[start:start + chunk_size])
+
+
+def _unique_pairs(rng, count, reporters, targets, cumulative, per_target_cap):
+    pairs, per_target = set(), {}
+    attempts = count * 10
+    while len(pairs) < count and attempts:
+        attempts -= 1
+        target = rng.choices(targets, cum_weights=cumulative)[0]
+        reporter = rng.choice(reporters)
+        if reporter == target or per_target.get(target, 0) >= per_target_cap or (reporter, target) in pairs:
+            continue
+        pairs.add((reporter, target))
+        per_target[target] = per_target.get(target, 0) + 1
+    return pairs
+
+
+# 대량 더미 데이터 생성 - 모든 INSERT 는 chunk 단위 executemany
+# 신고 수는 자동 제재 기준 미만으로 맞춤 (기준을 넘으면 실제 서비스에서는 정지/삭제됐을 것이므로)
+def seed(users, posts, chats, reports, password='password', rng_seed=None, chunk_size=CHUNK_SIZE, log=print):
+    rng = random.Random(rng_seed)
+    now = datetime.utcnow()
+    hashed = password_hasher.hash(password)
+    first_id = (db.session.query(db.func.max(User.id)).scalar() or 0) + 1
+
+    user_rows = []
+    for i in range(users):
+        balance = int(round(rng.lognormvariate(math.log(50000), 1.2), -3)) if rng.random() < 0.6 else 0
+        user_rows.append({'username': f'user{first_id + i}', 'email': f'user{first_id + i}@example.com',
+                          'password': hashed, 'bio': '', 'balance': balance, 'is_active': True,
+                          'report_count': 0, 'updated_at': now})
+    _insert(User.__table__, user_rows, chunk_size)
+    user_ids = [user_id for user_id, in db.session.query(User.id).filter(User.id >= first_id).order_by(User.id)]
+    log(f'{len(user_ids)} users')
+
+    # 기존 잔액은 원장 opening 거래로 기록 (reconcile-wallets 와 일치)
+    _insert(WalletTransaction.__table__, [
+        {'user_id': user_id, 'kind': OPENING, 'amount': row['balance'], 'balance_after': row['balance'],
+         'post_id': None, 'timestamp': now}
+        for user_id, row in zip(user_ids, user_rows) if row['balance']
+    ], chunk_size)
+
+    if not user_ids:
+        user_ids = [user_id for user_id, in db.session.query(User.id)]
+    seller_weights = _zipf_weights(len(user_ids))
+    first_post_id = (db.session.query(db.func.max(Post.id)).scalar() or 0) + 1
+    post_rows = []
+    for _ in range(posts):
+        seller_id = rng.choices(user_ids, cum_weights=seller_weights)[0]
+        posted = _recent_timestamp(rng, now)
+        roll = rng.random()
+        buyer_id = rng.choice(user_ids) if roll < 0.2 else None
+        if buyer_id == seller_id:
+            buyer_id = None
+        post_rows.append({'title': f'{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}',
+                          'content': f'{rng.choice(CONDITIONS)}, {rng.choice(CONDITIONS)}',
+                          'price': _price(rng), 'date_posted': posted, 'updated_at': posted,
+                          'user_id': seller_id, 'buyer_id': buyer_id,
+                          'is_sold': buyer_id is not None and roll < 0.15, 'report_count': 0})
+    _insert(Post.__table__, post_rows, chunk_size)
+    post_ids = [post_id for post_id, in db.session.query(Post.id).filter(Post.id >= first_post_id)]
+    log(f'{len(post_ids)} posts')
+
+    chat_rows = []
+    for _ in range(chats):
+        sender = rng.choice(user_ids)
+        if rng.random() < 0.5:
+            room = 'public'
+        else:
+            a, b = sorted((sender, rng.choice(user_ids)))
+            room = f'room_{a}_{b}'
+        chat_rows.append({'room': room, 'user_id': sender, 'username': f'user{sender}',
+                          'message': rng.choice(CHAT_LINES), 'timestamp': _recent_timestamp(rng, now)})
+    _insert(ChatMessage.__table__, chat_rows, chunk_size)
+    log(f'{len(chat_rows)} chat messages')
+
+    user_pairs = _unique_pairs(rng, reports // 2, user_ids, user_ids, seller_weights, USER_SUSPEND_THRESHOLD - 1)
+    _insert(UserReport.__table__, [
+        {'reporter_id': reporter, 'reported_user_id': target, 'timestamp': _recent_timestamp(rng, now)}
+        for reporter, target in user_pairs
+    ], chunk_size)
+    post_pairs = (_unique_pairs(rng, reports - len(user_pairs), user_ids, post_ids,
+                                _zipf_weights(len(post_ids)), POST_DELETE_THRESHOLD - 1) if post_ids else set())
+    _insert(PostReport.__table__, [
+        {'reporter_id': reporter, 'post_id': target, 'timestamp': _recent_timestamp(rng, now)}
+        for reporter, target in post_pairs
+    ], chunk_size)
+
+    # 신고 카운터 재계산 (마이그레이션 백필과 같은 방식)
+    User.query.filter(User.id >= first_id).update({User.report_count: db.session.query(db.func.count(UserReport.id))
+                                                   .filter(UserReport.reported_user_id == User.id)
+                                                   .scalar_subquery()}, synchronize_session=False)
+    Post.query.filter(Post.id >= first_post_id).update({Post.report_count: db.session.query(db.func.count(PostReport.id))
+                                                        .filter(PostReport.post_id == Post.id)
+                                                        .scalar_subquery()}, synchronize_session=False)
+    log(f'{len(user_pairs)} user reports, {len(post_pairs)} post reports')
+    db.session.commit()
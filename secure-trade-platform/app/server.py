@@ -0,0 +1,224 @@
+import logging
+import os
+import signal
+import threading
+import time
+from app import db, socketio
+from app.chat_buffer import chat_buffer
+
+logger = logging.getLogger(__name__)
+
+# 워커당 동시 연결 수 기본값 (threading 은 연결마다 OS 스레드)
+DEFAULT_CONNECTIONS = {'eventlet': 1000, 'gevent': 1000, 'threading': 100}
+
+
+# 새 연결을 받지 않도록 한 뒤 Socket.IO 클라이언트를 끊어 다른 워커로 재접속시키고 남은 채팅을 기록
+def _close_clients():
+    try:
+        # wait=False: 닫기 패킷을 가져갈 폴링 요청이 다시 오지 않을 수 있으므로 기다리지 않음
+        sockets = socketio.server.eio.sockets
+        for sid, client in list(sockets.items()):
+            client.close(wait=False)
+            sockets.pop(sid, None)
+    except Exception:
+        logger.exception('Failed to disconnect Socket.IO clients')
+    chat_buffer.stop()
+
+
+class _EventletWorker:
+    def __init__(self, app, host, port, connections, drain_timeout):
+        import eventlet
+        self.app = app
+        self.connections = connections
+        self.drain_timeout = drain_timeout
+        self.sock = eventlet.listen((host, port))
+        self.thread = None
+        self.draining = False
+
+    def serve(self):
+        import eventlet
+        import eventlet.wsgi
+        # max_size: 연결 greenthread 풀 크기 - 가득 차면 accept 를 멈춤
+        self.thread = eventlet.spawn(eventlet.wsgi.server, self.sock, self.app,
+                                     max_size=self.connections, log_output=False)
+        try:
+            self.thread.wait()
+        except eventlet.greenlet.GreenletExit:
+            pass
+
+    # 시그널 핸들러는 허브 greenlet 안에서 실행될 수 있으므로 작업은 새 greenthread 로 넘김
+    def drain(self):
+        import eventlet
+        if not self.draining:
+            self.draining = True
+            eventlet.spawn_n(self._drain)
+
+    # accept 루프를 종료하면 wsgi.server 가 유휴 keep-alive 연결을 닫고 진행 중인 요청을 기다림
+    def _drain(self):
+        import eventlet
+        eventlet.spawn_after(self.drain_timeout, _force_exit)
+        self.thread.kill()
+        self.sock.close()
+        _close_clients()
+
+
+class _GeventWorker:
+    def __init__(self, app, host, port, connections, drain_timeout):
+        from gevent.pool import Pool
+        from gevent.pywsgi import WSGIServer
+        try:
+            from geventwebsocket.handler import WebSocketHandler as handler_class
+        except ImportError:
+            from gevent.pywsgi import WSGIHandler as handler_class  # long-polling 만 사용
+        self.drain_timeout = drain_timeout
+        self.server = WSGIServer((host, port), app, spawn=Pool(connections), handler_class=handler_class, log=None)
+        self.draining = False
+
+    def serve(self):
+        self.server.serve_forever()
+
+    def drain(self):
+        import gevent
+        if not self.draining:
+            self.draining = True
+            gevent.spawn(self._drain)
+
+    # stop: 리스너를 닫고 진행 중인 연결을 timeout 까지 기다린 뒤 남은 연결을 종료
+    def _drain(self):
+        _close_clients()
+        self.server.stop(timeout=self.drain_timeout)
+
+
+class _ThreadingWorker:
+    def __init__(self, app, host, port, connections, drain_timeout):
+        from werkzeug.serving import ThreadedWSGIServer
+
+        slots = threading.BoundedSemaphore(connections)
+
+        # 동시 처리 스레드 수 제한 - 가득 차면 accept 루프가 빈 자리를 기다림
+        class LimitedWSGIServer(ThreadedWSGIServer):
+            def process_request(self, request, client_address):
+                slots.acquire()
+                try:
+                    super().process_request(request, client_address)
+                except Exception:
+                    slots.release()
+                    raise
+
+            def process_request_thread(self, request, client_address):
+                try:
+                    super().process_request_thread(request, client_address)
+                finally:
+                    slots.release()
+
+        self.connections = connections
+        self.drain_timeout = drain_timeout
+        self.slots = slots
+        self.server = LimitedWSGIServer(host, port, app)
+        self.draining = False
+        self.drained = threading.Event()
+
+    def serve(self):
+        self.server.serve_forever()
+        self.drained.wait(self.drain_timeout)
+        self.server.server_close()
+
+    # serve_forever 를 실행 중인 스레드(메인)에서는 shutdown 을 호출할 수 없으므로 별도 스레드
+    def drain(self):
+        if not self.draining:
+            self.draining = True
+            threading.Thread(target=self._drain, daemon=True).start()
+
+    def _drain(self):
+        self.server.shutdown()
+        _close_clients()
+        # 모든 자리가 반납되면 진행 중인 요청이 끝난 것
+        deadline = time.monotonic() + self.drain_timeout
+        for _ in range(self.connections):
+            if not self.slots.acquire(timeout=max(0, deadline - time.monotonic())):
+                logger.warning('Drain timeout with requests still running')
+                return
+        self.drained.set()
+
+
+WORKERS = {'eventlet': _EventletWorker, 'gevent': _GeventWorker, 'threading': _ThreadingWorker}
+
+
+def _force_exit():
+    logger.warning('Drain timeout with connections still open; exiting')
+    os._exit(1)
+
+
+def _run_worker(app, host, port, connections, drain_timeout):
+    worker = WORKERS[socketio.async_mode](app, host, port, connections, drain_timeout)
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *args: worker.drain())
+    logger.info('Worker %d serving %s on %s:%d (%d connections)',
+                os.getpid(), socketio.async_mode, host, port, connections)
+    worker.serve()
+    chat_buffer.stop()
+    logger.info('Worker %d drained', os.getpid())
+
+
+# 미리 로드한 앱의 DB 연결을 fork 된 워커들이 나눠 쓰지 않도록 fork 전에 정리
+def _dispose_engines(app):
+    with app.app_context():
+        for bind in [None] + list(app.config.get('SQLALCHEMY_BINDS') or {}):
+            db.get_engine(app, bind=bind).dispose()
+
+
+# 운영 서버 - create_app() 으로 미리 만든 앱을 fork 한 워커 프로세스들이 각자 포트(port + i)에서 실행
+# 워커가 여러 개면 sticky 로드밸런서(ip_hash 등) 뒤에 두고 SOCKETIO_MESSAGE_QUEUE 를 설정해야 함
+def serve(app, host=None, port=None, workers=None, connections=None, drain_timeout=None):
+    config = app.config
+    host = host or config['SERVER_HOST']
+    port = port or config['SERVER_PORT']
+    workers = workers or config['SERVER_WORKERS']
+    connections = connections or config['SERVER_WORKER_CONNECTIONS'] or DEFAULT_CONNECTIONS[socketio.async_mode]
+    drain_timeout = config['SERVER_DRAIN_TIMEOUT'] if drain_timeout is None else drain_timeout
+    _dispose_engines(app)
+
+    if workers == 1:
+        _run_worker(app, host, port, connections, drain_timeout)
+        return
+    if not config['SOCKETIO_MESSAGE_QUEUE']:
+        logger.warning('SERVER_WORKERS=%d without SOCKETIO_MESSAGE_QUEUE: rooms and broadcasts stay per worker', workers)
+
+    children = {}
+    stopping = []
+
+    def spawn(index):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _run_worker(app, host, port + index, connections, drain_timeout)
+            except BaseException:
+                logger.exception('Worker on port %d failed', port + index)
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = index
+
+    # 마스터는 워커에 시그널을 전달하고 모두 종료될 때까지 기다림 (워커별 drain)
+    def stop(signum, frame):
+        if not stopping:
+            stopping.append(signum)
+            for pid in list(children):
+                os.kill(pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for index in range(workers):
+        spawn(index)
+    while children:
+        try:
+            pid, status = os.waitpid(-1, 0)
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        index = children.pop(pid, None)
+        if index is not None and not stopping:
+            logger.warning('Worker %d on port %d exited (%d); restarting', pid, port + index, status)
+            spawn(index)
@@ -0,0 +1,314 @@
+import bisect
+import logging
+import threading
+import time
+from sqlalchemy import event, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app import db, cache_sync
+from app.models import Post, User
+
+logger = logging.getLogger(__name__)
+
+# 키 = "정규화 문자열\x00id" - \x00 은 어떤 글자보다 작아 같은 접두어의 키가 연속으로 정렬됨
+SEPARATOR = '\x00'
+BUILD_CHUNK_SIZE = 10000
+BUCKET_SIZE = 1000
+
+
+def normalize(text):
+    return ' '.join((text or '').lower().split())
+
+
+# 정렬된 배열 + bisect 접두어 색인 (프로세스 단위, 조회는 DB 를 거치지 않음)
+# 키 전체를 BUCKET_SIZE 개 안팎의 정렬된 구간으로 나눠 보관 - 추가/삭제 시 구간 하나만 이동 (배열 하나면 100만 건에서 수 ms)
+# max_words: 앞에서부터 몇 번째 단어까지 시작 위치로 색인할지 (1 이면 전체 문자열의 접두어만)
+class PrefixIndex:
+    def __init__(self, max_words=1):
+        self.max_words = max_words
+        self._last_id = 0
+        self._last_id_stale = False  # 가장 큰 id 가 지워져 _last_id 가 실제 최댓값보다 클 수 있음
+        self._buckets = []
+        self._maxes = []  # 구간별 마지막 키
+        self._values = {}  # id -> 표시 문자열
+        self._lock = threading.Lock()
+
+    # 색인된 가장 큰 id (catch_up 이 이후 id 만 읽음)
+    # SQLite(AUTOINCREMENT 없음)는 가장 큰 id 가 지워지면 그 id 를 다시 쓰므로 남은 최대 id 로 되돌림
+    # 삭제 때마다 다시 구하지 않고 읽을 때 한 번만 계산 (읽는 쪽은 백그라운드 catch_up/reload 뿐)
+    @property
+    def last_id(self):
+        with self._lock:
+            if self._last_id_stale:
+                self._last_id = max(self._values, default=0)
+                self._last_id_stale = False
+            return self._last_id
+
+    def _raise_last_id(self, item_id):
+        if item_id >= self._last_id:
+            self._last_id, self._last_id_stale = item_id, False
+
+    def __len__(self):
+        return len(self._values)
+
+    @property
+    def key_count(self):
+        return sum(map(len, self._buckets))
+
+    def _make_keys(self, item_id, text):
+        words = normalize(text).split(' ')
+        return [f"{' '.join(words[i:])}{SEPARATOR}{item_id}" for i in range(min(len(words), self.max_words))]
+
+    def _set_keys(self, keys):
+        self._buckets = [keys[i:i + BUCKET_SIZE] for i in range(0, len(keys), BUCKET_SIZE)]
+        self._maxes = [bucket[-1] for bucket in self._buckets]
+
+    # 전체 재구성
+    def load(self, rows):
+        keys, values, last_id = [], {}, 0
+        for item_id, text in rows:
+            values[item_id] = text
+            keys.extend(self._make_keys(item_id, text))
+            last_id = max(last_id, item_id)
+        keys.sort()
+        with self._lock:
+            self._set_keys(keys)
+            self._values, self._last_id, self._last_id_stale = values, last_id, False
+
+    def add(self, item_id, text):
+        with self._lock:
+            self._remove(item_id)
+            self._values[item_id] = text
+            for key in self._make_keys(item_id, text):
+                self._insert(key)
+            self._raise_last_id(item_id)
+
+    # 일괄 등록처럼 한꺼번에 많이 들어올 때 - 합쳐서 정렬한 뒤 구간을 다시 나눔
+    def add_many(self, rows):
+        with self._lock:
+            added = []
+            for item_id, text in dict(rows).items():
+                self._remove(item_id)
+                self._values[item_id] = text
+                added.extend(self._make_keys(item_id, text))
+                self._raise_last_id(item_id)
+            if len(added) < BUCKET_SIZE:
+                for key in added:
+                    self._insert(key)
+            elif added:
+                keys = [key for bucket in self._buckets for key in bucket] + added
+                keys.sort()
+                self._set_keys(keys)
+
+    def remove(self, item_id):
+        with self._lock:
+            self._remove(item_id)
+
+    def _insert(self, key):
+        if not self._buckets:
+            self._buckets.append([key])
+            self._maxes.append(key)
+            return
+        position = min(bisect.bisect_left(self._maxes, key), len(self._maxes) - 1)
+        bucket = self._buckets[position]
+        bisect.insort(bucket, key)
+        self._maxes[position] = bucket[-1]
+        if len(bucket) > BUCKET_SIZE * 2:
+            half = bucket[BUCKET_SIZE:]
+            del bucket[BUCKET_SIZE:]
+            self._buckets.insert(position + 1, half)
+            self._maxes[position] = bucket[-1]
+            self._maxes.insert(position + 1, half[-1])
+
+    def _remove(self, item_id):
+        text = self._values.pop(item_id, None)
+        if text is None:
+            return
+        for key in self._make_keys(item_id, text):
+            position = bisect.bisect_left(self._maxes, key)
+            if position == len(self._maxes):
+                continue
+            bucket = self._buckets[position]
+            index = bisect.bisect_left(bucket, key)
+            if index < len(bucket) and bucket[index] == key:
+                del bucket[index]
+                if bucket:
+                    self._maxes[position] = bucket[-1]
+                else:
+                    del self._buckets[position]
+                    del self._maxes[position]
+        if item_id == self._last_id:
+            self._last_id_stale = True
+
+    # 접두어로 시작하는 항목 (정규화 문자열 순) - 한 항목이 여러 단어 위치에서 걸려도 한 번만
+    def search(self, prefix, limit):
+        normalized = normalize(prefix)
+        if not normalized:
+            return []
+        if prefix[-1].isspace():
+            normalized += ' '  # "red " 는 red 로 시작하는 다른 단어(redwood)와 구분
+        results, seen = [], set()
+        with self._lock:
+            position = bisect.bisect_left(self._maxes, normalized)
+            index = bisect.bisect_left(self._buckets[position], normalized) if position < len(self._buckets) else 0
+            while position < len(self._buckets) and len(results) < limit:
+                bucket = self._buckets[position]
+                while index < len(bucket) and len(results) < limit:
+                    key = bucket[index]
+                    if not key.startswith(normalized):
+                        return results
+                    item_id = int(key.rpartition(SEPARATOR)[2])
+                    if item_id not in seen:
+                        seen.add(item_id)
+                        results.append((item_id, self._values[item_id]))
+                    index += 1
+                position, index = position + 1, 0
+        return results
+
+
+# 검색어 자동완성 - 상품 제목 / @사용자명 (정지된 사용자 제외)
+# 같은 프로세스의 변경은 커밋 직후 반영, 다른 프로세스에서 추가된 항목은 refresh_seconds 마다 새 id 만 가져오고
+# 다른 프로세스(웹 워커, 작업 워커)의 삭제/정지/이름 변경은 cache_sync 로 전달받아 해당 id 만 다시 읽음
+class SuggestIndex:
+    def __init__(self):
+        self.titles = PrefixIndex()
+        self.users = PrefixIndex()
+        self.limit = 10
+        self.refresh_seconds = 60.0
+        self.built = False
+        self._refreshed_at = 0.0
+
+    def configure(self, limit, title_words, refresh_seconds):
+        self.limit = limit
+        self.titles.max_words = title_words
+        self.refresh_seconds = refresh_seconds
+
+    def build(self):
+        start = time.perf_counter()
+        self.titles.load(db.session.query(Post.id, Post.title).yield_per(BUILD_CHUNK_SIZE))
+        self.users.load(db.session.query(User.id, User.username)
+                        .filter(User.is_active.isnot(False)).yield_per(BUILD_CHUNK_SIZE))
+        self.built = True
+        self._refreshed_at = time.monotonic()
+        logger.info('Suggestion index built: %d titles, %d users in %.2fs',
+                    len(self.titles), len(self.users), time.perf_counter() - start)
+
+    # 마지막으로 색인한 id 이후에 추가된 행만 읽음 (session 과 무관한 별도 연결)
+    def catch_up(self):
+        with db.engine.connect() as connection:
+            self.titles.add_many(connection.execute(
+                select(Post.id, Post.title).where(Post.id > self.titles.last_id)).all())
+            self.users.add_many(connection.execute(
+                select(User.id, User.username).where(User.id > self.users.last_id, User.is_active.isnot(False))).all())
+        self._refreshed_at = time.monotonic()
+
+    # 다른 프로세스에서 바뀐 항목만 다시 읽어 반영 - 없어졌거나 정지된 항목은 제거
+    # 아직 catch_up 하지 않은 새 id 는 건드리지 않음 (먼저 넣으면 last_id 가 앞서 그 사이의 새 항목을 건너뜀)
+    def reload(self, post_ids, user_ids):
+        with db.engine.connect() as connection:
+            for index, ids, id_column, query in (
+                    (self.titles, post_ids, Post.id, select(Post.id, Post.title)),
+                    (self.users, user_ids, User.id,
+                     select(User.id, User.username).where(User.is_active.isnot(False)))):
+                ids = [item_id for item_id in ids if item_id <= index.last_id]
+                if not ids:
+                    continue
+                current = dict(connection.execute(query.where(id_column.in_(ids))).all())
+                for item_id in ids:
+                    if item_id in current:
+                        index.add(item_id, current[item_id])
+                    else:
+                        index.remove(item_id)
+
+    # 조회는 메모리 색인만 사용 - 다른 프로세스의 변경은 cache_sync 폴러가 백그라운드에서 반영
+    def suggest(self, prefix):
+        if not self.built:
+            self.build()
+        if prefix.startswith('@'):
+            return 'user', self.users.search(prefix[1:], self.limit)
+        return 'title', self.titles.search(prefix, self.limit)
+
+
+suggest_index = SuggestIndex()
+
+
+# cache_sync 폴링마다 (백그라운드) - 다른 프로세스의 변경 반영 + refresh_seconds 마다 새 항목 가져오기
+@cache_sync.subscribe
+def _sync(user_ids, post_ids):
+    if not suggest_index.built:
+        return
+    if suggest_index.refresh_seconds and time.monotonic() - suggest_index._refreshed_at > suggest_index.refresh_seconds:
+        suggest_index.catch_up()
+    if user_ids or post_ids:
+        suggest_index.reload(post_ids, user_ids)
+
+
+# 앱 시작 시 색인 구성 - 아직 테이블이 없으면(마이그레이션 전) 첫 조회 때 구성
+def init_app(app):
+    config = app.config
+    suggest_index.configure(config['SUGGEST_LIMIT'], config['SUGGEST_TITLE_WORDS'], config['SUGGEST_REFRESH_SECONDS'])
+    if not config['SUGGEST_BUILD_ON_STARTUP']:
+        return
+    with app.app_context():
+        try:
+            suggest_index.build()
+        except SQLAlchemyError as e:
+            logger.warning('Suggestion index not built at startup: %s', e)
+        finally:
+            db.session.remove()
+
+
+# 변경 감지 - flush 시점에 모아 두었다가 commit 후에만 색인에 반영 (rollback 이면 버림)
+def _pending(session):
+    return session.info.setdefault('suggest_pending', [])
+
+
+@event.listens_for(Post, 'after_insert')
+@event.listens_for(Post, 'after_update')
+def _post_saved(mapper, connection, target):
+    if db.inspect(target).attrs.title.history.has_changes():
+        _pending(db.inspect(target).session).append((suggest_index.titles, target.id, target.title))
+
+
+@event.listens_for(User, 'after_insert')
+@event.listens_for(User, 'after_update')
+def _user_saved(mapper, connection, target):
+    state = db.inspect(target)
+    if state.attrs.username.history.has_changes() or state.attrs.is_active.history.has_changes():
+        username = target.username if target.is_active is not False else None
+        _pending(state.session).append((suggest_index.users, target.id, username))
+
+
+@event.listens_for(Post, 'after_delete')
+def _post_deleted(mapper, connection, target):
+    _pending(db.inspect(target).session).append((suggest_index.titles, target.id, None))
+
+
+@event.listens_for(User, 'after_delete')
+def _user_deleted(mapper, connection, target):
+    _pending(db.inspect(target).session).append((suggest_index.users, target.id, None))
+
+
+# 코어 일괄 INSERT (상품 일괄 등록, seed-data) - 행 id 를 모르므로 커밋 후 새 id 를 읽어 옴
+@event.listens_for(Session, 'do_orm_execute')
+def _bulk_inserted(orm_execute_state):
+    statement = orm_execute_state.statement
+    if getattr(statement, 'is_insert', False) and getattr(statement, 'table', None) in (Post.__table__, User.__table__):
+        orm_execute_state.session.info['suggest_catch_up'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_after_commit(session):
+    for index, item_id, text in session.info.pop('suggest_pending', []):
+        if text is None:
+            index.remove(item_id)
+        else:
+            index.add(item_id, text)
+    if session.info.pop('suggest_catch_up', False) and suggest_index.built:
+        suggest_index.catch_up()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop('suggest_pending', None)
+    session.info.pop('suggest_catch_up', None)
@@ -0,0 +1,55 @@
+import logging
+import os
+import tempfile
+import time
+from jinja2 import FileSystemBytecodeCache
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_EXTENSIONS = ('html',)
+
+
+# 여러 워커가 같은 디렉터리를 공유하므로 임시 파일에 쓴 뒤 교체 (다른 워커가 쓰다 만 파일을 읽지 않도록)
+class SharedBytecodeCache(FileSystemBytecodeCache):
+    def dump_bytecode(self, bucket):
+        fd, path = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                bucket.write_bytecode(f)
+            os.replace(path, self._get_cache_filename(bucket))
+        except BaseException:
+            os.unlink(path)
+            raise
+
+
+# 모든 템플릿을 읽어 Jinja 메모리 캐시에 올림 - 바이트코드가 있으면 불러오고 없으면 컴파일해서 저장
+# 컴파일 실패는 (이름, 예외) 로 모아 반환
+def load_templates(app):
+    env = app.jinja_env
+    errors = []
+    names = env.list_templates(extensions=TEMPLATE_EXTENSIONS)
+    for name in names:
+        try:
+            env.get_template(name)
+        except Exception as e:
+            errors.append((name, e))
+    return len(names), errors
+
+
+# 템플릿 캐시 초기화 - Jinja 환경(app.jinja_env)이 처음 만들어지기 전에 호출해야 함
+def init_app(app):
+    directory = app.config['JINJA_BYTECODE_CACHE_DIR']
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        app.jinja_options = dict(app.jinja_options, bytecode_cache=SharedBytecodeCache(directory))
+
+
+# 시작 시 미리 불러와 첫 요청에서 템플릿을 컴파일하지 않도록 함 (블루프린트 등록 후 호출)
+def warm(app):
+    if not app.config['JINJA_WARM_TEMPLATES']:
+        return
+    start = time.perf_counter()
+    count, errors = load_templates(app)
+    for name, error in errors:
+        logger.error('Template %s failed to compile: %s', name, error)
+    logger.debug('Warmed %d templates in %.1fms', count, (time.perf_counter() - start) * 1000)
@@ -0,0 +1,51 @@
+import hashlib
+from datetime import datetime
+from flask import current_app, make_response, request, session
+from flask_login import current_user
+from sqlalchemy import event
+from werkzeug.http import is_resource_modified
+from app import db
+from app.models import User, Post
+from app.identity import expire_identity
+
+
+# 상품이 추가/수정/삭제되면 판매자 프로필 버전도 갱신 (프로필 페이지에 상품 목록이 나오므로)
+# 신고 카운터 일괄 UPDATE 는 Post.updated_at 의 onupdate 로만 갱신됨
+@event.listens_for(Post, 'after_insert')
+@event.listens_for(Post, 'after_update')
+@event.listens_for(Post, 'after_delete')
+def _touch_owner(mapper, connection, target):
+    touch_owner(target.user_id, connection)
+
+
+# ORM 이벤트를 거치지 않는 상품 일괄 UPDATE (구매 예약/확정) 후에도 호출 - 호출한 쪽과 같은 트랜잭션
+def touch_owner(user_id, connection=None):
+    users = User.__table__
+    statement = users.update().where(users.c.id == user_id).values(updated_at=datetime.utcnow())
+    (connection or db.session).execute(statement)
+    expire_identity(user_id)
+
+
+# 조건부 GET - 버전(updated_at)과 보는 사람으로 강한 ETag 를 만들고
+# If-None-Match / If-Modified-Since 가 맞으면 렌더링 없이 304
+# render 는 본문이 필요할 때만 호출 (목록 조회 등도 건너뜀)
+def conditional_response(versions, render):
+    stamps = [version for version in versions if version is not None]
+    viewer = current_user.get_id() if current_user.is_authenticated else None
+    etag = hashlib.sha1(repr((viewer, [stamp.isoformat() for stamp in stamps])).encode()).hexdigest()
+    last_modified = max(stamps) if stamps else None
+
+    # flash 메시지는 다음 렌더링에서 한 번만 보여야 하므로 304 로 넘기지 않음
+    if '_flashes' not in session and not is_resource_modified(request.environ, etag=etag,
+                                                              last_modified=last_modified):
+        response = current_app.response_class(status=304)
+    else:
+        response = make_response(render())
+
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # 사용자마다 다른 페이지 - 공유 캐시 금지, 매번 재검증
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Cookie')
+    return response
@@ -0,0 +1,115 @@
+from datetime import datetime
+from app import db
+from app.models import User, WalletTransaction, WalletSnapshot
+from app.identity import expire_identity
+from app.pagination import iter_by_id
+
+# 원장 거래 종류
+OPENING = 'opening'
+CHARGE = 'charge'
+PURCHASE = 'purchase'
+SALE = 'sale'
+REFUND = 'refund'
+
+RECONCILE_CHUNK_SIZE = 1000
+
+
+# 잔액 증감 + 원장 기록 (커밋은 호출한 쪽에서 - 같은 트랜잭션)
+# 잔액은 조건부 UPDATE 로 바꾸므로 동시 요청에서도 갱신이 유실되지 않음
+# 출금 시 잔액이 모자라거나 사용자가 없으면 None
+def _apply(user_id, amount, kind, post_id=None):
+    query = User.query.filter(User.id == user_id)
+    if amount < 0:
+        query = query.filter(User.balance >= -amount)
+    if not query.update({User.balance: User.balance + amount}, synchronize_session=False):
+        return None
+
+    balance = db.session.query(User.balance).filter_by(id=user_id).scalar()
+    db.session.execute(WalletTransaction.__table__.insert().values(
+        user_id=user_id, kind=kind, amount=amount, balance_after=balance,
+        post_id=post_id, timestamp=datetime.utcnow()))
+    expire_identity(user_id)
+    return balance
+
+
+def credit(user_id, amount, kind, post_id=None):
+    return _apply(user_id, amount, kind, post_id)
+
+
+def debit(user_id, amount, kind, post_id=None):
+    return _apply(user_id, -amount, kind, post_id)
+
+
+def charge(user_id, amount):
+    balance = credit(user_id, amount, CHARGE)
+    db.session.commit()
+    return balance
+
+
+# 마지막 체크포인트 이후 원장이 늘어난 사용자마다 스냅샷 추가 (INSERT ... SELECT 한 번)
+def checkpoint():
+    ledger = WalletTransaction.__table__
+    snapshots = WalletSnapshot.__table__
+    latest = (db.select([ledger.c.user_id, db.func.max(ledger.c.id).label('transaction_id')])
+              .group_by(ledger.c.user_id)
+              .subquery())
+    covered = (db.select([db.func.max(snapshots.c.transaction_id)])
+               .where(snapshots.c.user_id == latest.c.user_id)
+               .scalar_subquery())
+    pending = (db.select([latest.c.user_id, latest.c.transaction_id, ledger.c.balance_after,
+                          db.literal(datetime.utcnow())])
+               .select_from(latest.join(ledger, ledger.c.id == latest.c.transaction_id))
+               .where(latest.c.transaction_id > db.func.coalesce(covered, 0)))
+    created = db.session.execute(snapshots.insert().from_select(
+        ['user_id', 'transaction_id', 'balance', 'created_at'], pending)).rowcount
+    db.session.commit()
+    return created
+
+
+# 원장 기준 잔액 - 마지막 체크포인트 + 이후 거래만 재생
+def ledger_balance(user_id):
+    snapshot = (WalletSnapshot.query.filter_by(user_id=user_id)
+                .order_by(WalletSnapshot.transaction_id.desc()).first())
+    start, balance = (snapshot.transaction_id, snapshot.balance) if snapshot else (0, 0)
+    replayed = (db.session.query(db.func.coalesce(db.func.sum(WalletTransaction.amount), 0))
+                .filter(WalletTransaction.user_id == user_id, WalletTransaction.id > start)
+                .scalar())
+    return balance + replayed
+
+
+def _stream(columns, id_column, chunk_size):
+    return iter_by_id(db.session.query(*columns), id_column, chunk_size)
+
+
+# 원장/스냅샷/잔액 대조 - 불일치 설명 문자열을 차례로 반환
+# 1) 거래마다 balance_after 가 이전 잔액 + amount 인지 2) 스냅샷이 그 시점 원장 잔액과 같은지
+# 3) User.balance 가 원장 최종 잔액과 같은지
+def reconcile(chunk_size=RECONCILE_CHUNK_SIZE):
+    running = {}
+    snapshots = _stream((WalletSnapshot.transaction_id, WalletSnapshot.user_id, WalletSnapshot.balance),
+                        WalletSnapshot.transaction_id, chunk_size)
+    snapshot = next(snapshots, None)
+
+    for entry_id, user_id, amount, balance_after in _stream(
+            (WalletTransaction.id, WalletTransaction.user_id, WalletTransaction.amount,
+             WalletTransaction.balance_after), WalletTransaction.id, chunk_size):
+        while snapshot is not None and snapshot.transaction_id < entry_id:
+            if running.get(snapshot.user_id) != snapshot.balance:
+                yield (f'snapshot at transaction {snapshot.transaction_id} for user {snapshot.user_id}: '
+                       f'{snapshot.balance} != ledger {running.get(snapshot.user_id)}')
+            snapshot = next(snapshots, None)
+
+        expected = running.get(user_id, 0) + amount
+        if balance_after != expected:
+            yield f'transaction {entry_id} for user {user_id}: balance_after {balance_after} != {expected}'
+        running[user_id] = balance_after
+
+    while snapshot is not None:
+        if running.get(snapshot.user_id) != snapshot.balance:
+            yield (f'snapshot at transaction {snapshot.transaction_id} for user {snapshot.user_id}: '
+                   f'{snapshot.balance} != ledger {running.get(snapshot.user_id)}')
+        snapshot = next(snapshots, None)
+
+    for user_id, balance in _stream((User.id, User.balance), User.id, chunk_size):
+        if (balance or 0) != running.get(user_id, 0):
+            yield f'user {user_id}: balance {balance} != ledger {running.get(user_id, 0)}'
@@ -17,12 +17,14 @@ depends_on = None
 
 
 def upgrade():
-    # ### commands auto generated by Alembic - please adjust! ###
-    op.add_column('post', sa.Column('buyer_id', sa.Integer(), nullable=True))
-    op.create_foreign_key(None, 'post', 'user', ['buyer_id'], ['id'])
-    op.add_column('user', sa.Column('balance', sa.Integer(), nullable=True))
-    op.drop_column('user', 'wallet_balance')
-    # ### end Alembic commands ###
+    # SQLite 는 제약 조건 ALTER 를 지원하지 않으므로 batch 모드 (PostgreSQL 에서는 일반 ALTER)
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('buyer_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_post_buyer_id', 'user', ['buyer_id'], ['id'])
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('balance', sa.Integer(), nullable=True))
+        batch_op.drop_column('wallet_balance')
 
 
 def downgrade():
@@ -0,0 +1,66 @@
+"""Add full-text search index for post
+
+Revision ID: 3b1f6c2a9d47
+Revises: 90ac158b0eb7
+Create Date: 2025-05-02 14:10:21.184312
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b1f6c2a9d47'
+down_revision = '90ac158b0eb7'
+branch_labels = None
+depends_on = None
+
+
+PG_DOCUMENT = "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(content, ''))"
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        # post 테이블을 원본으로 하는 FTS5 external content 인덱스
+        op.execute(
+            "CREATE VIRTUAL TABLE post_fts USING fts5("
+            "title, content, content='post', content_rowid='id', tokenize='unicode61')"
+        )
+        # 생성/수정/삭제(자동 삭제 포함) 시 인덱스 동기화
+        op.execute(
+            "CREATE TRIGGER post_fts_ai AFTER INSERT ON post BEGIN "
+            "INSERT INTO post_fts(rowid, title, content) VALUES (new.id, new.title, new.content); "
+            "END"
+        )
+        op.execute(
+            "CREATE TRIGGER post_fts_ad AFTER DELETE ON post BEGIN "
+            "INSERT INTO post_fts(post_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content); "
+            "END"
+        )
+        op.execute(
+            "CREATE TRIGGER post_fts_au AFTER UPDATE OF title, content ON post BEGIN "
+            "INSERT INTO post_fts(post_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content); "
+            "INSERT INTO post_fts(rowid, title, content) VALUES (new.id, new.title, new.content); "
+            "END"
+        )
+        # 기존 게시글 백필
+        op.execute("INSERT INTO post_fts(post_fts) VALUES ('rebuild')")
+
+    elif dialect == 'postgresql':
+        # 표현식 인덱스라 별도 백필/동기화 없이 기존 행과 이후 변경이 모두 반영됨
+        op.execute(f"CREATE INDEX ix_post_fulltext ON post USING gin ({PG_DOCUMENT})")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS post_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS post_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS post_fts_ai")
+        op.execute("DROP TABLE IF EXISTS post_fts")
+
+    elif dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_post_fulltext")
@@ -0,0 +1,46 @@
+"""Add indexes for hot filter and sort columns
+
+Revision ID: 7c4e1a90b2d5
+Revises: 3b1f6c2a9d47
+Create Date: 2025-05-03 11:42:57.302118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c4e1a90b2d5'
+down_revision = '3b1f6c2a9d47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_post_user_id_date_posted', 'post', ['user_id', 'date_posted'], unique=False)
+    op.create_index(op.f('ix_post_buyer_id'), 'post', ['buyer_id'], unique=False)
+    op.create_index(op.f('ix_post_date_posted'), 'post', ['date_posted'], unique=False)
+    op.create_index(op.f('ix_post_price'), 'post', ['price'], unique=False)
+    op.create_index(op.f('ix_post_is_sold'), 'post', ['is_sold'], unique=False)
+
+    op.create_index(op.f('ix_user_report_reported_user_id'), 'user_report', ['reported_user_id'], unique=False)
+    op.create_index('ix_user_report_reporter_id_reported_user_id', 'user_report', ['reporter_id', 'reported_user_id'], unique=False)
+    op.create_index(op.f('ix_user_report_timestamp'), 'user_report', ['timestamp'], unique=False)
+
+    op.create_index(op.f('ix_post_report_post_id'), 'post_report', ['post_id'], unique=False)
+    op.create_index(op.f('ix_post_report_timestamp'), 'post_report', ['timestamp'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_post_report_timestamp'), table_name='post_report')
+    op.drop_index(op.f('ix_post_report_post_id'), table_name='post_report')
+
+    op.drop_index(op.f('ix_user_report_timestamp'), table_name='user_report')
+    op.drop_index('ix_user_report_reporter_id_reported_user_id', table_name='user_report')
+    op.drop_index(op.f('ix_user_report_reported_user_id'), table_name='user_report')
+
+    op.drop_index(op.f('ix_post_is_sold'), table_name='post')
+    op.drop_index(op.f('ix_post_price'), table_name='post')
+    op.drop_index(op.f('ix_post_date_posted'), table_name='post')
+    op.drop_index(op.f('ix_post_buyer_id'), table_name='post')
+    op.drop_index('ix_post_user_id_date_posted', table_name='post')
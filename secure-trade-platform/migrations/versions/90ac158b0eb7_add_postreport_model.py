@@ -18,6 +18,8 @@ depends_on = None
 
 def upgrade():
     # ### commands auto generated by Alembic - please adjust! ###
+    # 빈 DB 에서 처음부터 upgrade 하면 wallet_balance 는 이미 2262068c09ea 에서 삭제됨
+    user_columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('user')}
     op.create_table('user_report',
     sa.Column('id', sa.Integer(), nullable=False),
     sa.Column('reported_user_id', sa.Integer(), nullable=False),
@@ -60,7 +62,8 @@ def upgrade():
                existing_type=sa.INTEGER(),
                nullable=True,
                existing_server_default=sa.text("'0'"))
-        batch_op.drop_column('wallet_balance')
+        if 'wallet_balance' in user_columns:
+            batch_op.drop_column('wallet_balance')
 
     # ### end Alembic commands ###
 
@@ -16,12 +16,25 @@ branch_labels = None
 depends_on = None
 
 
+# 2262068c09ea 와 같은 변경을 반복하므로 이미 적용된 항목은 건너뜀 (빈 DB 에서 처음부터 upgrade 가능하도록)
+def _schema():
+    inspector = sa.inspect(op.get_bind())
+    user_columns = {column['name'] for column in inspector.get_columns('user')}
+    post_foreign_keys = {tuple(fk['constrained_columns']) for fk in inspector.get_foreign_keys('post')}
+    return user_columns, post_foreign_keys
+
+
 def upgrade():
-    # ### commands auto generated by Alembic - please adjust! ###
-    op.create_foreign_key(None, 'post', 'user', ['buyer_id'], ['id'])
-    op.add_column('user', sa.Column('balance', sa.Integer(), nullable=True))
-    op.drop_column('user', 'wallet_balance')
-    # ### end Alembic commands ###
+    user_columns, post_foreign_keys = _schema()
+    if ('buyer_id',) not in post_foreign_keys:
+        with op.batch_alter_table('post', schema=None) as batch_op:
+            batch_op.create_foreign_key('fk_post_buyer_id', 'user', ['buyer_id'], ['id'])
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        if 'balance' not in user_columns:
+            batch_op.add_column(sa.Column('balance', sa.Integer(), nullable=True))
+        if 'wallet_balance' in user_columns:
+            batch_op.drop_column('wallet_balance')
 
 
 def downgrade():
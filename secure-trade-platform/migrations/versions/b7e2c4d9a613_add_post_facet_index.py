@@ -0,0 +1,25 @@
+"""Add covering index for search facet counts
+
+Revision ID: b7e2c4d9a613
+Revises: f2d7a8c3b519
+Create Date: 2025-06-02 11:20:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2c4d9a613'
+down_revision = 'f2d7a8c3b519'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 가격 구간 / 판매 상태 집계를 테이블 대신 인덱스만 읽어 처리
+    op.create_index('ix_post_price_is_sold_buyer_id', 'post', ['price', 'is_sold', 'buyer_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_post_price_is_sold_buyer_id', table_name='post')
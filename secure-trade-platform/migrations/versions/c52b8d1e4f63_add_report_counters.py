@@ -0,0 +1,50 @@
+"""Add report counters and unique user report
+
+Revision ID: c52b8d1e4f63
+Revises: a9d3e5f71c08
+Create Date: 2025-05-09 10:27:48.550913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c52b8d1e4f63'
+down_revision = 'a9d3e5f71c08'
+branch_labels = None
+depends_on = None
+
+
+user = sa.table('user', sa.column('id'), sa.column('report_count'))
+post = sa.table('post', sa.column('id'), sa.column('report_count'))
+user_report = sa.table('user_report', sa.column('id'), sa.column('reporter_id'), sa.column('reported_user_id'))
+post_report = sa.table('post_report', sa.column('post_id'))
+
+
+def upgrade():
+    op.add_column('user', sa.Column('report_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('post', sa.Column('report_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # 중복 사용자 신고는 가장 먼저 들어온 것만 남기고 유니크 인덱스로 교체
+    keep = sa.select(sa.func.min(user_report.c.id)).group_by(user_report.c.reporter_id, user_report.c.reported_user_id)
+    op.execute(user_report.delete().where(user_report.c.id.notin_(keep.scalar_subquery())))
+    op.drop_index('ix_user_report_reporter_id_reported_user_id', table_name='user_report')
+    op.create_index('ix_user_report_reporter_id_reported_user_id', 'user_report', ['reporter_id', 'reported_user_id'], unique=True)
+
+    # 기존 신고 수 백필
+    op.execute(user.update().values(report_count=sa.select(sa.func.count())
+                                    .where(user_report.c.reported_user_id == user.c.id)
+                                    .scalar_subquery()))
+    op.execute(post.update().values(report_count=sa.select(sa.func.count())
+                                    .where(post_report.c.post_id == post.c.id)
+                                    .scalar_subquery()))
+
+
+def downgrade():
+    op.drop_index('ix_user_report_reporter_id_reported_user_id', table_name='user_report')
+    op.create_index('ix_user_report_reporter_id_reported_user_id', 'user_report', ['reporter_id', 'reported_user_id'], unique=False)
+
+    # batch 재생성 대신 ALTER TABLE DROP COLUMN (SQLite 3.35+) - FTS 트리거 유지
+    op.drop_column('post', 'report_count')
+    op.drop_column('user', 'report_count')
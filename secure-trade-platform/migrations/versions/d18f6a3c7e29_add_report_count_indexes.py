@@ -0,0 +1,26 @@
+"""Add report_count indexes for admin report dashboard
+
+Revision ID: d18f6a3c7e29
+Revises: c52b8d1e4f63
+Create Date: 2025-05-10 15:03:12.447021
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd18f6a3c7e29'
+down_revision = 'c52b8d1e4f63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(op.f('ix_user_report_count'), 'user', ['report_count'], unique=False)
+    op.create_index(op.f('ix_post_report_count'), 'post', ['report_count'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_post_report_count'), table_name='post')
+    op.drop_index(op.f('ix_user_report_count'), table_name='user')
@@ -0,0 +1,32 @@
+"""Add cross-process cache invalidation log
+
+Revision ID: d5a9f2c7b184
+Revises: c3f8e1a6d290
+Create Date: 2025-06-05 11:42:19.083127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5a9f2c7b184'
+down_revision = 'c3f8e1a6d290'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('cache_invalidation',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=16), nullable=False),
+    sa.Column('target_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_cache_invalidation_created_at'), 'cache_invalidation', ['created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_cache_invalidation_created_at'), table_name='cache_invalidation')
+    op.drop_table('cache_invalidation')
@@ -0,0 +1,61 @@
+"""Add wallet ledger and snapshots
+
+Revision ID: e6b4c9a2f371
+Revises: d18f6a3c7e29
+Create Date: 2025-05-12 11:42:05.183920
+
+"""
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6b4c9a2f371'
+down_revision = 'd18f6a3c7e29'
+branch_labels = None
+depends_on = None
+
+
+user = sa.table('user', sa.column('id'), sa.column('balance'))
+
+
+def upgrade():
+    wallet_transaction = op.create_table('wallet_transaction',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=16), nullable=False),
+    sa.Column('amount', sa.Integer(), nullable=False),
+    sa.Column('balance_after', sa.Integer(), nullable=False),
+    sa.Column('post_id', sa.Integer(), nullable=True),
+    sa.Column('timestamp', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_wallet_transaction_user_id_id', 'wallet_transaction', ['user_id', 'id'], unique=False)
+
+    op.create_table('wallet_snapshot',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('transaction_id', sa.Integer(), nullable=False),
+    sa.Column('balance', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_wallet_snapshot_transaction_id'), 'wallet_snapshot', ['transaction_id'], unique=False)
+    op.create_index('ix_wallet_snapshot_user_id_transaction_id', 'wallet_snapshot', ['user_id', 'transaction_id'], unique=True)
+
+    # 기존 잔액은 opening 거래로 원장에 옮김
+    op.execute(user.update().where(user.c.balance.is_(None)).values(balance=0))
+    op.execute(wallet_transaction.insert().from_select(
+        ['user_id', 'kind', 'amount', 'balance_after', 'timestamp'],
+        sa.select([user.c.id, sa.literal('opening'), user.c.balance, user.c.balance, sa.literal(datetime.utcnow())])
+        .where(user.c.balance != 0)
+        .order_by(user.c.id)))
+
+
+def downgrade():
+    op.drop_index('ix_wallet_snapshot_user_id_transaction_id', table_name='wallet_snapshot')
+    op.drop_index(op.f('ix_wallet_snapshot_transaction_id'), table_name='wallet_snapshot')
+    op.drop_table('wallet_snapshot')
+    op.drop_index('ix_wallet_transaction_user_id_id', table_name='wallet_transaction')
+    op.drop_table('wallet_transaction')
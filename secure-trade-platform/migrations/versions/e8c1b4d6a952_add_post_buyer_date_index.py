@@ -0,0 +1,26 @@
+"""Replace post buyer_id index with (buyer_id, date_posted)
+
+Revision ID: e8c1b4d6a952
+Revises: d5a9f2c7b184
+Create Date: 2025-06-09 10:17:46.215093
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8c1b4d6a952'
+down_revision = 'd5a9f2c7b184'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_post_buyer_id_date_posted', 'post', ['buyer_id', 'date_posted'], unique=False)
+    op.drop_index(op.f('ix_post_buyer_id'), table_name='post')
+
+
+def downgrade():
+    op.create_index(op.f('ix_post_buyer_id'), 'post', ['buyer_id'], unique=False)
+    op.drop_index('ix_post_buyer_id_date_posted', table_name='post')
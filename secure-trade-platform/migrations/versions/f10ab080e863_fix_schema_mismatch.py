@@ -16,27 +16,41 @@ branch_labels = None
 depends_on = None
 
 
+# 앞선 리비전에서 이미 만든 컬럼/외래 키는 이미 적용된 항목은 건너뜀 (빈 DB 에서 처음부터 upgrade 가능하도록)
+def _schema():
+    inspector = sa.inspect(op.get_bind())
+    user_columns = {column['name'] for column in inspector.get_columns('user')}
+    post_foreign_keys = {tuple(fk['constrained_columns']) for fk in inspector.get_foreign_keys('post')}
+    return user_columns, post_foreign_keys
+
+
 def upgrade():
+    user_columns, post_foreign_keys = _schema()
     with op.batch_alter_table('post', schema=None) as batch_op:
         batch_op.alter_column('user_id', existing_type=sa.Integer(), nullable=True)
         batch_op.alter_column('buyer_id', existing_type=sa.Integer(), nullable=True)
 
-        batch_op.create_foreign_key(
-            constraint_name='fk_post_user_id',
-            referent_table='user',
-            local_cols=['user_id'],
-            remote_cols=['id']
-        )
-        batch_op.create_foreign_key(
-            constraint_name='fk_post_buyer_id',
-            referent_table='user',
-            local_cols=['buyer_id'],
-            remote_cols=['id']
-        )
+        if ('user_id',) not in post_foreign_keys:
+            batch_op.create_foreign_key(
+                constraint_name='fk_post_user_id',
+                referent_table='user',
+                local_cols=['user_id'],
+                remote_cols=['id']
+            )
+        if ('buyer_id',) not in post_foreign_keys:
+            batch_op.create_foreign_key(
+                constraint_name='fk_post_buyer_id',
+                referent_table='user',
+                local_cols=['buyer_id'],
+                remote_cols=['id']
+            )
 
     with op.batch_alter_table('user', schema=None) as batch_op:
         # 1단계: balance 컬럼 추가 (nullable=True, default=0)
-        batch_op.add_column(sa.Column('balance', sa.Integer(), nullable=True, server_default='0'))
+        if 'balance' not in user_columns:
+            batch_op.add_column(sa.Column('balance', sa.Integer(), nullable=True, server_default='0'))
+        else:
+            batch_op.alter_column('balance', existing_type=sa.Integer(), server_default='0')
 
     # 2단계: balance 컬럼을 NOT NULL로 변경
     with op.batch_alter_table('user', schema=None) as batch_op:
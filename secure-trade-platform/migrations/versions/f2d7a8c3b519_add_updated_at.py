@@ -0,0 +1,36 @@
+"""Add updated_at to post and user
+
+Revision ID: f2d7a8c3b519
+Revises: e6b4c9a2f371
+Create Date: 2025-05-13 16:20:37.904815
+
+"""
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2d7a8c3b519'
+down_revision = 'e6b4c9a2f371'
+branch_labels = None
+depends_on = None
+
+
+user = sa.table('user', sa.column('updated_at'))
+post = sa.table('post', sa.column('updated_at'), sa.column('date_posted'))
+
+
+def upgrade():
+    # SQLite 는 ADD COLUMN 에 CURRENT_TIMESTAMP 기본값을 허용하지 않으므로 추가 후 백필
+    # (post 테이블을 batch 로 재생성하면 FTS 트리거가 사라짐)
+    op.add_column('user', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.add_column('post', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute(user.update().values(updated_at=datetime.utcnow()))
+    op.execute(post.update().values(updated_at=post.c.date_posted))
+
+
+def downgrade():
+    # batch 재생성 대신 ALTER TABLE DROP COLUMN (SQLite 3.35+) - FTS 트리거 유지
+    op.drop_column('post', 'updated_at')
+    op.drop_column('user', 'updated_at')
@@ -0,0 +1,25 @@
+import os
+from dotenv import load_dotenv
+
+# 운영 서버 실행 (개발 서버는 run.py)
+# eventlet/gevent 는 다른 모듈을 import 하기 전에 monkey patch 해야 하므로 .env 와 워커 모델을 먼저 읽음
+load_dotenv()
+os.environ.setdefault('SOCKETIO_ASYNC_MODE', 'eventlet')
+if os.environ['SOCKETIO_ASYNC_MODE'] == 'eventlet':
+    import eventlet
+    eventlet.monkey_patch()
+elif os.environ['SOCKETIO_ASYNC_MODE'] == 'gevent':
+    from gevent import monkey
+    monkey.patch_all()
+
+import logging
+from app import create_app
+from app.server import serve
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s %(process)d %(levelname)s %(name)s: %(message)s')
+
+# 워커를 fork 하기 전에 앱을 한 번만 로드 (import, 설정, 확장 초기화를 워커마다 반복하지 않음)
+app = create_app()
+
+if __name__ == '__main__':
+    serve(app)